@@ -0,0 +1,36 @@
+"""Blackjack Q-learning agent: game core, agent and training tools.
+
+Importing the package does no work: the names below are loaded from their
+submodules on first access (PEP 562). `from blackjack_rl import BlackjackGame`
+imports only blackjack_rl.game (standard library only). The agent and trainer
+bring in numpy. No submodule except render imports pygame, and render is
+only imported by the visualizer, the recorder and the dashboard.
+"""
+import importlib
+
+_EXPORTS = {
+    "game": ("Card", "Deck", "Shoe", "Hand", "BlackjackGame", "TableGame", "get_state",
+             "get_reward"),
+    "agent": ("ACTIONS", "N_ACTIONS", "N_STATES", "STATE_SHAPE", "DenseQTable", "state_index",
+              "index_to_state", "choose_action", "q_update", "play_episode", "train",
+              "evaluate_greedy"),
+    "actions": ("FULL_ACTIONS", "N_FULL_ACTIONS", "FULL_STATE_SHAPE", "FullQTable", "full_state",
+                "play_full_episode", "train_full"),
+    "trainer": ("Snapshot", "Trainer"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,305 @@
+"""Full action set: Stand, Hit, Double, Split and Surrender.
+
+agent.py learns Stand/Hit only. Every tool built on its (N_STATES, N_ACTIONS)
+layout (stats, convergence, the Trainer, Basic Strategy) keeps that layout.
+This module adds BlackjackGame's other options as a separate Q action space,
+the way counting.py adds state components:
+
+- FULL_ACTIONS extends agent.ACTIONS, so Stand and Hit keep columns 0 and 1.
+- The state gains a fourth component, the decision kind, which fixes the
+  legal actions (DECISIONS). A pair's rank follows from (player_sum,
+  usable_ace), so "may split" is just two more kinds.
+- Exploration and the greedy choice only consider legal actions, and the
+  Q-learning target maxes over the next state's legal actions.
+
+Double and Surrender end a hand, and their reward is that hand's payout
+(+/-2 after a double, -0.5 for a surrender). A Split is learned from its
+return: the summed payout of the hands that came out of it, resplits
+included. The dealer plays after the last hand, so, as in table.py, every
+transition is buffered and applied once the round is settled.
+
+    python -m blackjack_rl.actions --episodes 2000000 --checkpoint full_q.npz
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from . import agent
+from .agent import ACTIONS, N_STATES, STATE_SHAPE, DenseQTable, index_to_state, state_index
+from .checkpoint import save_checkpoint
+from .game import DOUBLE_AFTER_SPLIT, BlackjackGame, get_state
+from .strategy import greedy_policy
+
+STAND, HIT, DOUBLE, SPLIT, SURRENDER = range(5)
+FULL_ACTIONS = ACTIONS + ("DOUBLE", "SPLIT", "SURRENDER")
+N_FULL_ACTIONS = len(FULL_ACTIONS)
+
+# Decision kinds (the last state component) and the actions legal in each
+AFTER_HIT, FIRST, FIRST_PAIR, SPLIT_HAND, SPLIT_PAIR = range(5)
+_DAS = (DOUBLE,) if DOUBLE_AFTER_SPLIT else ()
+DECISIONS = (
+    (STAND, HIT),                            # After a hit (or a double's card)
+    (STAND, HIT, DOUBLE, SURRENDER),         # First decision
+    (STAND, HIT, DOUBLE, SPLIT, SURRENDER),  # First decision on a pair
+    (STAND, HIT) + _DAS,                     # First decision of a split hand
+    (STAND, HIT) + _DAS + (SPLIT,),          # ... holding a pair again (resplit)
+)
+LEGAL = np.zeros((len(DECISIONS), N_FULL_ACTIONS), dtype=bool)
+for _kind, _legal in enumerate(DECISIONS):
+    LEGAL[_kind, list(_legal)] = True
+
+FULL_STATE_SHAPE = STATE_SHAPE + (len(DECISIONS),)
+N_FULL_STATES = N_STATES * len(DECISIONS)
+
+# Double and Split pay out without discounting, so Hit's bootstrapped value
+# has to be undiscounted as well for the three to be comparable
+FULL_DISCOUNT_FACTOR = 1.0
+# Slower than agent.LEARNING_RATE: with Surrender's fixed -0.5 on offer, noisy
+# Stand/Hit estimates that dip below it stop being chosen and stay wrong
+FULL_LEARNING_RATE = 0.005
+FULL_EPISODES = 2_000_000
+
+
+def decision_kind(game):
+    hand = game.player_hand
+    if len(hand.cards) > 2:
+        return AFTER_HIT
+    pair = game.can_split()
+    if game.num_hands == 1:
+        return FIRST_PAIR if pair else FIRST
+    return SPLIT_PAIR if pair else SPLIT_HAND
+
+
+def full_state(game):
+    """(player_sum, dealer_upcard, usable_ace, decision_kind) of the hand being played."""
+    return get_state(game.player_hand, game.dealer_hand) + (decision_kind(game),)
+
+
+def full_state_index(state):
+    return state_index(state[:3]) * len(DECISIONS) + state[3]
+
+
+def index_to_full_state(index):
+    base, kind = divmod(index, len(DECISIONS))
+    return index_to_state(base) + (kind,)
+
+
+class FullQTable(DenseQTable):
+    """DenseQTable over the full action set: one (N_FULL_STATES, N_FULL_ACTIONS) array.
+
+    Illegal actions keep their initial 0.0 and are never chosen.
+    """
+
+    def __init__(self, values=None):
+        super().__init__(np.zeros((N_FULL_STATES, N_FULL_ACTIONS)) if values is None else values)
+
+    def __getitem__(self, state):
+        return self.values[full_state_index(state)]
+
+    def to_dict(self):
+        visited = np.flatnonzero(np.any(self.values != 0.0, axis=1))
+        return {index_to_full_state(i): self.values[i].copy() for i in visited}
+
+
+# --- Policies ---
+
+def full_greedy_policy(q_table):
+    """Best legal action per state, as an int8 FULL_STATE_SHAPE array.
+
+    Accepts a FullQTable or its (N_FULL_STATES, N_FULL_ACTIONS) values.
+    """
+    values = q_table.values if isinstance(q_table, DenseQTable) else np.asarray(q_table)
+    legal = np.tile(LEGAL, (N_STATES, 1))
+    return (np.argmax(np.where(legal, values, -np.inf), axis=1)
+            .astype(np.int8).reshape(FULL_STATE_SHAPE))
+
+
+def lift_policy(policy):
+    """Stand/Hit policy table (STATE_SHAPE) in the full layout: same action in every decision kind."""
+    policy = np.asarray(policy)
+    return np.repeat(policy[..., None], len(DECISIONS), axis=-1)
+
+
+def policy_from_values(values):
+    """Greedy policy table for checkpoint Q values of either action set."""
+    if values.shape[-1] == N_FULL_ACTIONS:
+        return full_greedy_policy(values)
+    return greedy_policy(values)
+
+
+# --- Episode Loop ---
+
+_PLAY = (BlackjackGame.player_stand, BlackjackGame.player_hit, BlackjackGame.player_double,
+         BlackjackGame.player_split, BlackjackGame.player_surrender)
+
+
+def choose_full_action(q_values, legal, epsilon, rng):
+    """Epsilon-greedy over the legal actions. Returns (action, explored)."""
+    if rng.uniform(0, 1) < epsilon:
+        return rng.choice(legal), True
+    return max(legal, key=q_values.__getitem__), False  # Ties go to the first (Stand)
+
+
+def full_q_update(q_table, state, action, reward, new_state,
+                  learning_rate=FULL_LEARNING_RATE, discount_factor=FULL_DISCOUNT_FACTOR):
+    """One-step Q-learning update with the max taken over new_state's legal actions."""
+    old_q_value = q_table[state][action]
+    if new_state is None:  # Terminal for this hand
+        target_q_value = reward
+    else:
+        next_q = q_table[new_state]
+        target_q_value = reward + discount_factor * max(
+            next_q[a] for a in DECISIONS[new_state[3]])
+    q_table[state][action] = old_q_value + learning_rate * (target_q_value - old_q_value)
+
+
+def _split_return(hand, splits, start, hand_rewards):
+    """Payout of hand plus every hand split off it from splits[start] on."""
+    total = hand_rewards[hand]
+    for k in range(start, len(splits)):
+        parent, child = splits[k]
+        if parent == hand:
+            total += _split_return(child, splits, k + 1, hand_rewards)
+    return total
+
+
+def play_full_episode(game, q_table, epsilon, rng, learning_rate=FULL_LEARNING_RATE,
+                      discount_factor=FULL_DISCOUNT_FACTOR, update=full_q_update, on_step=None):
+    """Plays one round with epsilon-greedy legal actions, learning from every step.
+
+    update and on_step are called as in agent.play_episode, except that the
+    updates are applied once the round is settled. Returns (result, reward,
+    number_of_updates); reward is the net payout over all hands.
+    """
+    game.start_hand()
+    if game.game_over:  # Immediate Blackjack
+        return game.result, game.reward(), 0
+
+    steps = []  # (state, action, new_state, hand index or, for a Split, splits index)
+    splits = []  # (hand, new_hand) per Split, in play order
+    while not game.game_over:
+        hand = game.current
+        state = full_state(game)
+        action, explored = choose_full_action(q_table[state], DECISIONS[state[3]], epsilon, rng)
+        if on_step is not None:
+            on_step(game, action, explored)
+        if action == SPLIT:
+            splits.append((hand, game.num_hands))
+        _PLAY[action](game)
+        if action == HIT and not game.hand_results[hand]:  # Still playing this hand
+            steps.append((state, HIT, full_state(game), hand))
+        else:
+            steps.append((state, action, None, len(splits) - 1 if action == SPLIT else hand))
+
+    hand_rewards = [game.hand_reward(i) for i in range(game.num_hands)]
+    for state, action, new_state, ref in steps:
+        if new_state is not None:
+            reward = 0.0
+        elif action == SPLIT:
+            reward = _split_return(splits[ref][0], splits, ref, hand_rewards)
+        else:
+            reward = hand_rewards[ref]
+        update(q_table, state, action, reward, new_state, learning_rate, discount_factor)
+    return game.result, game.reward(), len(steps)
+
+
+def train_full(episodes=FULL_EPISODES, q_table=None, game_seed=agent.GAME_RNG_SEED,
+               epsilon_seed=agent.EPSILON_RNG_SEED, learning_rate=FULL_LEARNING_RATE,
+               discount_factor=FULL_DISCOUNT_FACTOR, epsilon_start=agent.EPSILON_START,
+               epsilon_decay=None, epsilon_min=agent.EPSILON_MIN):
+    """Headless training over the full action set, dealt like agent.train().
+
+    epsilon_decay defaults to reaching epsilon_min after 80% of the episodes.
+    Returns (q_table, stats); stats also counts how often each action was taken.
+    """
+    if epsilon_decay is None:
+        epsilon_decay = (epsilon_min / epsilon_start) ** (1 / (0.8 * max(episodes, 1)))
+    if q_table is None:
+        q_table = FullQTable()
+    rng = random.Random(epsilon_seed)
+    action_counts = [0] * N_FULL_ACTIONS
+    wins = losses = pushes = surrenders = updates = 0
+    total_reward = 0.0
+
+    def count_action(game, action, explored):
+        action_counts[action] += 1
+
+    start_time = time.perf_counter()
+    for episode in range(1, episodes + 1):
+        epsilon = agent.epsilon_at(episode, epsilon_start, epsilon_decay, epsilon_min)
+        game = BlackjackGame(seed=game_seed + episode)
+        result, reward, steps = play_full_episode(game, q_table, epsilon, rng, learning_rate,
+                                                  discount_factor, on_step=count_action)
+        updates += steps
+        total_reward += reward
+        if result == "Win":
+            wins += 1
+        elif result == "Loss":
+            losses += 1
+        elif result == "Surrender":
+            surrenders += 1
+        else:
+            pushes += 1
+    elapsed = time.perf_counter() - start_time
+
+    stats = {
+        "episodes": episodes,
+        "updates": updates,
+        "elapsed_seconds": elapsed,
+        "updates_per_second": updates / elapsed if elapsed > 0 else 0.0,
+        "total_wins": wins,
+        "total_losses": losses,
+        "total_pushes": pushes,
+        "total_surrenders": surrenders,
+        "mean_reward": total_reward / episodes if episodes else 0.0,
+        "action_counts": dict(zip(FULL_ACTIONS, action_counts)),
+    }
+    return q_table, stats
+
+
+def evaluate_full_greedy(q_table, hands=10000, seed=1_000_000):
+    """Plays hands with the greedy legal action, as agent.evaluate_greedy() does.
+
+    Returns {"mean_reward", "win_rate_percent"}.
+    """
+    policy = full_greedy_policy(q_table).reshape(-1)
+    total_reward = 0.0
+    wins = 0
+    for hand in range(hands):
+        game = BlackjackGame(seed=seed + hand)
+        game.start_hand()
+        while not game.game_over:
+            _PLAY[policy[full_state_index(full_state(game))]](game)
+        total_reward += game.reward()
+        wins += game.result == "Win"
+    return {
+        "mean_reward": total_reward / hands,
+        "win_rate_percent": wins / hands * 100,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--episodes", type=int, default=FULL_EPISODES)
+    parser.add_argument("--eval-hands", type=int, default=100_000)
+    parser.add_argument("--checkpoint", default="full_q.npz")
+    args = parser.parse_args()
+
+    q_table, stats = train_full(args.episodes)
+    print(f"{stats['episodes']:,} episodes, {stats['updates']:,} updates, "
+          f"{stats['updates_per_second']:,.0f} updates/s, "
+          f"mean reward while training {stats['mean_reward']:+.4f}")
+    print("Actions taken: " + ", ".join(
+        f"{name} {count:,}" for name, count in stats['action_counts'].items()))
+    evaluation = evaluate_full_greedy(q_table, args.eval_hands)
+    print(f"Greedy policy over {args.eval_hands:,} hands: "
+          f"mean reward {evaluation['mean_reward']:+.4f}, "
+          f"win rate {evaluation['win_rate_percent']:.2f}%")
+    save_checkpoint(args.checkpoint, q_table)
+    print(f"Saved Q-table to {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Tabular Q-learning agent: hyperparameters, Q storage and the episode loop."""
+import random
+import time
+
+import numpy as np
+
+from .game import BlackjackGame, get_reward, get_state
+
+# Q-learning parameters
+LEARNING_RATE = 0.05
+DISCOUNT_FACTOR = 0.95
+EPSILON_START = 1.0
+EPSILON_DECAY = 0.99995  # Faster decay for 50k episodes
+EPSILON_MIN = 0.01
+EPISODES = 50000  # More episodes needed for Blackjack due to more states and stochasticity
+
+# Pseudo-random number generator seeds for reproducibility
+GAME_RNG_SEED = 42
+EPSILON_RNG_SEED = 123
+
+# --- Dense State Layout ---
+
+# Every state returned by get_state() maps onto a fixed grid, so the Q-table can
+# also be stored as one contiguous (N_STATES, N_ACTIONS) array.
+PLAYER_SUMS = range(4, 22)  # 4-21
+DEALER_UPCARDS = range(2, 12)  # 2-11 (11 for Ace)
+USABLE_ACES = range(0, 2)  # 0/1
+ACTIONS = ("STAND", "HIT")
+N_ACTIONS = len(ACTIONS)
+STATE_SHAPE = (len(PLAYER_SUMS), len(DEALER_UPCARDS), len(USABLE_ACES))
+N_STATES = STATE_SHAPE[0] * STATE_SHAPE[1] * STATE_SHAPE[2]
+
+
+def state_index(state):
+    """Maps a (player_sum, dealer_upcard, usable_ace) state to its row in a dense Q array."""
+    player_sum, dealer_upcard, usable_ace = state
+    return ((player_sum - PLAYER_SUMS.start) * STATE_SHAPE[1] +
+            (dealer_upcard - DEALER_UPCARDS.start)) * STATE_SHAPE[2] + usable_ace
+
+
+def index_to_state(index):
+    """Inverse of state_index()."""
+    rest, usable_ace = divmod(index, STATE_SHAPE[2])
+    player_idx, dealer_idx = divmod(rest, STATE_SHAPE[1])
+    return (PLAYER_SUMS.start + player_idx, DEALER_UPCARDS.start + dealer_idx, usable_ace)
+
+
+class DenseQTable:
+    """Q-table stored as one (N_STATES, N_ACTIONS) float64 array.
+
+    Indexing by state returns a writable view of that state's row, so it can be
+    used anywhere the defaultdict Q-table is used.
+    """
+
+    def __init__(self, values=None):
+        if values is None:
+            values = np.zeros((N_STATES, N_ACTIONS))
+        self.values = values
+
+    def __getitem__(self, state):
+        return self.values[state_index(state)]
+
+    def clear(self):
+        self.values.fill(0.0)
+
+    def to_dict(self):
+        """Returns the non-zero rows as a {state: ndarray} dict."""
+        visited = np.flatnonzero(np.any(self.values != 0.0, axis=1))
+        return {index_to_state(i): self.values[i].copy() for i in visited}
+
+
+def q_table_to_array(q_table):
+    """Converts a {state: ndarray} Q-table into a dense (N_STATES, N_ACTIONS) array."""
+    values = np.zeros((N_STATES, N_ACTIONS))
+    for state, row in q_table.items():
+        values[state_index(state)] = row
+    return values
+
+
+# --- Episode Loop ---
+
+def epsilon_at(episode, epsilon_start=EPSILON_START, epsilon_decay=EPSILON_DECAY,
+               epsilon_min=EPSILON_MIN):
+    """Epsilon used for the given 1-based episode number (decayed once per episode)."""
+    return max(epsilon_min, epsilon_start * epsilon_decay ** (episode - 1))
+
+
+def choose_action(q_values, epsilon, rng):
+    """Epsilon-greedy action selection. Returns (action, explored)."""
+    if rng.uniform(0, 1) < epsilon:
+        return rng.choice([0, 1]), True  # 0=Stand, 1=Hit
+    return int(np.argmax(q_values)), False
+
+
+def q_update(q_table, state, action, reward, new_state,
+             learning_rate=LEARNING_RATE, discount_factor=DISCOUNT_FACTOR):
+    """One-step Q-learning update. new_state is None for terminal transitions."""
+    old_q_value = q_table[state][action]
+    if new_state is None:  # Terminal state
+        target_q_value = reward
+    else:
+        target_q_value = reward + discount_factor * np.max(q_table[new_state])
+    q_table[state][action] = old_q_value + \
+        learning_rate * (target_q_value - old_q_value)
+
+
+def _base_state(game):
+    return get_state(game.player_hand, game.dealer_hand)
+
+
+def play_episode(game, q_table, epsilon, rng, learning_rate=LEARNING_RATE,
+                 discount_factor=DISCOUNT_FACTOR, update=q_update, on_step=None,
+                 state_fn=None):
+    """Plays one hand with epsilon-greedy actions, learning from every step.
+
+    update is called as update(q_table, state, action, reward, new_state,
+    learning_rate, discount_factor) so callers can wrap it (e.g. with locks).
+    on_step, if given, is called as on_step(game, action, explored) before
+    each action is taken.
+    state_fn(game), if given, replaces get_state() (e.g. counting.ExtendedStateSpace.state).
+    Returns (result, reward, number_of_updates).
+    """
+    if state_fn is None:
+        state_fn = _base_state
+    game.start_hand()
+
+    # Immediate game over (Blackjack) has no decision to learn from
+    if game.game_over:
+        is_player_blackjack = game.player_hand.is_blackjack() and game.result == "Win"
+        return game.result, get_reward(game.result, is_player_blackjack), 0
+
+    state = state_fn(game)
+    updates = 0
+    reward = 0.0
+    while not game.game_over:
+        action, explored = choose_action(q_table[state], epsilon, rng)
+        if on_step is not None:
+            on_step(game, action, explored)
+        if action == 1:  # HIT
+            game.player_hit()
+        else:  # STAND
+            game.player_stand()
+
+        if not game.game_over:
+            new_state = state_fn(game)
+            reward = 0.0  # Rewards are sparse, only at end of game
+        else:
+            new_state = None
+            reward = get_reward(game.result)
+
+        update(q_table, state, action, reward, new_state,
+               learning_rate, discount_factor)
+        updates += 1
+        state = new_state
+
+    return game.result, reward, updates
+
+
+def train(episodes=EPISODES, q_table=None, game_seed=GAME_RNG_SEED,
+          epsilon_seed=EPSILON_RNG_SEED, learning_rate=LEARNING_RATE,
+          discount_factor=DISCOUNT_FACTOR, epsilon_start=EPSILON_START,
+          epsilon_decay=EPSILON_DECAY, epsilon_min=EPSILON_MIN, tracker=None):
+    """Headless single-process training loop.
+
+    Episode n is dealt from BlackjackGame(seed=game_seed + n), matching main.py.
+    With a convergence.ConvergenceTracker, training stops early once it
+    reports convergence.
+    Returns (q_table, stats).
+    """
+    if q_table is None:
+        q_table = DenseQTable()
+    rng = random.Random(epsilon_seed)
+    update = q_update if tracker is None else tracker.wrap(q_update)
+    wins = losses = pushes = updates = played = 0
+
+    start_time = time.perf_counter()
+    for episode in range(1, episodes + 1):
+        epsilon = epsilon_at(episode, epsilon_start, epsilon_decay, epsilon_min)
+        game = BlackjackGame(seed=game_seed + episode)
+        result, _, steps = play_episode(game, q_table, epsilon, rng,
+                                        learning_rate, discount_factor, update)
+        updates += steps
+        played += 1
+        if result == "Win":
+            wins += 1
+        elif result == "Loss":
+            losses += 1
+        else:
+            pushes += 1
+        if tracker is not None and tracker.end_episode(episode):
+            break
+    elapsed = time.perf_counter() - start_time
+
+    stats = {
+        "episodes": played,
+        "updates": updates,
+        "elapsed_seconds": elapsed,
+        "updates_per_second": updates / elapsed if elapsed > 0 else 0.0,
+        "total_wins": wins,
+        "total_losses": losses,
+        "total_pushes": pushes,
+    }
+    return q_table, stats
+
+
+def evaluate_greedy(q_table, hands=10000, seed=1_000_000):
+    """Plays hands with the greedy policy (no exploration, no learning).
+
+    Hand n is dealt from BlackjackGame(seed=seed + n), so every Q-table
+    evaluated with the same seed sees the same first cards.
+    Returns {"mean_reward", "win_rate_percent"}.
+    """
+    total_reward = 0.0
+    wins = 0
+    for hand in range(hands):
+        game = BlackjackGame(seed=seed + hand)
+        game.start_hand()
+        while not game.game_over:
+            state = get_state(game.player_hand, game.dealer_hand)
+            if np.argmax(q_table[state]) == 1:
+                game.player_hit()
+            else:
+                game.player_stand()
+        is_player_blackjack = game.player_hand.is_blackjack() and game.result == "Win"
+        total_reward += get_reward(game.result, is_player_blackjack)
+        wins += game.result == "Win"
+    return {
+        "mean_reward": total_reward / hands,
+        "win_rate_percent": wins / hands * 100,
+    }
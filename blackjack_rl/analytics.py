@@ -0,0 +1,127 @@
+"""Vectorized analysis of learned Q-tables.
+
+Checkpoints load into a QGrid: a float array shaped
+(..., player_sum, dealer_upcard, usable_ace, action) with NaN for states the
+agent never visited. Any number of runs can be stacked on leading axes, and
+policies, value maps, advantage maps and run-to-run diffs are computed as
+whole-array operations.
+
+    grid = load_runs(['run_a.npz', 'run_b.npz'])
+    grid.policy()                # (2, 18, 10, 2) greedy actions
+    policy_diff(grid[0], grid[1])
+"""
+import numpy as np
+
+from .agent import ACTIONS, DEALER_UPCARDS, N_ACTIONS, PLAYER_SUMS, STATE_SHAPE, USABLE_ACES
+from .checkpoint import load_q_values
+
+# Labels for the last four axes of every QGrid
+AXES = ("player_sum", "dealer_upcard", "usable_ace", "action")
+COORDS = {
+    "player_sum": np.array(PLAYER_SUMS),
+    "dealer_upcard": np.array(DEALER_UPCARDS),
+    "usable_ace": np.array(USABLE_ACES),
+    "action": np.array(ACTIONS),
+}
+
+
+class QGrid:
+    """Q-values on the labeled (player_sum, dealer_upcard, usable_ace, action) grid.
+
+    values may carry extra leading axes (e.g. one per run); runs optionally
+    names the entries of the first one.
+    """
+
+    def __init__(self, values, runs=None):
+        self.values = values
+        self.runs = runs
+
+    def __getitem__(self, run):
+        """Selects one run (or a slice of runs) along the leading axis."""
+        runs = self.runs[run] if self.runs is not None else None
+        return QGrid(self.values[run], runs)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def visited(self):
+        """Boolean (..., player_sum, dealer_upcard, usable_ace) mask of visited states."""
+        return ~np.isnan(self.values[..., 0])
+
+    def sel(self, player_sum=None, dealer_upcard=None, usable_ace=None):
+        """Selects states by label, e.g. sel(player_sum=range(12, 21), usable_ace=0).
+
+        A scalar label drops its axis; a list of labels keeps it.
+        """
+        values = self.values
+        for axis, name, labels in ((-4, "player_sum", player_sum),
+                                   (-3, "dealer_upcard", dealer_upcard),
+                                   (-2, "usable_ace", usable_ace)):
+            if labels is None:
+                continue
+            if not np.isscalar(labels):
+                labels = list(labels)
+            values = np.take(values, np.searchsorted(COORDS[name], labels), axis=axis)
+        return values
+
+    def policy(self):
+        """Greedy action per state (0=Stand, 1=Hit); NaN for unvisited states."""
+        return np.where(self.visited(), np.argmax(np.nan_to_num(self.values), axis=-1), np.nan)
+
+    def value_map(self):
+        """max_a Q(s, a) per state; NaN for unvisited states."""
+        return np.max(self.values, axis=-1)
+
+    def advantage_map(self):
+        """Q(s, Hit) - Q(s, Stand) per state; positive where hitting looks better."""
+        return self.values[..., 1] - self.values[..., 0]
+
+    def to_frame(self, usable_ace, kind="policy"):
+        """One (player_sum x dealer_upcard) slice as a pandas DataFrame, for heatmaps.
+
+        kind is "policy", "value" or "advantage". Only valid for a single run.
+        """
+        import pandas as pd
+
+        maps = {"policy": self.policy, "value": self.value_map,
+                "advantage": self.advantage_map}
+        grid = maps[kind]()[..., int(usable_ace)]
+        return pd.DataFrame(grid, index=COORDS["player_sum"], columns=COORDS["dealer_upcard"])
+
+
+def q_values_to_grid(values, visited):
+    """Reshapes dense (N_STATES, N_ACTIONS) values into grid layout, NaN-masking unvisited."""
+    grid = np.where(visited[:, None], values, np.nan)
+    return grid.reshape(STATE_SHAPE + (N_ACTIONS,))
+
+
+def load_grid(path):
+    """Loads a .npz checkpoint or training_results.json into a QGrid."""
+    return QGrid(q_values_to_grid(*load_q_values(path)))
+
+
+def load_runs(paths):
+    """Loads many checkpoints into one QGrid with a leading run axis."""
+    paths = list(paths)
+    values = np.stack([q_values_to_grid(*load_q_values(path)) for path in paths])
+    return QGrid(values, runs=np.array(paths))
+
+
+def policy_diff(a, b):
+    """Where the greedy policies of two grids differ.
+
+    Returns a float array: 1 where both visited a state and disagree, 0 where
+    they agree, NaN where either never visited it. Grids broadcast, so
+    policy_diff(runs, reference) compares every run against one reference.
+    """
+    policy_a, policy_b = a.policy(), b.policy()
+    return np.where(np.isnan(policy_a) | np.isnan(policy_b), np.nan,
+                    (policy_a != policy_b).astype(float))
+
+
+def agreement(a, b):
+    """Fraction of commonly visited states with the same greedy action (per run)."""
+    diff = policy_diff(a, b)
+    state_axes = (-3, -2, -1)
+    return 1.0 - np.nansum(diff, axis=state_axes) / np.sum(~np.isnan(diff), axis=state_axes)
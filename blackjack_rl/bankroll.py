@@ -0,0 +1,177 @@
+"""Vectorized bankroll and risk-of-ruin simulation for a frozen policy.
+
+Each hand is dealt from a fresh deck, so hand outcomes are independent and
+identically distributed for a fixed policy. The simulator measures that
+outcome distribution once, with the vectorized engine and get_reward payouts
+(3:2 for Blackjack). It then plays whole sessions as NumPy arrays: one row
+per session, one vectorized step per hand.
+
+    python -m blackjack_rl.bankroll training_results.npz --scheme martingale
+"""
+import argparse
+
+import numpy as np
+
+from .actions import policy_from_values
+from .checkpoint import load_q_values
+from .strategy import basic_strategy_policy
+from .vectorized import deal_streams, play_hands
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+# --- Betting Schemes ---
+
+class FlatBet:
+    """Bets the same unit every hand."""
+
+    def __init__(self, unit=1.0):
+        self.unit = unit
+
+    def first_bets(self, sessions):
+        return np.full(sessions, self.unit)
+
+    def next_bets(self, bets, rewards):
+        return bets
+
+
+class Martingale:
+    """Doubles the bet after a loss, back to one unit after a win, capped at max_bet."""
+
+    def __init__(self, unit=1.0, max_bet=64.0):
+        self.unit = unit
+        self.max_bet = max_bet
+
+    def first_bets(self, sessions):
+        return np.full(sessions, self.unit)
+
+    def next_bets(self, bets, rewards):
+        bets = np.where(rewards < 0, np.minimum(bets * 2, self.max_bet), bets)
+        return np.where(rewards > 0, self.unit, bets)
+
+
+class Paroli:
+    """Doubles the bet after a win for up to streak wins, otherwise one unit."""
+
+    def __init__(self, unit=1.0, streak=3):
+        self.unit = unit
+        self.streak = streak
+
+    def first_bets(self, sessions):
+        return np.full(sessions, self.unit)
+
+    def next_bets(self, bets, rewards):
+        doubled = bets * 2
+        return np.where((rewards > 0) & (doubled <= self.unit * 2 ** self.streak),
+                        doubled, self.unit)
+
+
+SCHEMES = {"flat": FlatBet, "martingale": Martingale, "paroli": Paroli}
+
+
+# --- Simulation ---
+
+def outcome_distribution(policy, hands=1_000_000, seed=0, chunk_hands=200_000):
+    """(rewards, probabilities) of one hand under policy, estimated on hands deals."""
+    rng = np.random.default_rng(seed)
+    counts = {}
+    for start in range(0, hands, chunk_hands):
+        streams = deal_streams(min(chunk_hands, hands - start), rng)
+        values, value_counts = np.unique(play_hands(policy, streams)[0], return_counts=True)
+        for value, count in zip(values, value_counts):
+            counts[value] = counts.get(value, 0) + count
+    rewards = np.array(sorted(counts))
+    probabilities = np.array([counts[r] for r in rewards], dtype=np.float64) / hands
+    return rewards, probabilities
+
+
+class SessionReport:
+    """Per-session results plus summary statistics."""
+
+    def __init__(self, pnl, max_drawdown, ruined, hands_played, bankroll):
+        self.pnl = pnl
+        self.max_drawdown = max_drawdown
+        self.ruined = ruined
+        self.hands_played = hands_played
+        self.bankroll = bankroll
+
+    @property
+    def risk_of_ruin(self):
+        return float(self.ruined.mean())
+
+    def summary(self):
+        lines = [
+            f"{self.pnl.size:,} sessions, starting bankroll {self.bankroll:,.2f}",
+            f"Risk of ruin:        {self.risk_of_ruin:.2%}",
+            f"Mean P&L:            {self.pnl.mean():+,.2f}",
+            f"Mean hands played:   {self.hands_played.mean():,.1f}",
+        ]
+        pnl_q = np.quantile(self.pnl, QUANTILES)
+        drawdown_q = np.quantile(self.max_drawdown, QUANTILES)
+        lines.append("Quantile   " + "".join(f"{q:>10.0%}" for q in QUANTILES))
+        lines.append("P&L        " + "".join(f"{v:>+10.2f}" for v in pnl_q))
+        lines.append("Drawdown   " + "".join(f"{v:>10.2f}" for v in drawdown_q))
+        return "\n".join(lines)
+
+
+def simulate_sessions(rewards, probabilities, scheme, sessions=100_000,
+                      hands_per_session=200, bankroll=100.0, seed=0):
+    """Plays sessions of up to hands_per_session hands with a betting scheme.
+
+    A session is ruined, and stops, once its bankroll can't cover one unit.
+    Bets are reduced so that the worst outcome (down to -8 stakes for split
+    and doubled full-action hands) never costs more than is left.
+    """
+    rng = np.random.default_rng(seed)
+    worst_loss = max(1.0, -float(np.min(rewards)))  # Stakes lost on the worst outcome
+    money = np.full(sessions, float(bankroll))
+    peak = money.copy()
+    max_drawdown = np.zeros(sessions)
+    hands_played = np.zeros(sessions, dtype=np.int64)
+    playing = np.ones(sessions, dtype=bool)
+    bets = scheme.first_bets(sessions)
+
+    for _ in range(hands_per_session):
+        hand_rewards = rng.choice(rewards, size=sessions, p=probabilities)
+        stakes = np.where(playing, np.minimum(bets, money / worst_loss), 0.0)
+        money += stakes * hand_rewards
+        hands_played += playing
+        np.maximum(peak, money, out=peak)
+        np.maximum(max_drawdown, peak - money, out=max_drawdown)
+        bets = scheme.next_bets(bets, hand_rewards)
+        playing &= money >= scheme.unit
+        if not playing.any():
+            break
+
+    return SessionReport(money - bankroll, max_drawdown, money < scheme.unit,
+                         hands_played, bankroll)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("checkpoint", nargs="?",
+                        help=".npz checkpoint or training_results.json (default: Basic Strategy)")
+    parser.add_argument("--scheme", choices=sorted(SCHEMES), default="flat")
+    parser.add_argument("--unit", type=float, default=1.0)
+    parser.add_argument("--bankroll", type=float, default=100.0)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--hands", type=int, default=200, help="Hands per session")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.checkpoint:
+        policy = policy_from_values(load_q_values(args.checkpoint)[0])
+    else:
+        policy = basic_strategy_policy()
+    rewards, probabilities = outcome_distribution(policy, seed=args.seed)
+    ev = float(rewards @ probabilities)
+    print("Hand outcomes: " + ", ".join(f"{r:+.1f}: {p:.2%}" for r, p in zip(rewards, probabilities))
+          + f" (EV {ev:+.4f})")
+
+    report = simulate_sessions(rewards, probabilities, SCHEMES[args.scheme](args.unit),
+                               args.sessions, args.hands, args.bankroll, args.seed)
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Bounded, drop-oldest channel for handing snapshots between threads."""
+import threading
+from collections import deque
+
+
+class SnapshotChannel:
+    """Bounded channel where a full buffer drops its oldest item.
+
+    The producer never blocks, so a slow consumer (e.g. the renderer) can't
+    stall the producer (the trainer); it just sees fewer intermediate states.
+    """
+
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=maxsize)
+        self._condition = threading.Condition()
+        self.dropped = 0  # Items overwritten before being consumed
+
+    def publish(self, item):
+        with self._condition:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify()
+
+    def pending(self):
+        return len(self._items) > 0
+
+    def latest(self):
+        """Returns the newest item and discards older ones, or None if empty."""
+        with self._condition:
+            if not self._items:
+                return None
+            item = self._items[-1]
+            self.dropped += len(self._items) - 1
+            self._items.clear()
+            return item
+
+    def get(self, timeout=None):
+        """Returns the oldest item, waiting up to timeout seconds. None on timeout."""
+        with self._condition:
+            if not self._condition.wait_for(self.pending, timeout):
+                return None
+            return self._items.popleft()
@@ -0,0 +1,59 @@
+"""Binary Q-table checkpoints.
+
+A checkpoint is an .npz file holding the dense (N_STATES, N_ACTIONS) Q array
+plus a boolean mask of the states that were ever visited, so it loads
+without rebuilding tuple keys from strings. training_results.json files are
+still accepted by load_q_values(). Other .npz layouts, such as the
+card-counting checkpoints of counting.py, carry a 'kind' marker and are
+rejected with a ValueError instead of a KeyError.
+"""
+import json
+import os
+
+import numpy as np
+
+from .agent import DenseQTable, N_ACTIONS, N_STATES, q_table_to_array, state_index
+
+
+def _parse_state_key(key):
+    """'(17, 7, 0)' -> (17, 7, 0)"""
+    return tuple(int(part) for part in key.strip('()').split(','))
+
+
+def q_table_arrays(q_table):
+    """Returns (values, visited) for a dict-like or DenseQTable Q-table."""
+    if isinstance(q_table, DenseQTable):
+        values = np.array(q_table.values, dtype=np.float64)
+        visited = np.any(values != 0.0, axis=1)
+    else:
+        values = q_table_to_array(q_table)
+        visited = np.zeros(N_STATES, dtype=bool)
+        visited[[state_index(state) for state in q_table]] = True
+    return values, visited
+
+
+def save_checkpoint(path, q_table, **extra_arrays):
+    """Writes q_table (and any extra named arrays) to an .npz checkpoint."""
+    values, visited = q_table_arrays(q_table)
+    np.savez_compressed(path, q_values=values, visited=visited, **extra_arrays)
+
+
+def load_q_values(path):
+    """Loads (values, visited) from an .npz checkpoint or a training_results.json."""
+    if os.path.splitext(path)[1] == '.json':
+        with open(path, 'r') as f:
+            q_table = json.load(f)['q_table']
+        values = np.zeros((N_STATES, N_ACTIONS))
+        visited = np.zeros(N_STATES, dtype=bool)
+        indices = [state_index(_parse_state_key(key)) for key in q_table]
+        if indices:
+            values[indices] = list(q_table.values())
+            visited[indices] = True
+        return values, visited
+
+    with np.load(path) as checkpoint:
+        if 'visited' not in checkpoint.files:
+            kind = str(checkpoint['kind']) if 'kind' in checkpoint.files else "unknown"
+            raise ValueError(f"{path} is not a Q-table checkpoint (kind: {kind}); "
+                             f"load counting checkpoints with counting.load_counting_checkpoint()")
+        return checkpoint['q_values'], checkpoint['visited']
@@ -0,0 +1,118 @@
+"""Incremental convergence tracking for early stopping.
+
+ConvergenceTracker wraps the Q-update and, in O(1) per update, maintains:
+
+- the greedy action of every state, and how many states' greedy actions
+  differ from the start of the current window,
+- the largest single Q-value change in the current window,
+- how many visited states agree with a reference policy table (e.g. Basic
+  Strategy), if one is given.
+
+At the end of each window of episodes it decides whether the policy is
+stable: at most max_changed_states net flips (and, optionally, no Q change
+above max_delta) for patience consecutive windows, or reference agreement at
+or above agreement_threshold.
+"""
+import numpy as np
+
+from .agent import N_STATES, q_update, state_index
+
+
+class ConvergenceTracker:
+    def __init__(self, window=1000, patience=5, max_changed_states=12, max_delta=None,
+                 reference=None, agreement_threshold=None):
+        self.window = window
+        self.patience = patience
+        self.max_changed_states = max_changed_states
+        self.max_delta = max_delta
+        self.reference = None if reference is None else np.asarray(reference).reshape(N_STATES)
+        self.agreement_threshold = agreement_threshold
+
+        self.greedy = np.zeros(N_STATES, dtype=np.int8)  # argmax of an all-zero row is Stand
+        self.visited = np.zeros(N_STATES, dtype=bool)
+        self.visited_count = 0
+        self.agree_count = 0
+        self.history = []  # (episode, changed_states, max_delta, agreement) per window
+        self.converged_episode = None
+        self.reason = ""
+        self._start_window(0)
+
+    def _start_window(self, episode):
+        self.window_start_greedy = self.greedy.copy()
+        self.window_start_episode = episode
+        self.changed_states = 0
+        self.window_max_delta = 0.0
+
+    def wrap(self, update=q_update):
+        """Returns an update function that applies update and records its effect."""
+        def tracked_update(q_table, state, action, reward, new_state, learning_rate,
+                           discount_factor):
+            old_value = q_table[state][action]
+            update(q_table, state, action, reward, new_state, learning_rate, discount_factor)
+            self.record(state_index(state), q_table[state], old_value, action)
+        return tracked_update
+
+    def record(self, index, q_values, old_value, action):
+        """Records one update of q_values[action] (previously old_value) for state index."""
+        delta = abs(q_values[action] - old_value)
+        if delta > self.window_max_delta:
+            self.window_max_delta = delta
+
+        if not self.visited[index]:
+            self.visited[index] = True
+            self.visited_count += 1
+            if self.reference is not None:
+                self.agree_count += int(self.greedy[index] == self.reference[index])
+
+        new_greedy = int(np.argmax(q_values))
+        old_greedy = int(self.greedy[index])
+        if new_greedy == old_greedy:
+            return
+        self.greedy[index] = new_greedy
+        start = int(self.window_start_greedy[index])
+        self.changed_states += int(new_greedy != start) - int(old_greedy != start)
+        if self.reference is not None:
+            ref = int(self.reference[index])
+            self.agree_count += int(new_greedy == ref) - int(old_greedy == ref)
+
+    def agreement(self):
+        """Share of visited states whose greedy action matches the reference."""
+        if self.reference is None or not self.visited_count:
+            return None
+        return self.agree_count / self.visited_count
+
+    def end_episode(self, episode):
+        """Call after every episode. Returns True once the policy counts as converged."""
+        if self.converged_episode is not None:
+            return True
+        if episode - self.window_start_episode < self.window:
+            return False
+
+        agreement = self.agreement()
+        self.history.append((episode, self.changed_states, float(self.window_max_delta),
+                             agreement))
+        self._start_window(episode)
+
+        if self.agreement_threshold is not None and agreement is not None \
+                and agreement >= self.agreement_threshold:
+            self.converged_episode = episode
+            self.reason = f"reference agreement {agreement:.1%}"
+        elif len(self.history) >= self.patience and all(
+                changed <= self.max_changed_states and
+                (self.max_delta is None or delta <= self.max_delta)
+                for _, changed, delta, _ in self.history[-self.patience:]):
+            self.converged_episode = episode
+            self.reason = f"policy stable for {self.patience} windows"
+        return self.converged_episode is not None
+
+    def results(self):
+        return {
+            "converged_episode": self.converged_episode,
+            "reason": self.reason,
+            "window": self.window,
+            "history": [
+                {"episode": episode, "changed_states": changed, "max_q_delta": delta,
+                 "reference_agreement": agreement}
+                for episode, changed, delta, agreement in self.history
+            ],
+        }
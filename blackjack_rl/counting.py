@@ -0,0 +1,297 @@
+"""Card-counting state and memory-bounded Q storage for a persistent shoe.
+
+With a Shoe that persists across hands, the cards already played change the
+odds, so get_state() alone is no longer sufficient. ExtendedStateSpace adds two
+components to the state:
+
+- the Hi-Lo true count (running count per deck remaining), rounded and
+  clipped to true_counts,
+- shoe penetration: how far the shoe is toward the cut card, in
+  penetration_buckets equal steps.
+
+The running count only covers cards the player has seen, so the dealer's
+hole card is left out until it is revealed.
+
+make_q_table() stores the Q-table densely when the space fits in
+max_dense_bytes. Otherwise it uses OpenAddressingQTable, which keeps one
+flat key array and one value array (no per-state ndarray objects) and stops
+growing at max_bytes. Checkpoints store only the visited rows, keyed by
+space.index(), and are marked kind='counting'. checkpoint.load_q_values()
+rejects them; load_counting_checkpoint() reads them back.
+
+    python -m blackjack_rl.counting --episodes 200000 --decks 6 --true-count-range 5
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from . import agent
+from .agent import DenseQTable, N_ACTIONS, N_STATES, STATE_SHAPE, state_index
+from .game import BlackjackGame, Shoe, get_state
+
+DENSE_MAX_BYTES = 4 << 20  # Use a dense table up to 4 MiB of Q values
+
+
+class ExtendedStateSpace:
+    """(player_sum, dealer_upcard, usable_ace, true_count, penetration_bucket) states."""
+
+    def __init__(self, true_counts=range(-3, 4), penetration_buckets=4):
+        self.true_counts = true_counts
+        self.penetration_buckets = penetration_buckets
+        self.shape = STATE_SHAPE + (len(true_counts), penetration_buckets)
+        self.size = N_STATES * len(true_counts) * penetration_buckets
+
+    def state(self, game):
+        """Extended state of the hand in progress; game.deck must be a Shoe."""
+        shoe = game.deck
+        running_count = shoe.running_count
+        unseen = len(shoe.cards)
+        if not game.game_over and len(game.dealer_hand.cards) > 1:
+            running_count -= shoe.HI_LO[game.dealer_hand.cards[1].rank]  # Hole card
+            unseen += 1
+        true_count = round(running_count * 52 / max(unseen, 1))
+        true_count = min(max(true_count, self.true_counts.start), self.true_counts.stop - 1)
+        bucket = int(shoe.dealt_fraction() / shoe.penetration * self.penetration_buckets)
+        bucket = min(bucket, self.penetration_buckets - 1)
+        base = get_state(game.player_hand, game.dealer_hand)
+        return base + (true_count, bucket)
+
+    def index(self, state):
+        """Row of an extended state in a dense (size, N_ACTIONS) array."""
+        true_count, bucket = state[3], state[4]
+        return ((state_index(state[:3]) * len(self.true_counts) +
+                 true_count - self.true_counts.start) * self.penetration_buckets + bucket)
+
+    def index_to_state(self, index):
+        rest, bucket = divmod(index, self.penetration_buckets)
+        base, count_idx = divmod(rest, len(self.true_counts))
+        return agent.index_to_state(base) + (self.true_counts.start + count_idx, bucket)
+
+
+# --- Q Storage ---
+
+class ExtendedDenseQTable(DenseQTable):
+    """DenseQTable over an ExtendedStateSpace: one (space.size, N_ACTIONS) array."""
+
+    def __init__(self, space, values=None):
+        self.space = space
+        super().__init__(np.zeros((space.size, N_ACTIONS)) if values is None else values)
+
+    def __getitem__(self, state):
+        return self.values[self.space.index(state)]
+
+    def to_dict(self):
+        visited = np.flatnonzero(np.any(self.values != 0.0, axis=1))
+        return {self.space.index_to_state(i): self.values[i].copy() for i in visited}
+
+    def arrays(self):
+        """(keys, values) of the visited rows, as in OpenAddressingQTable.arrays()."""
+        keys = np.flatnonzero(np.any(self.values != 0.0, axis=1))
+        return keys, self.values[keys]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+
+class OpenAddressingQTable:
+    """Hash table of Q rows keyed by space.index(state), with a memory cap.
+
+    Keys live in one int64 array (-1 = empty slot) and rows in one
+    (capacity, N_ACTIONS) float64 array, probed linearly from a Fibonacci
+    hash. The table doubles at max_load until doubling would exceed
+    max_bytes. After that it stops inserting at max_load, so probe chains
+    stay short: further new states get a zero row that is not stored
+    (counted in overflow). initial_capacity is rounded up to a power of two.
+    """
+
+    _EMPTY = -1
+    _SLOT_BYTES = 8 + 8 * N_ACTIONS
+
+    def __init__(self, space, max_bytes=64 << 20, initial_capacity=1024, max_load=0.7):
+        self.space = space
+        self.max_bytes = max_bytes
+        self.max_load = max_load
+        self.overflow = 0
+        self._allocate(1 << max(initial_capacity - 1, 1).bit_length())
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self._bits = capacity.bit_length() - 1  # capacity is a power of two
+        self._mask = capacity - 1
+        self.keys = np.full(capacity, self._EMPTY, dtype=np.int64)
+        self.values = np.zeros((capacity, N_ACTIONS))
+        self.size = 0
+
+    def _slot(self, key):
+        """Slot holding key, or the empty slot where it would go."""
+        slot = ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - self._bits)
+        keys = self.keys
+        while True:
+            found = keys[slot]
+            if found == key or found == self._EMPTY:
+                return slot
+            slot = (slot + 1) & self._mask
+
+    def _grow(self):
+        old_keys, old_values = self.keys, self.values
+        self._allocate(self.capacity * 2)
+        for key, row in zip(old_keys.tolist(), old_values):
+            if key != self._EMPTY:
+                slot = self._slot(key)
+                self.keys[slot] = key
+                self.values[slot] = row
+                self.size += 1
+
+    def __getitem__(self, state):
+        key = self.space.index(state)
+        slot = self._slot(key)
+        if self.keys[slot] == key:
+            return self.values[slot]
+
+        if self.size + 1 > self.capacity * self.max_load:
+            if self.capacity * 2 * self._SLOT_BYTES > self.max_bytes:  # At the cap
+                self.overflow += 1
+                return np.zeros(N_ACTIONS)
+            self._grow()
+            slot = self._slot(key)
+        self.keys[slot] = key
+        self.size += 1
+        return self.values[slot]
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, state):
+        key = self.space.index(state)
+        return self.keys[self._slot(key)] == key
+
+    def clear(self):
+        self.keys.fill(self._EMPTY)
+        self.values.fill(0.0)
+        self.size = 0
+        self.overflow = 0
+
+    def arrays(self):
+        """(keys, values) of the stored rows, keys being space.index() values."""
+        used = self.keys != self._EMPTY
+        return self.keys[used], self.values[used]
+
+    def to_dict(self):
+        keys, values = self.arrays()
+        return {self.space.index_to_state(int(k)): row.copy() for k, row in zip(keys, values)}
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.values.nbytes
+
+
+def make_q_table(space, max_dense_bytes=DENSE_MAX_BYTES, max_bytes=64 << 20):
+    """Dense table if space fits in max_dense_bytes, else a capped open-addressing table."""
+    if space.size * N_ACTIONS * 8 <= max_dense_bytes:
+        return ExtendedDenseQTable(space)
+    return OpenAddressingQTable(space, max_bytes)
+
+
+def save_counting_checkpoint(path, q_table):
+    """Writes the stored rows of an extended Q-table to an .npz file."""
+    keys, values = q_table.arrays()
+    space = q_table.space
+    np.savez_compressed(path, kind='counting', keys=keys, q_values=values,
+                        shape=np.array(space.shape), true_count_start=space.true_counts.start)
+
+
+def load_counting_checkpoint(path, max_dense_bytes=DENSE_MAX_BYTES, max_bytes=64 << 20):
+    """Rebuilds the ExtendedStateSpace and Q-table written by save_counting_checkpoint()."""
+    with np.load(path) as checkpoint:
+        if 'kind' not in checkpoint.files or str(checkpoint['kind']) != 'counting':
+            raise ValueError(f"{path} is not a counting checkpoint")
+        keys, values = checkpoint['keys'], checkpoint['q_values']
+        shape, start = checkpoint['shape'], int(checkpoint['true_count_start'])
+    space = ExtendedStateSpace(range(start, start + int(shape[3])), int(shape[4]))
+    q_table = make_q_table(space, max_dense_bytes, max_bytes)
+    for key, row in zip(keys.tolist(), values):
+        q_table[space.index_to_state(key)][:] = row
+    return q_table
+
+
+# --- Training ---
+
+def train_counting(episodes=agent.EPISODES, space=None, q_table=None, num_decks=6,
+                   penetration=0.75, game_seed=agent.GAME_RNG_SEED,
+                   epsilon_seed=agent.EPSILON_RNG_SEED, learning_rate=agent.LEARNING_RATE,
+                   discount_factor=agent.DISCOUNT_FACTOR):
+    """Trains on extended states, all hands dealt from one persistent Shoe.
+
+    The shoe is reshuffled between hands once the cut card is reached.
+    Returns (q_table, stats).
+    """
+    if space is None:
+        space = ExtendedStateSpace()
+    if q_table is None:
+        q_table = make_q_table(space)
+    rng = random.Random(epsilon_seed)
+    shoe = Shoe(num_decks, penetration, seed=game_seed)
+    game = BlackjackGame(deck=shoe)
+    total_reward = 0.0
+    updates = 0
+
+    start_time = time.perf_counter()
+    for episode in range(1, episodes + 1):
+        if shoe.needs_shuffle():
+            shoe.reshuffle()
+        _, reward, steps = agent.play_episode(
+            game, q_table, agent.epsilon_at(episode), rng, learning_rate, discount_factor,
+            state_fn=space.state)
+        total_reward += reward
+        updates += steps
+    elapsed = time.perf_counter() - start_time
+
+    stats = {
+        "episodes": episodes,
+        "updates": updates,
+        "elapsed_seconds": elapsed,
+        "updates_per_second": updates / elapsed if elapsed > 0 else 0.0,
+        "mean_reward": total_reward / episodes if episodes else 0.0,
+        "shuffles": shoe.shuffles,
+        "stored_states": len(q_table.arrays()[0]),
+        "q_table_bytes": q_table.nbytes,
+        "overflow": getattr(q_table, "overflow", 0),
+    }
+    return q_table, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--episodes", type=int, default=agent.EPISODES)
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--penetration", type=float, default=0.75,
+                        help="Dealt fraction of the shoe at which it is reshuffled")
+    parser.add_argument("--true-count-range", type=int, default=3,
+                        help="True counts are clipped to [-N, N]")
+    parser.add_argument("--penetration-buckets", type=int, default=4)
+    parser.add_argument("--max-dense-bytes", type=int, default=DENSE_MAX_BYTES)
+    parser.add_argument("--max-bytes", type=int, default=64 << 20,
+                        help="Memory cap for the open-addressing table")
+    parser.add_argument("--checkpoint", default="counting_q.npz")
+    args = parser.parse_args()
+
+    space = ExtendedStateSpace(range(-args.true_count_range, args.true_count_range + 1),
+                               args.penetration_buckets)
+    q_table = make_q_table(space, args.max_dense_bytes, args.max_bytes)
+    q_table, stats = train_counting(args.episodes, space, q_table, args.decks,
+                                    args.penetration)
+    print(f"{type(q_table).__name__}: {stats['stored_states']:,} of {space.size:,} states "
+          f"stored in {stats['q_table_bytes'] / 1024:,.0f} KiB "
+          f"({stats['overflow']:,} overflow lookups)")
+    print(f"{stats['episodes']:,} episodes, {stats['shuffles']:,} shuffles, "
+          f"{stats['updates_per_second']:,.0f} updates/s, "
+          f"mean reward {stats['mean_reward']:+.4f}")
+    save_counting_checkpoint(args.checkpoint, q_table)
+    print(f"Saved Q-table to {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
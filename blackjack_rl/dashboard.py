@@ -0,0 +1,323 @@
+"""Grid dashboard: one small table per training worker process, fed from shared memory.
+
+Each worker process runs its own Trainer (different seeds or hyperparameters)
+at full speed. Its Snapshots are not pickled or queued: BoardWriter encodes
+each one into that worker's fixed-size record in a SnapshotBoard, one
+multiprocessing.shared_memory block packed with struct. Card codes become
+small integers and messages fixed-length bytes.
+
+Every record is guarded by a seqlock, so neither side ever takes a lock. The
+writer makes the sequence number odd, writes the fields, then makes it even
+again. The reader copies the record and keeps the copy only if the sequence
+was the same even number before and after. Otherwise it retries a few times
+and then keeps showing that worker's previous frame. Workers never wait for
+the UI, and the UI never waits for a worker, so it can draw the tiles at a
+steady frame rate.
+
+    python -m blackjack_rl.dashboard --workers 6
+    python -m blackjack_rl.dashboard --workers 4 --learning-rates 0.01,0.05,0.1,0.2
+"""
+import argparse
+import math
+import multiprocessing as mp
+import os
+import struct
+import sys
+import time
+from contextlib import redirect_stdout
+from multiprocessing import shared_memory
+
+from . import agent
+from .trainer import Snapshot, Trainer
+
+STOP_CHECK_EVERY = 64  # Episodes a worker plays between checks of the stop event
+# Workers at full speed publish at most this often; the UI draws at most 60 FPS anyway
+PUBLISH_INTERVAL = 1 / 240
+MAX_CARDS = 12  # Most cards a hand can hold is 11 (A,A,A,A,2,2,2,2,3,3,3)
+CARD_CODES = ['card_back'] + [f"card_{rank}{suit}" for suit in "HDCS"
+                              for rank in ('A', '2', '3', '4', '5', '6', '7', '8', '9',
+                                           '10', 'J', 'Q', 'K')]
+CARD_INDEX = {code: i for i, code in enumerate(CARD_CODES)}
+
+# Record layout: an 8-byte sequence number followed by the Snapshot fields.
+# Cards are indexes into CARD_CODES (-1 = no card).
+SEQUENCE = struct.Struct("=Q")
+BODY = struct.Struct(f"={MAX_CARDS}b{MAX_CARDS}bhh?24s24sqqdqqqdd")
+RECORD_SIZE = -(-(SEQUENCE.size + BODY.size) // 8) * 8  # Keeps every sequence 8-byte aligned
+
+
+# --- Shared Snapshot Board ---
+
+class SnapshotBoard:
+    """One seqlock-guarded Snapshot record per worker in a shared memory block.
+
+    The creating process owns the block and must call unlink() when done;
+    workers attach by name and only call close().
+    """
+
+    def __init__(self, slots, name=None, create=True):
+        self.slots = slots
+        self.shm = shared_memory.SharedMemory(name=name, create=create,
+                                              size=slots * RECORD_SIZE)
+        if create:
+            self.shm.buf[:] = bytes(len(self.shm.buf))
+        self.torn_reads = 0  # Reads that gave up while a writer kept the record busy
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def read(self, slot, retries=16):
+        """Latest complete Snapshot in slot, or None if it was never written or stayed busy."""
+        buf = self.shm.buf
+        offset = slot * RECORD_SIZE
+        for _ in range(retries):
+            before, = SEQUENCE.unpack_from(buf, offset)
+            if before & 1:
+                continue  # Writer inside the record
+            fields = BODY.unpack_from(buf, offset + SEQUENCE.size)
+            if SEQUENCE.unpack_from(buf, offset)[0] == before:
+                return None if before == 0 else _decode(fields)
+        self.torn_reads += 1
+        return None
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _decode(fields):
+    dealer_cards, player_cards = fields[:MAX_CARDS], fields[MAX_CARDS:2 * MAX_CARDS]
+    (dealer_value, player_value, dealer_revealed, result_message, agent_action, episode,
+     episodes, epsilon, total_wins, total_losses, total_pushes, total_money,
+     stake) = fields[2 * MAX_CARDS:]
+    return Snapshot(
+        dealer_cards=[CARD_CODES[i] for i in dealer_cards if i >= 0],
+        player_cards=[CARD_CODES[i] for i in player_cards if i >= 0],
+        dealer_value=dealer_value,
+        dealer_revealed=dealer_revealed,
+        player_value=player_value,
+        result_message=result_message.rstrip(b"\0").decode(),
+        agent_action=agent_action.rstrip(b"\0").decode(),
+        episode=episode,
+        episodes=episodes,
+        epsilon=epsilon,
+        total_wins=total_wins,
+        total_losses=total_losses,
+        total_pushes=total_pushes,
+        total_money=total_money,
+        stake=stake,
+    )
+
+
+def _card_indexes(codes):
+    indexes = [CARD_INDEX.get(code, 0) for code in codes[:MAX_CARDS]]
+    return indexes + [-1] * (MAX_CARDS - len(indexes))
+
+
+class BoardWriter:
+    """Channel stand-in that writes each published Snapshot into one board slot.
+
+    There must be only one writer per slot.
+    """
+
+    def __init__(self, board, slot):
+        self.buf = board.shm.buf
+        self.offset = slot * RECORD_SIZE
+        self.sequence, = SEQUENCE.unpack_from(self.buf, self.offset)
+
+    def publish(self, snapshot):
+        SEQUENCE.pack_into(self.buf, self.offset, self.sequence + 1)  # Odd: readers retry
+        BODY.pack_into(
+            self.buf, self.offset + SEQUENCE.size,
+            *_card_indexes(snapshot.dealer_cards), *_card_indexes(snapshot.player_cards),
+            snapshot.dealer_value, snapshot.player_value, snapshot.dealer_revealed,
+            snapshot.result_message.encode(), snapshot.agent_action.encode(),
+            snapshot.episode, snapshot.episodes, snapshot.epsilon, snapshot.total_wins,
+            snapshot.total_losses, snapshot.total_pushes, snapshot.total_money, snapshot.stake)
+        self.sequence += 2
+        SEQUENCE.pack_into(self.buf, self.offset, self.sequence)  # Even: record complete
+
+
+# --- Workers ---
+
+class BoardTrainer(Trainer):
+    """Trainer that publishes into a board slot at most every publish_interval seconds.
+
+    Without a step_delay a worker decides thousands of times per second. Building
+    and writing a Snapshot for each decision would cost far more than the few
+    frames the UI can show. With a step_delay every decision is published.
+    """
+
+    def __init__(self, writer, publish_interval=PUBLISH_INTERVAL, **trainer_kwargs):
+        super().__init__(writer, converged_checkpoint=None, **trainer_kwargs)
+        self.evaluator = None  # Daemon processes can't start their own
+        self.publish_interval = 0.0 if self.step_delay else publish_interval
+        self._next_publish = 0.0
+
+    def publish(self, force=False):
+        now = time.perf_counter()
+        if force or now >= self._next_publish:
+            self._next_publish = now + self.publish_interval
+            super().publish()
+
+
+def _worker(board_name, slots, slot, trainer_kwargs, stop):
+    """Trains one Trainer to completion (or until stop), publishing into its slot."""
+    board = SnapshotBoard(slots, name=board_name, create=False)
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):  # Interval prints
+        trainer = BoardTrainer(BoardWriter(board, slot), **trainer_kwargs)
+
+        def finished():
+            return trainer.episode >= trainer.episodes or trainer.stopped_early()
+
+        trainer.publish(force=True)
+        while not finished() and not stop.is_set():
+            for _ in range(STOP_CHECK_EVERY):
+                trainer.run_episode()
+                if finished():
+                    trainer.result_message = ("Converged!" if trainer.stopped_early()
+                                              else "Training Complete!")
+                    trainer.publish(force=True)
+                    break
+    del trainer  # Drop the writer's buffer view so the block can be closed
+    board.close()
+
+
+def worker_configs(workers, episodes=agent.EPISODES, step_delay=0.0, learning_rates=None,
+                   epsilon_decays=None):
+    """Trainer keyword arguments per worker: distinct seeds, optional hyperparameter lists.
+
+    A hyperparameter list shorter than workers is cycled.
+    """
+    configs = []
+    for i in range(workers):
+        config = {
+            "episodes": episodes,
+            "step_delay": step_delay,
+            "game_seed": agent.GAME_RNG_SEED + i * 10_000_000,  # Disjoint episode seeds
+            "epsilon_seed": agent.EPSILON_RNG_SEED + i,
+        }
+        if learning_rates:
+            config["learning_rate"] = learning_rates[i % len(learning_rates)]
+        if epsilon_decays:
+            config["epsilon_decay"] = epsilon_decays[i % len(epsilon_decays)]
+        configs.append(config)
+    return configs
+
+
+def _label(slot, config):
+    parts = [f"#{slot}"]
+    if "learning_rate" in config:
+        parts.append(f"lr {config['learning_rate']}")
+    if "epsilon_decay" in config:
+        parts.append(f"decay {config['epsilon_decay']}")
+    if len(parts) == 1:
+        parts.append(f"seed {config['game_seed']}")
+    return "  ".join(parts)
+
+
+# --- Dashboard Window ---
+
+def run_dashboard(configs, fps=30, columns=None, seconds=None):
+    """Starts one worker per config and tiles their tables until the window is closed
+    (or for seconds, if given).
+
+    Returns {"frames", "seconds", "fps", "torn_reads"} for the session.
+    """
+    import pygame
+    from . import render
+
+    slots = len(configs)
+    columns = columns or math.ceil(math.sqrt(slots))
+    rows = math.ceil(slots / columns)
+    tile_size = (render.SCREEN_WIDTH // columns, render.SCREEN_HEIGHT // rows)
+
+    ctx = mp.get_context()
+    board = SnapshotBoard(slots)
+    stop = ctx.Event()
+    workers = [ctx.Process(target=_worker, name=f"dashboard-worker-{slot}", daemon=True,
+                           args=(board.name, slots, slot, config, stop))
+               for slot, config in enumerate(configs)]
+    latest = [None] * slots
+    frames = 0
+    try:
+        # Fork the workers before pygame.init() starts SDL's threads
+        for worker in workers:
+            worker.start()
+        pygame.init()
+        screen = pygame.display.set_mode((render.SCREEN_WIDTH, render.SCREEN_HEIGHT))
+        pygame.display.set_caption("Blackjack Q-Learning Dashboard")
+        render.init_fonts()
+        render.load_all_assets()
+        render.load_tile_assets(tile_size)
+        tiles = [pygame.Rect((slot % columns) * tile_size[0], (slot // columns) * tile_size[1],
+                             *tile_size) for slot in range(slots)]
+        labels = [_label(slot, config) for slot, config in enumerate(configs)]
+        clock = pygame.time.Clock()
+        start_time = time.perf_counter()
+        running = True
+        while running and (seconds is None or time.perf_counter() - start_time < seconds):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN
+                                                 and event.key == pygame.K_ESCAPE):
+                    running = False
+            screen.fill(render.BLACK)
+            for slot, rect in enumerate(tiles):
+                snapshot = board.read(slot)
+                if snapshot is not None:
+                    latest[slot] = snapshot
+                if latest[slot] is not None:
+                    render.draw_table_tile(screen, rect, latest[slot], labels[slot])
+            pygame.display.flip()
+            frames += 1
+            clock.tick(fps)
+            if frames % fps == 0:
+                pygame.display.set_caption(
+                    f"Blackjack Q-Learning Dashboard ({clock.get_fps():.0f} FPS)")
+        elapsed = time.perf_counter() - start_time
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        torn_reads = board.torn_reads
+        board.close()
+        board.unlink()
+        pygame.quit()
+    return {"frames": frames, "seconds": elapsed, "fps": frames / elapsed if elapsed else 0.0,
+            "torn_reads": torn_reads}
+
+
+def _floats(text):
+    return [float(value) for value in text.split(",")] if text else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--episodes", type=int, default=agent.EPISODES)
+    parser.add_argument("--step-delay", type=float, default=0.0,
+                        help="Seconds each worker holds every decision (0 = full speed)")
+    parser.add_argument("--learning-rates", type=_floats,
+                        help="Comma-separated, assigned to workers in turn")
+    parser.add_argument("--epsilon-decays", type=_floats,
+                        help="Comma-separated, assigned to workers in turn")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--columns", type=int)
+    parser.add_argument("--seconds", type=float, help="Close the window after this long")
+    args = parser.parse_args()
+
+    configs = worker_configs(args.workers, args.episodes, args.step_delay, args.learning_rates,
+                             args.epsilon_decays)
+    session = run_dashboard(configs, args.fps, args.columns, args.seconds)
+    print(f"{session['frames']} frames in {session['seconds']:.1f}s "
+          f"({session['fps']:.1f} FPS), {session['torn_reads']} torn reads skipped",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+"""Actor-learner training over TCP.
+
+Actors play BlackjackGame episodes with an epsilon-greedy policy taken from
+the latest Q-table snapshot they fetched, and stream their transitions to a
+single learner in compressed batches. The learner owns the Q-table, applies
+the Q-learning updates, and publishes a new snapshot version every
+publish_every transitions. Actors only share a socket with the learner, so
+they can run on any machine that can reach it.
+
+    # Everything on localhost: learner thread + 4 actor processes
+    python -m blackjack_rl.distributed local --actors 4
+
+    # Across machines (the learner listens on 127.0.0.1 unless given --host)
+    python -m blackjack_rl.distributed learner --host 0.0.0.0 --port 5555 --actors 8 --checkpoint q.npz
+    python -m blackjack_rl.distributed actor --host learner-box --port 5555 --actor-id 0 --actors 8
+
+Wire format: every message is a 1-byte type, a 4-byte big-endian payload
+length and the payload. Transition batches and Q snapshots are zlib-compressed
+NumPy buffers; nothing is unpickled from the network. Payload sizes,
+decompressed sizes and state indices are all checked before use, and an actor
+that breaks the protocol is disconnected with a message on stderr.
+"""
+import argparse
+import multiprocessing as mp
+import random
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from . import agent
+from .agent import DenseQTable, N_ACTIONS, N_STATES, q_update, state_index
+from .checkpoint import save_checkpoint
+from .game import BlackjackGame
+
+DEFAULT_PORT = 5555
+
+# Message types
+MSG_GET_POLICY = b'P'  # actor -> learner, empty
+MSG_POLICY = b'Q'  # learner -> actor: version (uint64) + compressed float64 Q values
+MSG_BATCH = b'T'  # actor -> learner: compressed TRANSITION_DTYPE array
+MSG_ACK = b'A'  # learner -> actor: latest version (uint64)
+MSG_BYE = b'X'  # actor -> learner, empty
+
+HEADER = struct.Struct('!cI')
+VERSION = struct.Struct('!Q')
+
+# next_state is -1 for terminal transitions
+TRANSITION_DTYPE = np.dtype([('state', '<i2'), ('action', 'i1'),
+                             ('reward', '<f4'), ('next_state', '<i2')])
+
+# Limits on what a peer can make us allocate
+MAX_PAYLOAD_BYTES = 1 << 24  # Per message, as sent
+MAX_BATCH_TRANSITIONS = 1 << 20  # Per decompressed batch (~9 MiB)
+SNAPSHOT_BYTES = N_STATES * N_ACTIONS * np.dtype(np.float64).itemsize
+
+
+class ProtocolError(ConnectionError):
+    """The peer sent a malformed, oversized or out-of-range message."""
+
+
+def _decompress(payload, max_size):
+    """zlib.decompress that refuses to produce more than max_size bytes."""
+    decompressor = zlib.decompressobj()
+    try:
+        raw = decompressor.decompress(payload, max_size)
+    except zlib.error as e:
+        raise ProtocolError(f"Corrupt compressed payload: {e}") from None
+    if decompressor.unconsumed_tail or not decompressor.eof:
+        raise ProtocolError(f"Compressed payload is truncated or over {max_size} bytes")
+    return raw
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed mid-message")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_message(sock, kind, payload=b''):
+    sock.sendall(HEADER.pack(kind, len(payload)) + payload)
+
+
+def recv_message(sock):
+    kind, size = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if size > MAX_PAYLOAD_BYTES:
+        raise ProtocolError(f"Message of {size} bytes exceeds {MAX_PAYLOAD_BYTES}")
+    return kind, _recv_exact(sock, size) if size else b''
+
+
+# --- Learner ---
+
+class Learner:
+    """Owns the Q-table; applies streamed transitions and serves snapshots."""
+
+    def __init__(self, publish_every=5000, learning_rate=agent.LEARNING_RATE,
+                 discount_factor=agent.DISCOUNT_FACTOR):
+        self.q_table = DenseQTable()
+        self.publish_every = publish_every
+        self.learning_rate = learning_rate
+        self.discount_factor = discount_factor
+
+        self.version = 0
+        self.transitions = 0
+        self.batches = 0
+        self.bytes_received = 0
+        self.raw_bytes_received = 0
+        self.finished_actors = 0
+        self._since_publish = 0
+        self._lock = threading.Lock()
+        self._snapshot = self._encode_snapshot()
+        self.all_done = threading.Condition(self._lock)
+
+    def _encode_snapshot(self):
+        return VERSION.pack(self.version) + zlib.compress(self.q_table.values.tobytes(), 1)
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot
+
+    def apply_batch(self, payload):
+        """Applies one compressed batch of transitions; returns the current version.
+
+        Raises ProtocolError, without touching the Q-table, if the batch is
+        oversized, misaligned or refers to states or actions that do not exist.
+        """
+        raw = _decompress(payload, MAX_BATCH_TRANSITIONS * TRANSITION_DTYPE.itemsize)
+        if len(raw) % TRANSITION_DTYPE.itemsize:
+            raise ProtocolError(f"Batch of {len(raw)} bytes is not a whole number of transitions")
+        batch = np.frombuffer(raw, dtype=TRANSITION_DTYPE)
+        if not (np.all((batch['state'] >= 0) & (batch['state'] < N_STATES)) and
+                np.all((batch['action'] >= 0) & (batch['action'] < N_ACTIONS)) and
+                np.all((batch['next_state'] >= -1) & (batch['next_state'] < N_STATES)) and
+                np.all(np.isfinite(batch['reward']))):
+            raise ProtocolError("Batch has out-of-range states, actions or rewards")
+        values = self.q_table.values
+        with self._lock:
+            for state, action, reward, next_state in batch.tolist():
+                old_q_value = values[state, action]
+                if next_state < 0:  # Terminal state
+                    target_q_value = reward
+                else:
+                    target_q_value = reward + self.discount_factor * values[next_state].max()
+                values[state, action] = old_q_value + \
+                    self.learning_rate * (target_q_value - old_q_value)
+
+            self.transitions += len(batch)
+            self.batches += 1
+            self.bytes_received += len(payload)
+            self.raw_bytes_received += len(raw)
+            self._since_publish += len(batch)
+            if self._since_publish >= self.publish_every:
+                self.version += 1
+                self._since_publish = 0
+                self._snapshot = self._encode_snapshot()
+            return self.version
+
+    def actor_finished(self):
+        with self._lock:
+            self.finished_actors += 1
+            self.all_done.notify_all()
+
+    def wait_for_actors(self, count, timeout=None):
+        with self._lock:
+            return self.all_done.wait_for(lambda: self.finished_actors >= count, timeout)
+
+    def serve(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Starts the TCP server on a background thread and returns it.
+
+        Listens on loopback only by default; pass host="0.0.0.0" for actors
+        on other machines.
+        """
+        learner = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                sock = self.request
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                try:
+                    self._serve(sock)
+                except ProtocolError as e:
+                    print(f"Dropping actor {self.client_address[0]}:{self.client_address[1]}: {e}",
+                          file=sys.stderr)
+                except ConnectionError:
+                    pass
+
+            def _serve(self, sock):
+                while True:
+                    kind, payload = recv_message(sock)
+                    if kind == MSG_GET_POLICY:
+                        send_message(sock, MSG_POLICY, learner.snapshot())
+                    elif kind == MSG_BATCH:
+                        version = learner.apply_batch(payload)
+                        send_message(sock, MSG_ACK, VERSION.pack(version))
+                    elif kind == MSG_BYE:
+                        learner.actor_finished()
+                        return
+                    else:
+                        raise ProtocolError(f"Unknown message type {kind!r}")
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True  # Other handler errors are printed by handle_error()
+
+        server = Server((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="learner", daemon=True).start()
+        return server
+
+
+# --- Actor ---
+
+class _TransitionRecorder:
+    """Stands in for q_update in play_episode: records transitions instead of learning."""
+
+    def __init__(self):
+        self.transitions = []
+
+    def __call__(self, q_table, state, action, reward, new_state, learning_rate, discount_factor):
+        self.transitions.append((state_index(state), action, reward,
+                                 -1 if new_state is None else state_index(new_state)))
+
+    def take_batch(self):
+        batch = np.array(self.transitions, dtype=TRANSITION_DTYPE)
+        self.transitions = []
+        return batch
+
+
+def _fetch_policy(sock):
+    send_message(sock, MSG_GET_POLICY)
+    kind, payload = recv_message(sock)
+    if kind != MSG_POLICY:
+        raise ConnectionError(f"Expected a policy snapshot, got {kind!r}")
+    if len(payload) < VERSION.size:
+        raise ProtocolError("Policy snapshot is missing its version")
+    version, = VERSION.unpack_from(payload)
+    raw = _decompress(payload[VERSION.size:], SNAPSHOT_BYTES)
+    if len(raw) != SNAPSHOT_BYTES:
+        raise ProtocolError(f"Policy snapshot has {len(raw)} bytes, expected {SNAPSHOT_BYTES}")
+    values = np.frombuffer(raw, dtype=np.float64)
+    return version, DenseQTable(values.reshape(N_STATES, N_ACTIONS).copy())
+
+
+def run_actor(host, port, actor_id=0, num_actors=1, episodes=agent.EPISODES,
+              batch_episodes=100, game_seed=agent.GAME_RNG_SEED,
+              epsilon_seed=agent.EPSILON_RNG_SEED):
+    """Plays this actor's share of the episodes and streams transitions to the learner.
+
+    Actor i plays global episodes i+1, i+1+num_actors, ... with the global
+    epsilon schedule, and refreshes its policy whenever the learner acks a
+    newer version. Returns the number of transitions sent.
+    """
+    rng = random.Random(epsilon_seed + actor_id)
+    recorder = _TransitionRecorder()
+    sent = 0
+    with socket.create_connection((host, port)) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        version, policy = _fetch_policy(sock)
+
+        my_episodes = range(actor_id + 1, episodes + 1, num_actors)
+        for count, episode in enumerate(my_episodes, 1):
+            game = BlackjackGame(seed=game_seed + episode)
+            agent.play_episode(game, policy, agent.epsilon_at(episode), rng,
+                               update=recorder)
+            if count % batch_episodes and count != len(my_episodes):
+                continue
+            if not recorder.transitions:
+                continue
+
+            batch = recorder.take_batch()
+            send_message(sock, MSG_BATCH, zlib.compress(batch.tobytes(), 1))
+            sent += len(batch)
+            kind, payload = recv_message(sock)
+            if kind != MSG_ACK or len(payload) != VERSION.size:
+                raise ProtocolError(f"Expected a batch ack, got {kind!r} ({len(payload)} bytes)")
+            latest, = VERSION.unpack(payload)
+            if latest != version:
+                version, policy = _fetch_policy(sock)
+
+        send_message(sock, MSG_BYE)
+    return sent
+
+
+def _actor_process(host, port, actor_id, num_actors, episodes, batch_episodes):
+    run_actor(host, port, actor_id, num_actors, episodes, batch_episodes)
+
+
+def run_local(num_actors=None, episodes=agent.EPISODES, batch_episodes=100,
+              publish_every=5000, port=0):
+    """Runs a learner thread and num_actors actor processes on localhost.
+
+    Returns (q_table, stats); raises RuntimeError if any actor fails.
+    """
+    if num_actors is None:
+        num_actors = mp.cpu_count()
+    learner = Learner(publish_every)
+    server = learner.serve("127.0.0.1", port)
+    port = server.server_address[1]
+
+    ctx = mp.get_context()
+    actors = [ctx.Process(target=_actor_process,
+                          args=("127.0.0.1", port, actor_id, num_actors, episodes, batch_episodes))
+              for actor_id in range(num_actors)]
+    start_time = time.perf_counter()
+    try:
+        for actor in actors:
+            actor.start()
+        for actor in actors:
+            actor.join()
+        for actor_id, actor in enumerate(actors):
+            if actor.exitcode != 0:
+                raise RuntimeError(f"Actor {actor_id} died with exit code {actor.exitcode}")
+        if not learner.wait_for_actors(num_actors, timeout=10):
+            raise RuntimeError(f"Only {learner.finished_actors} of {num_actors} actors "
+                               f"finished their episodes")
+        elapsed = time.perf_counter() - start_time
+    finally:
+        for actor in actors:
+            if actor.is_alive():
+                actor.terminate()
+        server.shutdown()
+        server.server_close()
+
+    stats = {
+        "actors": num_actors,
+        "episodes": episodes,
+        "transitions": learner.transitions,
+        "batches": learner.batches,
+        "policy_versions": learner.version,
+        "elapsed_seconds": elapsed,
+        "transitions_per_second": learner.transitions / elapsed if elapsed > 0 else 0.0,
+        "compression_ratio": (learner.raw_bytes_received / learner.bytes_received
+                              if learner.bytes_received else 0.0),
+    }
+    return learner.q_table, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("role", choices=["local", "learner", "actor"])
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Learner address to connect to, or to listen on (0.0.0.0 for all)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--actors", type=int, default=mp.cpu_count(),
+                        help="Total number of actors")
+    parser.add_argument("--actor-id", type=int, default=0)
+    parser.add_argument("--episodes", type=int, default=agent.EPISODES,
+                        help="Total episodes across all actors")
+    parser.add_argument("--batch-episodes", type=int, default=100,
+                        help="Episodes per transition batch sent by an actor")
+    parser.add_argument("--publish-every", type=int, default=5000,
+                        help="Transitions between published policy versions")
+    parser.add_argument("--checkpoint", default="distributed_q.npz")
+    args = parser.parse_args()
+
+    if args.role == "actor":
+        sent = run_actor(args.host, args.port, args.actor_id, args.actors,
+                         args.episodes, args.batch_episodes)
+        print(f"Actor {args.actor_id} sent {sent:,} transitions")
+        return
+
+    if args.role == "learner":
+        learner = Learner(args.publish_every)
+        server = learner.serve(args.host, args.port)
+        print(f"Learner listening on {args.host}:{args.port}, waiting for {args.actors} actors...")
+        start_time = time.perf_counter()
+        try:
+            learner.wait_for_actors(args.actors)
+        except KeyboardInterrupt:
+            pass
+        server.shutdown()
+        elapsed = time.perf_counter() - start_time
+        q_table = learner.q_table
+        print(f"Applied {learner.transitions:,} transitions in {elapsed:.2f}s "
+              f"({learner.transitions / elapsed:,.0f}/s), {learner.version} policy versions")
+    else:
+        q_table, stats = run_local(args.actors, args.episodes, args.batch_episodes,
+                                   args.publish_every)
+        print(f"{stats['actors']} actors: {stats['transitions']:,} transitions in "
+              f"{stats['elapsed_seconds']:.2f}s ({stats['transitions_per_second']:,.0f}/s), "
+              f"{stats['policy_versions']} policy versions, "
+              f"compression {stats['compression_ratio']:.1f}x")
+        evaluation = agent.evaluate_greedy(q_table, 20000)
+        print(f"Greedy EV {evaluation['mean_reward']:+.4f}, "
+              f"win rate {evaluation['win_rate_percent']:.2f}%")
+
+    save_checkpoint(args.checkpoint, q_table)
+    print(f"Saved Q-table to {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Greedy-policy evaluation in a background process.
+
+The win rate logged during training includes epsilon-greedy exploration.
+BackgroundEvaluator measures the greedy policy alone, off the training
+thread. Every `every` episodes the trainer copies the dense Q array
+(N_STATES x N_ACTIONS float64, a few KB) into a free shared-memory slot and
+queues the slot number. A worker process plays the greedy policy on the
+same pre-dealt evaluation hands each time (vectorized engine, fixed seed),
+so successive evaluations are directly comparable. It sends the result
+back on a queue.
+
+The trainer never waits. If every slot is still being evaluated, the
+snapshot is skipped (counted in `skipped`). Results are collected by
+poll(), which maybe_submit() calls every poll_every episodes.
+"""
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .agent import N_ACTIONS, N_STATES
+from .checkpoint import q_table_arrays
+from .strategy import greedy_policy
+from .vectorized import deal_streams, play_hands
+
+
+def _evaluation_worker(shm_name, slots, hands, seed, requests, results):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        snapshots = np.ndarray((slots, N_STATES, N_ACTIONS), dtype=np.float64, buffer=shm.buf)
+        streams = deal_streams(hands, np.random.default_rng(seed))  # Same hands every time
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            slot, episode, generation = request
+            rewards = play_hands(greedy_policy(snapshots[slot]), streams)[0]
+            results.put({
+                "slot": slot,
+                "generation": generation,
+                "episode": episode,
+                "mean_reward": float(rewards.mean()),
+                "win_rate_percent": float(np.mean(rewards > 0) * 100),
+                "loss_rate_percent": float(np.mean(rewards < 0) * 100),
+                "push_rate_percent": float(np.mean(rewards == 0) * 100),
+            })
+        del snapshots
+    finally:
+        shm.close()
+
+
+class BackgroundEvaluator:
+    """Evaluates Q snapshots greedily in a worker process without blocking the caller.
+
+    The worker process starts on the first submit, or on an explicit start().
+    Call close() when done.
+    """
+
+    def __init__(self, every=1000, hands=50_000, seed=1_000_000, slots=2, poll_every=100):
+        self.every = every
+        self.hands = hands
+        self.seed = seed
+        self.slots = slots
+        self.poll_every = poll_every
+        self.history = []  # Result dicts, in episode order
+        self.skipped = 0
+        self._generation = 0
+        self._free_slots = []
+        self._process = None
+
+    def start(self):
+        if self._process is not None:
+            return
+        self._free_slots = list(range(self.slots))
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self.slots * N_STATES * N_ACTIONS * 8)
+        self._snapshots = np.ndarray((self.slots, N_STATES, N_ACTIONS), dtype=np.float64,
+                                     buffer=self._shm.buf)
+        ctx = mp.get_context()
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        self._process = ctx.Process(
+            target=_evaluation_worker, name="greedy-evaluator", daemon=True,
+            args=(self._shm.name, self.slots, self.hands, self.seed, self._requests,
+                  self._results))
+        self._process.start()
+
+    def maybe_submit(self, episode, q_table):
+        """Queues a snapshot every `every` episodes and, every poll_every episodes,
+        collects finished evaluations. Returns the newly collected results.
+        """
+        new = self.poll() if episode % self.poll_every == 0 and self.in_flight() else []
+        if episode % self.every == 0:
+            self.submit(episode, q_table)
+        return new
+
+    def submit(self, episode, q_table):
+        """Copies q_table into a free slot and queues it; False if none is free."""
+        self.start()
+        if not self._free_slots:
+            self.skipped += 1
+            return False
+        slot = self._free_slots.pop()
+        self._snapshots[slot] = q_table_arrays(q_table)[0]
+        self._requests.put((slot, episode, self._generation))
+        return True
+
+    def in_flight(self):
+        """Number of snapshots queued or being evaluated."""
+        return 0 if self._process is None else self.slots - len(self._free_slots)
+
+    def poll(self, timeout=None):
+        """Collects finished evaluations; returns the new result dicts.
+
+        With a timeout, waits up to that long for each evaluation still in flight.
+        """
+        new = []
+        while self.in_flight():
+            try:
+                result = self._results.get(timeout=timeout) if timeout else \
+                    self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._free_slots.append(result.pop("slot"))
+            if result.pop("generation") == self._generation:
+                new.append(result)
+        self.history.extend(new)
+        return new
+
+    def discard_pending(self):
+        """Forgets the history; results of snapshots already queued are ignored."""
+        self._generation += 1
+        self.history = []
+        self.skipped = 0
+
+    def close(self, timeout=5.0):
+        """Waits for evaluations in flight, then stops the worker process."""
+        if self._process is None:
+            return
+        self.poll(timeout)
+        self._requests.put(None)
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+        self._snapshots = None
+        self._shm.close()
+        self._shm.unlink()
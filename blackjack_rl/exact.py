@@ -0,0 +1,462 @@
+"""Exact composition-dependent expected values for the finite deck.
+
+BlackjackGame deals every hand from a fresh Deck(num_decks=1), so the cards
+already on the table change what is left to draw. This solver recurses over
+the remaining deck's rank counts (a tuple of 10 counts, Ace first, tens last)
+to get exact stand/hit EVs and dealer outcome distributions. Both memo caches
+are size-bounded LRU caches keyed by those rank-count tuples, so memory stays
+bounded however many compositions are explored.
+
+The dealer's hole card is unseen but was dealt before the player acts, and
+the hand only reaches a player decision if the dealer has no Blackjack. The
+hole card is therefore drawn from the unseen cards, excluding the rank that
+would complete a dealer Blackjack.
+
+For the full action set (actions.py), opening_values() adds Double, Split and
+Surrender EVs for every two-card hand. Double and Surrender are exact. Split
+uses the usual approximation: both hands are valued against the same deck,
+without resplits.
+
+    python -m blackjack_rl.exact training_results.npz
+    python -m blackjack_rl.exact full_q.npz --full
+"""
+import argparse
+from collections import OrderedDict
+from itertools import product
+from math import comb
+
+import numpy as np
+
+from .actions import (DECISIONS, FIRST, FIRST_PAIR, FULL_STATE_SHAPE, LEGAL, N_FULL_ACTIONS,
+                      SPLIT_HAND, SPLIT_PAIR, full_greedy_policy)
+from .agent import DEALER_UPCARDS, PLAYER_SUMS, STATE_SHAPE
+from .checkpoint import load_q_values
+from .game import DOUBLE_AFTER_SPLIT
+from .strategy import basic_strategy_policy, greedy_policy
+
+RANKS = tuple(range(1, 11))  # Card values: 1 = Ace, 10 = 10/J/Q/K
+FULL_DECK = (4, 4, 4, 4, 4, 4, 4, 4, 4, 16)  # One 52-card deck
+DEALER_OUTCOMES = (17, 18, 19, 20, 21)  # Plus bust as the last slot
+SURRENDER_EV = -0.5
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Dict-like memo cache that evicts the least recently used entry past maxsize."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+def _best_value(total, has_ace):
+    return total + 10 if has_ace and total + 10 <= 21 else total
+
+
+def _remove(deck, rank):
+    counts = list(deck)
+    counts[rank - 1] -= 1
+    return tuple(counts)
+
+
+class ExactSolver:
+    """Exact EVs for stand/hit decisions given the remaining deck composition.
+
+    dealer_cache_size and player_cache_size bound the number of memoized
+    entries in each LRU cache.
+    """
+
+    def __init__(self, dealer_cache_size=200_000, player_cache_size=200_000):
+        self.dealer_cache = LRUCache(dealer_cache_size)
+        self.player_cache = LRUCache(player_cache_size)
+
+    # --- Dealer ---
+
+    def _dealer_draws(self, total, has_ace, deck):
+        """Final-outcome probabilities (17..21, bust) for a dealer drawing from deck."""
+        value = _best_value(total, has_ace)
+        if value >= 17:  # Dealer stands on all 17s
+            outcome = [0.0] * 6
+            outcome[5 if value > 21 else value - 17] = 1.0
+            return tuple(outcome)
+
+        key = (total, has_ace, deck)
+        cached = self.dealer_cache.get(key)
+        if cached is not _MISSING:
+            return cached
+
+        remaining = sum(deck)
+        outcome = [0.0] * 6
+        for rank, count in zip(RANKS, deck):
+            if count:
+                p = count / remaining
+                sub = self._dealer_draws(total + rank, has_ace or rank == 1,
+                                         _remove(deck, rank))
+                for i in range(6):
+                    outcome[i] += p * sub[i]
+        outcome = tuple(outcome)
+        self.dealer_cache.put(key, outcome)
+        return outcome
+
+    def hole_card_probabilities(self, upcard, deck):
+        """{rank: p} for the unseen hole card, given the dealer has no Blackjack."""
+        blocked = 10 if upcard == 1 else 1 if upcard == 10 else None
+        allowed = {rank: count for rank, count in zip(RANKS, deck)
+                   if count and rank != blocked}
+        total = sum(allowed.values())
+        return {rank: count / total for rank, count in allowed.items()}
+
+    def dealer_distribution(self, upcard, deck):
+        """Final-outcome probabilities for the dealer showing upcard, deck = unseen cards."""
+        outcome = [0.0] * 6
+        for hole, p in self.hole_card_probabilities(upcard, deck).items():
+            sub = self._dealer_draws(upcard + hole, upcard == 1 or hole == 1,
+                                     _remove(deck, hole))
+            for i in range(6):
+                outcome[i] += p * sub[i]
+        return outcome
+
+    # --- Player ---
+
+    def stand_ev(self, player_value, upcard, deck):
+        outcome = self.dealer_distribution(upcard, deck)
+        ev = outcome[5]  # Dealer bust
+        for dealer_value, p in zip(DEALER_OUTCOMES, outcome):
+            if player_value > dealer_value:
+                ev += p
+            elif player_value < dealer_value:
+                ev -= p
+        return ev
+
+    def action_evs(self, total, has_ace, upcard, deck):
+        """(stand EV, hit EV) for a player hand (hard total, has_ace) vs upcard.
+
+        deck holds the unseen cards, including the dealer's hole card.
+        Later decisions after a hit are played composition-optimally.
+        """
+        key = (total, has_ace, upcard, deck)
+        cached = self.player_cache.get(key)
+        if cached is not _MISSING:
+            return cached
+
+        stand = self.stand_ev(_best_value(total, has_ace), upcard, deck)
+
+        # The next card comes from the unseen cards minus the hole card
+        hole = self.hole_card_probabilities(upcard, deck)
+        remaining = sum(deck) - 1
+        hit = 0.0
+        for rank, count in zip(RANKS, deck):
+            p = (count - hole.get(rank, 0.0)) / remaining
+            if p <= 0.0:
+                continue
+            new_total = total + rank
+            if new_total > 21:
+                hit -= p
+            else:
+                hit += p * max(self.action_evs(new_total, has_ace or rank == 1,
+                                               upcard, _remove(deck, rank)))
+
+        result = (stand, hit)
+        self.player_cache.put(key, result)
+        return result
+
+    def _draw_probabilities(self, upcard, deck):
+        """[(rank, p)] for the player's next card: the unseen cards minus the hole card."""
+        hole = self.hole_card_probabilities(upcard, deck)
+        remaining = sum(deck) - 1
+        draws = []
+        for rank, count in zip(RANKS, deck):
+            p = (count - hole.get(rank, 0.0)) / remaining
+            if p > 0.0:
+                draws.append((rank, p))
+        return draws
+
+    def double_ev(self, total, has_ace, upcard, deck):
+        """EV of doubling: twice the stake on exactly one more card."""
+        ev = 0.0
+        for rank, p in self._draw_probabilities(upcard, deck):
+            new_total = total + rank
+            if new_total > 21:
+                ev -= 2 * p
+            else:
+                ev += 2 * p * self.stand_ev(_best_value(new_total, has_ace or rank == 1),
+                                            upcard, _remove(deck, rank))
+        return ev
+
+    def split_ev(self, rank, upcard, deck):
+        """EV of splitting a pair of rank; deck is unseen and already excludes both cards.
+
+        Each hand draws its second card from deck and is then played
+        composition-optimally (doubling too if DOUBLE_AFTER_SPLIT). Split Aces
+        stand on their one card.
+        """
+        ev = 0.0
+        for second, p in self._draw_probabilities(upcard, deck):
+            total, has_ace = rank + second, rank == 1 or second == 1
+            rest = _remove(deck, second)
+            if rank == 1:
+                hand_ev = self.stand_ev(_best_value(total, has_ace), upcard, rest)
+            else:
+                hand_ev = max(self.action_evs(total, has_ace, upcard, rest))
+                if DOUBLE_AFTER_SPLIT:
+                    hand_ev = max(hand_ev, self.double_ev(total, has_ace, upcard, rest))
+            ev += p * hand_ev
+        return 2 * ev
+
+    def option_evs(self, counts, upcard, deck):
+        """EVs of all five actions for a two-card hand (rank counts) vs upcard.
+
+        Ordered as actions.FULL_ACTIONS; Split is nan unless the hand is a pair.
+        """
+        total = sum(rank * count for rank, count in zip(RANKS, counts))
+        has_ace = counts[0] > 0
+        stand, hit = self.action_evs(total, has_ace, upcard, deck)
+        pair = counts.index(2) + 1 if 2 in counts else None
+        split = self.split_ev(pair, upcard, deck) if pair else np.nan
+        return (stand, hit, self.double_ev(total, has_ace, upcard, deck), split, SURRENDER_EV)
+
+    def cache_stats(self):
+        return {"dealer": self.dealer_cache.stats(), "player": self.player_cache.stats()}
+
+
+# --- Per-state Values ---
+
+def player_compositions(max_cards=5):
+    """Yields rank-count tuples for every non-bust, non-Blackjack hand of 2..max_cards cards."""
+    limits = [min(count, max_cards) for count in FULL_DECK]
+    for counts in product(*(range(limit + 1) for limit in limits)):
+        cards = sum(counts)
+        if not 2 <= cards <= max_cards:
+            continue
+        total = sum(rank * count for rank, count in zip(RANKS, counts))
+        if total > 21 or (cards == 2 and counts[0] == 1 and counts[9] == 1):
+            continue
+        yield counts
+
+
+def state_values(solver=None, max_cards=5, upcards=None):
+    """Composition-weighted exact EVs for every (player_sum, dealer_upcard, usable_ace) state.
+
+    Each player composition is weighted by its probability of being drawn
+    from the deck left after the upcard. Returns a dict of STATE_SHAPE arrays:
+    "stand", "hit" (weighted mean EVs), "weight" (total weight) and
+    "composition_gain" (extra EV from choosing per composition rather than
+    per state).
+    """
+    if solver is None:
+        solver = ExactSolver()
+    if upcards is None:
+        upcards = [1] + list(range(2, 11))
+    stand = np.zeros(STATE_SHAPE)
+    hit = np.zeros(STATE_SHAPE)
+    best = np.zeros(STATE_SHAPE)
+    weight = np.zeros(STATE_SHAPE)
+
+    compositions = list(player_compositions(max_cards))
+    for upcard in upcards:
+        after_upcard = _remove(FULL_DECK, upcard)
+        unseen_total = sum(after_upcard)
+        dealer_idx = (11 if upcard == 1 else upcard) - DEALER_UPCARDS.start
+        for counts in compositions:
+            if any(c > d for c, d in zip(counts, after_upcard)):
+                continue
+            cards = sum(counts)
+            w = 1.0
+            for c, d in zip(counts, after_upcard):
+                w *= comb(d, c)
+            w /= comb(unseen_total, cards)
+
+            deck = tuple(d - c for d, c in zip(after_upcard, counts))
+            total = sum(rank * count for rank, count in zip(RANKS, counts))
+            has_ace = counts[0] > 0
+            ev_stand, ev_hit = solver.action_evs(total, has_ace, upcard, deck)
+
+            value = _best_value(total, has_ace)
+            soft = int(has_ace and total + 10 <= 21)
+            index = (max(value, PLAYER_SUMS.start) - PLAYER_SUMS.start, dealer_idx, soft)
+            stand[index] += w * ev_stand
+            hit[index] += w * ev_hit
+            best[index] += w * max(ev_stand, ev_hit)
+            weight[index] += w
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stand = np.where(weight > 0, stand / weight, np.nan)
+        hit = np.where(weight > 0, hit / weight, np.nan)
+        best = np.where(weight > 0, best / weight, np.nan)
+    return {
+        "stand": stand,
+        "hit": hit,
+        "weight": weight,
+        "composition_gain": best - np.fmax(stand, hit),
+    }
+
+
+def compare_policy(values, policy):
+    """How far a policy table is from the exact per-state optimum.
+
+    Returns per-state regret (EV lost by the policy's action) plus weighted
+    summaries over all states with non-zero weight.
+    """
+    optimal = (values["hit"] > values["stand"]).astype(np.int8)
+    chosen = np.where(policy == 1, values["hit"], values["stand"])
+    regret = np.fmax(values["stand"], values["hit"]) - chosen
+    mask = values["weight"] > 0
+    w = values["weight"][mask]
+    return {
+        "optimal_policy": optimal,
+        "regret": regret,
+        "mismatched_states": int(np.sum((policy != optimal) & mask)),
+        "decision_states": int(mask.sum()),
+        "weighted_regret": float(np.sum(regret[mask] * w) / w.sum()),
+        "weighted_composition_gain": float(np.sum(values["composition_gain"][mask] * w) / w.sum()),
+    }
+
+
+def opening_values(solver=None, upcards=None):
+    """Composition-weighted EVs of every action for the first decision of a round.
+
+    Covers the FIRST and FIRST_PAIR decision kinds of the full state layout.
+    Returns a dict with "evs" (FULL_STATE_SHAPE + (N_FULL_ACTIONS,), nan for
+    illegal actions and other kinds) and "weight" (FULL_STATE_SHAPE).
+    """
+    if solver is None:
+        solver = ExactSolver()
+    if upcards is None:
+        upcards = [1] + list(range(2, 11))
+    evs = np.zeros(FULL_STATE_SHAPE + (N_FULL_ACTIONS,))
+    weight = np.zeros(FULL_STATE_SHAPE)
+
+    compositions = list(player_compositions(max_cards=2))
+    for upcard in upcards:
+        after_upcard = _remove(FULL_DECK, upcard)
+        unseen_total = sum(after_upcard)
+        dealer_idx = (11 if upcard == 1 else upcard) - DEALER_UPCARDS.start
+        for counts in compositions:
+            if any(c > d for c, d in zip(counts, after_upcard)):
+                continue
+            w = 1.0
+            for c, d in zip(counts, after_upcard):
+                w *= comb(d, c)
+            w /= comb(unseen_total, 2)
+
+            deck = tuple(d - c for d, c in zip(after_upcard, counts))
+            total = sum(rank * count for rank, count in zip(RANKS, counts))
+            value = _best_value(total, counts[0] > 0)
+            soft = int(counts[0] > 0 and total + 10 <= 21)
+            kind = FIRST_PAIR if 2 in counts else FIRST
+            index = (max(value, PLAYER_SUMS.start) - PLAYER_SUMS.start, dealer_idx, soft, kind)
+            evs[index] += w * np.nan_to_num(solver.option_evs(counts, upcard, deck))
+            weight[index] += w
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        evs = evs / weight[..., None]
+    evs[weight == 0] = np.nan
+    evs[..., ~LEGAL] = np.nan
+    return {"evs": evs, "weight": weight}
+
+
+def full_strategy_policy(values):
+    """Full-rules strategy table (FULL_STATE_SHAPE) from opening_values().
+
+    Opening decisions take the best exact action. After a hit the Stand/Hit
+    Basic Strategy applies. A split hand plays like an opening hand of the
+    same state, minus Surrender (Double falls back to Hit without
+    DOUBLE_AFTER_SPLIT).
+    """
+    evs, weight = values["evs"], values["weight"]
+    policy = np.repeat(basic_strategy_policy()[..., None], len(DECISIONS), axis=-1)
+    decided = weight > 0
+    best = np.argmax(np.nan_to_num(evs, nan=-np.inf), axis=-1).astype(np.int8)
+    policy[decided] = best[decided]
+    for kind, opening in ((SPLIT_HAND, FIRST), (SPLIT_PAIR, FIRST_PAIR)):
+        split_evs = np.nan_to_num(evs[..., opening, :], nan=-np.inf)
+        split_evs[..., ~LEGAL[kind]] = -np.inf
+        choice = np.argmax(split_evs, axis=-1).astype(np.int8)
+        known = decided[..., opening]
+        policy[..., kind][known] = choice[known]
+    return policy
+
+
+def compare_full_policy(values, policy):
+    """compare_policy() for a full-action policy table, over the opening decisions."""
+    evs, weight = values["evs"], values["weight"]
+    mask = weight > 0
+    best_evs = np.nan_to_num(evs, nan=-np.inf)
+    optimal = np.argmax(best_evs, axis=-1).astype(np.int8)
+    chosen = np.take_along_axis(evs, policy[..., None].astype(np.intp), axis=-1)[..., 0]
+    with np.errstate(invalid='ignore'):  # -inf - -inf outside the opening decisions
+        regret = np.where(mask, np.max(best_evs, axis=-1) - np.nan_to_num(chosen, nan=-np.inf),
+                          0.0)
+    w = weight[mask]
+    return {
+        "optimal_policy": optimal,
+        "regret": regret,
+        "mismatched_states": int(np.sum((policy != optimal) & mask)),
+        "decision_states": int(mask.sum()),
+        "weighted_regret": float(np.sum(regret[mask] * w) / w.sum()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("checkpoint", help=".npz checkpoint or training_results.json")
+    parser.add_argument("--max-cards", type=int, default=5,
+                        help="Largest player hand (in cards) to enumerate")
+    parser.add_argument("--cache-size", type=int, default=200_000,
+                        help="Max entries in each LRU memo cache")
+    parser.add_argument("--full", action="store_true",
+                        help="The checkpoint is over the full action set (actions.py); "
+                             "compare its opening decisions")
+    args = parser.parse_args()
+
+    solver = ExactSolver(args.cache_size, args.cache_size)
+    if args.full:
+        values = opening_values(solver)
+        report = compare_full_policy(values, full_greedy_policy(load_q_values(args.checkpoint)[0]))
+        print(f"Learned opening decisions differ from the exact single-deck optimum in "
+              f"{report['mismatched_states']} of {report['decision_states']} states")
+        print(f"Weighted EV lost per opening decision: {report['weighted_regret']:.5f}")
+        return
+    values = state_values(solver, args.max_cards)
+    policy = greedy_policy(load_q_values(args.checkpoint)[0])
+    report = compare_policy(values, policy)
+
+    print(f"Learned policy differs from the exact single-deck optimum in "
+          f"{report['mismatched_states']} of {report['decision_states']} states")
+    print(f"Weighted EV lost per decision: {report['weighted_regret']:.5f}")
+    print(f"Extra EV available from composition-dependent play: "
+          f"{report['weighted_composition_gain']:.5f}")
+    for name, stats in solver.cache_stats().items():
+        print(f"{name} cache: {stats['size']:,}/{stats['maxsize']:,} entries, "
+              f"{stats['hits']:,} hits, {stats['misses']:,} misses, "
+              f"{stats['evictions']:,} evictions")
+
+
+if __name__ == "__main__":
+    main()
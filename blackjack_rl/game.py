@@ -0,0 +1,460 @@
+"""Blackjack game core: cards, deck, hands, the single-player game and the multi-seat table."""
+import random
+
+
+# --- Game Core Logic ---
+
+
+class Card:
+    def __init__(self, rank, suit):
+        self.rank = rank
+        self.suit = suit
+        self.value = self._get_value()
+        self.display_code = f"card_{rank}{suit}"  # i.e. 'card_AH', 'card_10D'
+
+    def _get_value(self):
+        if self.rank in ['J', 'Q', 'K']:
+            return 10
+        elif self.rank == 'A':
+            return 1  # Base value, Hand class manages 11 vs 1
+        else:
+            return int(self.rank)
+
+    def __str__(self):
+        return f"{self.rank}{self.suit}"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class Deck:
+    def __init__(self, num_decks=1, seed=None):
+        self.num_decks = num_decks
+        self.cards = []
+        self.rng = random.Random(seed)  # Pseudo-random for reproducibility
+        self._initialize_deck()
+        self.shuffle()
+
+    def _initialize_deck(self):
+        suits = ['H', 'D', 'C', 'S']
+        ranks = ['A', '2', '3', '4', '5', '6',
+                 '7', '8', '9', '10', 'J', 'Q', 'K']
+        for _ in range(self.num_decks):
+            for suit in suits:
+                for rank in ranks:
+                    self.cards.append(Card(rank, suit))
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+
+    def deal_card(self):
+        if not self.cards:
+            print("Deck is empty, reshuffling...")
+            self._initialize_deck()  # Re-initialize if runs out
+            self.shuffle()
+        return self.cards.pop()
+
+
+class Shoe(Deck):
+    """A multi-deck shoe that persists across hands.
+
+    It is reshuffled once the cut card is reached (penetration, the dealt
+    fraction of the shoe), and keeps a Hi-Lo running count of the cards dealt
+    since the last shuffle.
+    """
+
+    HI_LO = {'2': 1, '3': 1, '4': 1, '5': 1, '6': 1, '7': 0, '8': 0, '9': 0,
+             '10': -1, 'J': -1, 'Q': -1, 'K': -1, 'A': -1}
+
+    def __init__(self, num_decks=6, penetration=0.75, seed=None):
+        self.penetration = penetration
+        self.running_count = 0
+        self.shuffles = 0
+        super().__init__(num_decks=num_decks, seed=seed)
+        self.total_cards = len(self.cards)
+
+    def shuffle(self):
+        super().shuffle()
+        self.running_count = 0
+        self.shuffles += 1
+
+    def reshuffle(self):
+        """Gathers all cards back into the shoe and shuffles."""
+        self.cards = []
+        self._initialize_deck()
+        self.shuffle()
+
+    def needs_shuffle(self):
+        return self.dealt_fraction() >= self.penetration
+
+    def dealt_fraction(self):
+        return 1 - len(self.cards) / self.total_cards
+
+    def deal_card(self):
+        if not self.cards:  # Only if penetration is ~1.0
+            self.reshuffle()
+        card = self.cards.pop()
+        self.running_count += self.HI_LO[card.rank]
+        return card
+
+
+class Hand:
+    def __init__(self):
+        self.cards = []
+        self.value = 0
+        self.aces = 0  # Number of aces being counted as 11
+
+    def add_card(self, card):
+        self.cards.append(card)
+        if card.rank == 'A':
+            self.aces += 1
+            self.value += 11  # Start with 11
+        else:
+            self.value += card.value
+        self._adjust_for_ace()
+
+    def _adjust_for_ace(self):
+        # Convert aces from 11 to 1 while over 21
+        while self.value > 21 and self.aces > 0:
+            self.value -= 10  # Convert 11 to 1
+            self.aces -= 1
+
+    def reset(self):
+        """Empties the hand in place so it can be dealt again."""
+        self.cards.clear()
+        self.value = 0
+        self.aces = 0
+
+    def is_blackjack(self):
+        return len(self.cards) == 2 and self.value == 21
+
+    def is_bust(self):
+        return self.value > 21
+
+    def get_display_codes(self, hide_first_card=False):
+        if hide_first_card and self.cards:
+            # Assumes the first card in dealer_hand.cards is the hole card
+            return ['card_back'] + [card.display_code for card in self.cards[1:]]
+        return [card.display_code for card in self.cards]
+
+    def has_usable_ace(self):
+        # Has at least one ace being counted as 11
+        return self.aces > 0
+
+
+# Player options beyond Hit/Stand
+MAX_HANDS = 4  # A pair may be split (and resplit) up to this many hands
+DOUBLE_AFTER_SPLIT = True  # Split hands may double on their first two cards
+
+
+class BlackjackGame:
+    """One player against the dealer, with Hit, Stand, Double, Split and Surrender.
+
+    The player's hands live in a stack of MAX_HANDS Hand objects allocated
+    once per game: hands[0] is the hand dealt, a split moves its second card
+    to hands[num_hands], and the hands are played in turn (current). Hands
+    are reset in place each round instead of being replaced. bets[i] is the
+    stake of hand i (2 after a double) and hand_results[i] its result once
+    settled; result is the outcome of the whole round.
+    """
+
+    def __init__(self, seed=None, deck=None):
+        # A fresh single deck per game unless a persistent deck (e.g. a Shoe) is given
+        self.deck = deck if deck is not None else Deck(num_decks=1, seed=seed)
+        self.hands = [Hand() for _ in range(MAX_HANDS)]
+        self.bets = [1] * MAX_HANDS
+        self.hand_results = [""] * MAX_HANDS  # "Win", "Loss", "Push", "Surrender"
+        self.num_hands = 1
+        self.current = 0
+        self.dealer_hand = Hand()
+        self.game_over = False
+        self.result = ""  # "Win", "Loss", "Push" (net of all hands), "Surrender"
+
+    @property
+    def player_hand(self):
+        """The hand being played (the last one once the round is over)."""
+        return self.hands[self.current]
+
+    def start_hand(self):
+        player_hand = self.hands[0]
+        player_hand.reset()  # Split hands are reset when a split reaches them
+        self.dealer_hand.reset()
+        self.num_hands = 1
+        self.current = 0
+        self.bets[0] = 1
+        self.hand_results[0] = ""
+        self.game_over = False
+        self.result = ""
+
+        # Standard blackjack dealing: Player, Dealer (upcard), Player, Dealer (hole card)
+        player_hand.add_card(self.deck.deal_card())
+        # Dealer's upcard (visible)
+        self.dealer_hand.add_card(self.deck.deal_card())
+        player_hand.add_card(self.deck.deal_card())
+        # Dealer's hole card (hidden)
+        self.dealer_hand.add_card(self.deck.deal_card())
+
+        # Check for immediate Blackjacks
+        if player_hand.is_blackjack():
+            if self.dealer_hand.is_blackjack():
+                self.hand_results[0] = "Push"
+            else:
+                self.hand_results[0] = "Win"  # Player Blackjack wins (pays 3:2)
+            self._end_round()
+            return "game_over"
+
+        elif self.dealer_hand.is_blackjack():
+            self.hand_results[0] = "Loss"  # Dealer Blackjack beats player non-Blackjack
+            self._end_round()
+            return "game_over"
+
+        return "player_turn"
+
+    # --- Player Options ---
+
+    def can_double(self):
+        return (len(self.player_hand.cards) == 2 and
+                (self.num_hands == 1 or DOUBLE_AFTER_SPLIT))
+
+    def can_split(self):
+        cards = self.player_hand.cards
+        return len(cards) == 2 and cards[0].value == cards[1].value and self.num_hands < MAX_HANDS
+
+    def can_surrender(self):
+        # Late surrender: only as the first decision, after the dealer's Blackjack check
+        return self.num_hands == 1 and len(self.hands[0].cards) == 2
+
+    def player_hit(self):
+        self.player_hand.add_card(self.deck.deal_card())
+        if self.player_hand.is_bust():
+            self.hand_results[self.current] = "Loss"
+            self._next_hand()
+            return "player_bust"  # Signal for UI
+        return "player_turn"  # Signal for UI, can hit again
+
+    def player_stand(self):
+        return self._next_hand()  # Next split hand, or the dealer's turn
+
+    def player_double(self):
+        """Doubles the bet, takes exactly one card and stands."""
+        if not self.can_double():
+            raise ValueError("Double is only allowed on the first two cards of a hand")
+        self.bets[self.current] = 2
+        if self.player_hit() == "player_bust":
+            return "player_bust"
+        return self._next_hand()
+
+    def player_split(self):
+        """Splits a pair: the second card starts hands[num_hands], and both get a new card.
+
+        The current hand gets its card now, a split hand when play reaches it.
+        Split Aces get one card each and stand.
+        """
+        if not self.can_split():
+            raise ValueError(f"Only a pair can be split, into at most {MAX_HANDS} hands")
+        hand = self.player_hand
+        first, second = hand.cards
+        new_hand = self.hands[self.num_hands]
+        new_hand.reset()
+        new_hand.add_card(second)
+        self.bets[self.num_hands] = 1
+        self.hand_results[self.num_hands] = ""
+        self.num_hands += 1
+
+        hand.reset()
+        hand.add_card(first)
+        hand.add_card(self.deck.deal_card())
+        if first.rank == 'A':
+            return self._next_hand()
+        return "player_turn"
+
+    def player_surrender(self):
+        """Gives up the hand for half the bet."""
+        if not self.can_surrender():
+            raise ValueError("Surrender is only allowed as the first decision")
+        self.hand_results[0] = "Surrender"
+        self._end_round()
+        return "game_over"
+
+    def _next_hand(self):
+        """Moves on to the next split hand, or to the dealer after the last one."""
+        split_aces = self.hands[0].cards[0].rank == 'A'
+        while self.current + 1 < self.num_hands:
+            self.current += 1
+            self.player_hand.add_card(self.deck.deal_card())  # Second card of a split hand
+            if not split_aces:
+                return "player_turn"
+        if all(self.hand_results[:self.num_hands]):  # Every hand busted
+            self._end_round()
+            return "game_over"
+        return self.dealer_turn()
+
+    def dealer_turn(self):
+        # Dealer must hit on 16 or less, stand on 17 or more (standard rule)
+        while self.dealer_hand.value < 17:
+            self.dealer_hand.add_card(self.deck.deal_card())
+        dealer_bust = self.dealer_hand.is_bust()
+
+        # Settle every hand that has not busted
+        for i in range(self.num_hands):
+            if self.hand_results[i]:
+                continue
+            value = self.hands[i].value
+            if dealer_bust or value > self.dealer_hand.value:
+                self.hand_results[i] = "Win"
+            elif self.dealer_hand.value > value:
+                self.hand_results[i] = "Loss"
+            else:
+                self.hand_results[i] = "Push"  # Tie
+
+        self._end_round()
+        return "dealer_bust" if dealer_bust else "game_over"  # Signal for UI
+
+    def _end_round(self):
+        self.game_over = True
+        if self.num_hands == 1:
+            self.result = self.hand_results[0]
+        else:
+            net = self.reward()
+            self.result = "Win" if net > 0 else "Loss" if net < 0 else "Push"
+
+    # --- Payouts ---
+
+    def hand_reward(self, index):
+        """Payout of hands[index], in units of the initial bet."""
+        result = self.hand_results[index]
+        # Only an unsplit two-card 21 is a Blackjack
+        natural = result == "Win" and self.num_hands == 1 and self.hands[0].is_blackjack()
+        return self.bets[index] * get_reward(result, natural)
+
+    def reward(self):
+        """Net payout of the round over all hands, in units of the initial bet."""
+        return sum(self.hand_reward(i) for i in range(self.num_hands))
+
+
+MAX_SEATS = 7
+
+
+class TableGame:
+    """Up to MAX_SEATS player hands against one dealer hand, dealt from one deck.
+
+    Cards go out in casino order: one to each seat left to right, the dealer's
+    upcard, a second card to each seat, then the hole card. Seats act in turn
+    with hit(seat); a seat that does not bust simply stops hitting. One
+    dealer_turn() then settles every seat still standing. results[seat] is ""
+    until that seat is settled.
+    """
+
+    def __init__(self, num_seats=MAX_SEATS, seed=None, deck=None):
+        if not 1 <= num_seats <= MAX_SEATS:
+            raise ValueError(f"num_seats must be between 1 and {MAX_SEATS}")
+        self.num_seats = num_seats
+        # Seats share a persistent 6-deck shoe unless another deck is given
+        self.deck = deck if deck is not None else Shoe(seed=seed)
+        self.hands = [Hand() for _ in range(num_seats)]
+        self.dealer_hand = Hand()
+        self.results = [""] * num_seats
+        self.dealer_turns = 0  # Rounds in which the dealer had to draw out the hand
+
+    def start_round(self):
+        """Deals a round and settles Blackjacks. Returns the seats left to act."""
+        self.hands = [Hand() for _ in range(self.num_seats)]
+        self.dealer_hand = Hand()
+        self.results = [""] * self.num_seats
+
+        for hand in self.hands:
+            hand.add_card(self.deck.deal_card())
+        self.dealer_hand.add_card(self.deck.deal_card())  # Upcard
+        for hand in self.hands:
+            hand.add_card(self.deck.deal_card())
+        self.dealer_hand.add_card(self.deck.deal_card())  # Hole card
+
+        dealer_blackjack = self.dealer_hand.is_blackjack()
+        for seat, hand in enumerate(self.hands):
+            if hand.is_blackjack():
+                self.results[seat] = "Push" if dealer_blackjack else "Win"
+            elif dealer_blackjack:
+                self.results[seat] = "Loss"
+        return self.unsettled_seats()
+
+    def unsettled_seats(self):
+        return [seat for seat, result in enumerate(self.results) if not result]
+
+    def hit(self, seat):
+        hand = self.hands[seat]
+        hand.add_card(self.deck.deal_card())
+        if hand.is_bust():
+            self.results[seat] = "Loss"
+            return "player_bust"
+        return "player_turn"
+
+    def dealer_turn(self):
+        """Plays the dealer hand once and settles every seat still standing.
+
+        If no seat is left standing the dealer does not draw.
+        """
+        standing = self.unsettled_seats()
+        if not standing:
+            return "game_over"
+        self.dealer_turns += 1
+        while self.dealer_hand.value < 17:
+            self.dealer_hand.add_card(self.deck.deal_card())
+
+        dealer_bust = self.dealer_hand.is_bust()
+        for seat in standing:
+            value = self.hands[seat].value
+            if dealer_bust or value > self.dealer_hand.value:
+                self.results[seat] = "Win"
+            elif self.dealer_hand.value > value:
+                self.results[seat] = "Loss"
+            else:
+                self.results[seat] = "Push"
+        return "dealer_bust" if dealer_bust else "game_over"
+
+    def reward(self, seat):
+        result = self.results[seat]
+        return get_reward(result, result == "Win" and self.hands[seat].is_blackjack())
+
+
+# --- State and Reward ---
+
+# State definition: (player_sum, dealer_upcard_value, usable_ace)
+# Player sum: 4-21 (min starting hand is 2, max after hits can be 21)
+# Dealer upcard: 2-11 (11 for Ace)
+# Usable ace: 0 (False), 1 (True)
+# Actions: 0 (Stand), 1 (Hit); actions.py adds Double, Split and Surrender
+
+
+def get_state(player_hand, dealer_hand):
+    # Use dealer's first card (upcard) for state representation
+    dealer_upcard = dealer_hand.cards[0] if dealer_hand.cards else None
+    if dealer_upcard is None:
+        dealer_upcard_value = 0
+    elif dealer_upcard.rank == 'A':
+        dealer_upcard_value = 11  # Ace upcard is always 11 for state
+    else:
+        dealer_upcard_value = dealer_upcard.value
+
+    player_sum = player_hand.value
+    usable_ace = 1 if player_hand.has_usable_ace() else 0
+
+    # Handle edge cases for Q-learning
+    if player_sum < 12:  # Always hit below 12 in basic strategy
+        player_sum = max(player_sum, 4)  # Minimum possible starting hand
+    elif player_sum > 21:  # Bust states shouldn't reach here, but safety check
+        player_sum = 21
+
+    return (player_sum, dealer_upcard_value, usable_ace)
+
+
+def get_reward(game_result, is_blackjack=False):
+    if game_result == "Win":
+        return 1.5 if is_blackjack else 1.0  # Blackjack pays 3:2
+    elif game_result == "Loss":
+        return -1.0
+    elif game_result == "Push":
+        return 0.0
+    elif game_result == "Surrender":
+        return -0.5  # Half the bet back
+    else:
+        return 0.0
@@ -0,0 +1,224 @@
+"""Hogwild-style parallel training on one shared-memory Q-table.
+
+Several worker processes play BlackjackGame episodes and apply their Q-updates
+directly to a single dense Q-table living in multiprocessing.shared_memory.
+Updates are lock-free by default; with lock_stripes > 0 each update takes one
+of a fixed set of locks chosen by state index.
+
+Run `python -m blackjack_rl.hogwild --workers 4` to compare updates/sec and
+greedy performance against the single-process loop.
+"""
+import argparse
+import multiprocessing as mp
+import queue
+import random
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import agent
+from .agent import DenseQTable, N_ACTIONS, N_STATES, q_update, state_index
+from .game import BlackjackGame
+
+
+class SharedQTable(DenseQTable):
+    """DenseQTable whose values array lives in a shared memory block.
+
+    The creating process owns the block and must call unlink() when done;
+    workers attach by name and only call close().
+    """
+
+    def __init__(self, name=None, create=True):
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=create, size=N_STATES * N_ACTIONS * 8)
+        values = np.ndarray((N_STATES, N_ACTIONS), dtype=np.float64,
+                            buffer=self.shm.buf)
+        if create:
+            values.fill(0.0)
+        super().__init__(values)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        # Drop the ndarray view first, otherwise the buffer can't be released
+        self.values = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _striped_update(locks):
+    """Wraps q_update so each write holds the lock for its state's stripe."""
+    def update(q_table, state, action, reward, new_state, learning_rate, discount_factor):
+        with locks[state_index(state) % len(locks)]:
+            q_update(q_table, state, action, reward, new_state,
+                     learning_rate, discount_factor)
+    return update
+
+
+def _worker(shm_name, worker_id, num_workers, episodes, hyperparameters, locks, results):
+    """Plays every num_workers-th episode and writes updates into the shared table."""
+    q_table = SharedQTable(name=shm_name, create=False)
+    rng = random.Random(hyperparameters["epsilon_seed"] + worker_id)
+    update = _striped_update(locks) if locks else q_update
+    wins = updates = 0
+
+    # Worker w plays global episodes w+1, w+1+N, ... so together the workers
+    # deal the same card sequences, under the same epsilon schedule, as the
+    # single-process loop.
+    for episode in range(worker_id + 1, episodes + 1, num_workers):
+        epsilon = agent.epsilon_at(episode, hyperparameters["epsilon_start"],
+                                   hyperparameters["epsilon_decay"],
+                                   hyperparameters["epsilon_min"])
+        game = BlackjackGame(seed=hyperparameters["game_seed"] + episode)
+        result, _, steps = agent.play_episode(
+            game, q_table, epsilon, rng, hyperparameters["learning_rate"],
+            hyperparameters["discount_factor"], update)
+        updates += steps
+        wins += result == "Win"
+
+    q_table.close()
+    results.put((worker_id, updates, wins))
+
+
+def _collect_results(results, workers, poll_seconds=1.0):
+    """One result per worker; raises RuntimeError if a worker dies before reporting."""
+    pending = dict(enumerate(workers))
+    collected = []
+    while pending:
+        try:
+            result = results.get(timeout=poll_seconds)
+        except queue.Empty:
+            for worker_id, worker in pending.items():
+                if worker.exitcode not in (None, 0):
+                    raise RuntimeError(f"Hogwild worker {worker_id} died with exit code "
+                                       f"{worker.exitcode}") from None
+            if all(worker.exitcode is not None for worker in pending.values()):
+                # Exited cleanly and a full poll later its result still has not arrived
+                raise RuntimeError(f"Hogwild workers {sorted(pending)} exited "
+                                   f"without reporting") from None
+            continue
+        collected.append(result)
+        del pending[result[0]]
+    return collected
+
+
+def train_hogwild(num_workers=None, episodes=agent.EPISODES, lock_stripes=0,
+                  game_seed=agent.GAME_RNG_SEED, epsilon_seed=agent.EPSILON_RNG_SEED,
+                  learning_rate=agent.LEARNING_RATE,
+                  discount_factor=agent.DISCOUNT_FACTOR,
+                  epsilon_start=agent.EPSILON_START,
+                  epsilon_decay=agent.EPSILON_DECAY, epsilon_min=agent.EPSILON_MIN):
+    """Trains one shared Q-table with num_workers processes.
+
+    Returns (q_table, stats) where q_table is a DenseQTable copy of the shared
+    values and stats reports throughput.
+    """
+    if num_workers is None:
+        num_workers = mp.cpu_count()
+    hyperparameters = {
+        "game_seed": game_seed,
+        "epsilon_seed": epsilon_seed,
+        "learning_rate": learning_rate,
+        "discount_factor": discount_factor,
+        "epsilon_start": epsilon_start,
+        "epsilon_decay": epsilon_decay,
+        "epsilon_min": epsilon_min,
+    }
+
+    ctx = mp.get_context()
+    shared = SharedQTable()
+    locks = [ctx.Lock() for _ in range(lock_stripes)]
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=_worker,
+                    args=(shared.name, worker_id, num_workers, episodes,
+                          hyperparameters, locks, results))
+        for worker_id in range(num_workers)
+    ]
+
+    try:
+        start_time = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        # Drain results before joining so no worker blocks on a full pipe
+        worker_results = _collect_results(results, workers)
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start_time
+        q_table = DenseQTable(shared.values.copy())
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        shared.close()
+        shared.unlink()
+
+    updates = sum(r[1] for r in worker_results)
+    stats = {
+        "workers": num_workers,
+        "lock_stripes": lock_stripes,
+        "episodes": episodes,
+        "updates": updates,
+        "elapsed_seconds": elapsed,
+        "updates_per_second": updates / elapsed if elapsed > 0 else 0.0,
+        "total_wins": sum(r[2] for r in worker_results),
+    }
+    return q_table, stats
+
+
+def policy_agreement(q_a, q_b):
+    """Fraction of states visited by both tables whose greedy actions match."""
+    visited = np.any(q_a.values != 0.0, axis=1) & np.any(q_b.values != 0.0, axis=1)
+    if not visited.any():
+        return 0.0
+    same = np.argmax(q_a.values, axis=1) == np.argmax(q_b.values, axis=1)
+    return float(same[visited].mean())
+
+
+def compare_with_single_process(num_workers=None, episodes=agent.EPISODES,
+                                lock_stripes=0, eval_hands=20000):
+    """Runs the single-process loop and the Hogwild trainer on the same episodes.
+
+    Both Q-tables are evaluated greedily on the same evaluation hands.
+    """
+    single_q, single_stats = agent.train(episodes)
+    hogwild_q, hogwild_stats = train_hogwild(num_workers, episodes, lock_stripes)
+
+    single_stats.update(agent.evaluate_greedy(single_q, eval_hands))
+    hogwild_stats.update(agent.evaluate_greedy(hogwild_q, eval_hands))
+    return {
+        "single_process": single_stats,
+        "hogwild": hogwild_stats,
+        "speedup": hogwild_stats["updates_per_second"] / single_stats["updates_per_second"],
+        "policy_agreement": policy_agreement(single_q, hogwild_q),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=mp.cpu_count())
+    parser.add_argument("--episodes", type=int, default=agent.EPISODES)
+    parser.add_argument("--lock-stripes", type=int, default=0,
+                        help="0 for lock-free updates, otherwise the number of striped locks")
+    parser.add_argument("--eval-hands", type=int, default=20000)
+    args = parser.parse_args()
+
+    report = compare_with_single_process(args.workers, args.episodes,
+                                         args.lock_stripes, args.eval_hands)
+    for label in ("single_process", "hogwild"):
+        stats = report[label]
+        print(f"{label:>15}: {stats['updates']:,} updates in {stats['elapsed_seconds']:.2f}s "
+              f"({stats['updates_per_second']:,.0f} updates/s) | "
+              f"greedy EV {stats['mean_reward']:+.4f}, "
+              f"win rate {stats['win_rate_percent']:.2f}%")
+    print(f"Speedup: {report['speedup']:.2f}x | "
+          f"Greedy policy agreement: {report['policy_agreement'] * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Offscreen recording of episodes to PNG frames or an animated GIF.
+
+Frames are drawn by render.draw_game_elements, the same layout as the live
+window, on SDL's dummy video driver, so no display is needed. Snapshots come
+from one of three sources:
+
+- a checkpoint, played greedily on fixed seeds without learning,
+- a training run, replayed deterministically from its seeds,
+- a recording: a JSON-lines file of Snapshots saved earlier.
+
+Only the selected episodes are drawn. frame_skip draws every Nth decision
+frame; the last frame of each hand is always kept, and repeated hold_frames
+times. Drawing uses a small pool of reused Surfaces: the encoder thread returns
+each Surface once it has written that frame, so memory stays bounded however
+long the recording is.
+
+    python -m blackjack_rl.recorder --checkpoint training_results.npz --episodes 1-20 --out demo.gif
+    python -m blackjack_rl.recorder --train-episodes 20000-20010 --out frames/
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import queue
+import threading
+
+from . import agent
+from .agent import DenseQTable
+from .checkpoint import load_q_values
+from .convergence import ConvergenceTracker
+from .trainer import Snapshot, Trainer
+
+
+# --- Snapshot Sources ---
+
+class SnapshotLog:
+    """Channel stand-in that keeps every Snapshot of the selected episodes."""
+
+    def __init__(self, episodes=None):
+        self.episodes = None if episodes is None else set(episodes)
+        self.snapshots = []
+
+    def publish(self, snapshot):
+        if self.episodes is None or snapshot.episode in self.episodes:
+            self.snapshots.append(snapshot)
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            for snapshot in self.snapshots:
+                f.write(json.dumps(snapshot._asdict()) + "\n")
+
+
+def load_recording(path, episodes=None):
+    """Snapshots from a JSON-lines recording written by SnapshotLog.save()."""
+    log = SnapshotLog(episodes)
+    with open(path, 'r') as f:
+        for line in f:
+            log.publish(Snapshot(**json.loads(line)))
+    return log.snapshots
+
+
+def _no_update(q_table, state, action, reward, new_state, learning_rate, discount_factor):
+    pass
+
+
+class ReplayTrainer(Trainer):
+    """Trainer that plays a frozen Q-table greedily and never updates it."""
+
+    def __init__(self, q_table, channel=None, episodes=agent.EPISODES,
+                 game_seed=agent.GAME_RNG_SEED):
+        self._frozen = q_table
+        super().__init__(channel, episodes, game_seed=game_seed)
+        self.evaluator = None
+
+    def _reset_counters(self):
+        self.q_table = {}  # super() clears self.q_table; never let it clear the frozen one
+        super()._reset_counters()
+        self.q_table = self._frozen
+        self._update = _no_update
+        self.convergence = ConvergenceTracker(max_changed_states=-1)  # Never saves or stops
+
+    def run_episode(self):
+        self.epsilon = 0.0
+        super().run_episode()
+
+
+def checkpoint_snapshots(path, episodes, game_seed=agent.GAME_RNG_SEED):
+    """Snapshots of a checkpoint's greedy policy on the selected episode seeds."""
+    log = SnapshotLog(episodes)
+    trainer = ReplayTrainer(DenseQTable(load_q_values(path)[0]), log, max(episodes), game_seed)
+    for _ in range(max(episodes)):
+        trainer.run_episode()
+    trainer.stop()
+    return log.snapshots
+
+
+def training_snapshots(episodes):
+    """Snapshots of the selected episodes of a (seeded, reproducible) training run.
+
+    Stops where Trainer.run() would, and raises ValueError for episodes the
+    real run never reaches (past EPISODES, or past early stopping).
+    """
+    log = SnapshotLog(episodes)
+    trainer = Trainer(log, converged_checkpoint=None)  # Never writes converged_q.npz
+    trainer.evaluator = None
+    last = max(episodes)
+    if last > trainer.episodes:
+        raise ValueError(f"Training runs {trainer.episodes} episodes, not {last}")
+    with contextlib.redirect_stdout(io.StringIO()):  # Interval and convergence prints
+        while trainer.episode < last:
+            if trainer.stopped_early():
+                raise ValueError(f"Training stops early at episode {trainer.episode}; "
+                                 f"episodes up to {last} are never played")
+            trainer.run_episode()
+    trainer.stop()
+    return log.snapshots
+
+
+def select_frames(snapshots, frame_skip=1, hold_frames=1):
+    """Keeps every frame_skip-th snapshot of a hand plus its final one (hold_frames times)."""
+    frames = []
+    step = 0  # Index of the snapshot within its hand
+    for i, snapshot in enumerate(snapshots):
+        last_of_hand = i + 1 == len(snapshots) or snapshots[i + 1].episode != snapshot.episode
+        if last_of_hand and snapshot.result_message:
+            frames.extend([snapshot] * hold_frames)
+        elif last_of_hand or step % frame_skip == 0:
+            frames.append(snapshot)
+        step = 0 if last_of_hand else step + 1
+    return frames
+
+
+# --- Encoders ---
+
+class ImageSequenceWriter:
+    """Writes frame_00000.png, frame_00001.png, ... into directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, index, surface):
+        import pygame
+        pygame.image.save(surface, os.path.join(self.directory, f"frame_{index:05d}.png"))
+
+    def close(self):
+        pass
+
+
+class GifWriter:
+    """Collects frames (optionally downscaled) and saves an animated GIF on close."""
+
+    def __init__(self, path, fps=10, scale=0.5):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise ImportError("GIF output needs Pillow (pip install pillow); "
+                              "write PNG frames to a directory instead") from None
+        self._image = Image
+        self.path = path
+        self.duration_ms = int(1000 / fps)
+        self.scale = scale
+        self.frames = []
+
+    def write(self, index, surface):
+        import pygame
+        width, height = surface.get_size()
+        frame = self._image.frombytes("RGB", (width, height),
+                                      pygame.image.tobytes(surface, "RGB"))
+        if self.scale != 1:
+            factor = 1 / self.scale
+            if factor == int(factor):
+                frame = frame.reduce(int(factor))  # Box filter, much faster than resize
+            else:
+                frame = frame.resize((int(width * self.scale), int(height * self.scale)))
+        self.frames.append(frame.quantize(colors=128, method=self._image.Quantize.FASTOCTREE))
+
+    def close(self):
+        if self.frames:
+            self.frames[0].save(self.path, save_all=True, append_images=self.frames[1:],
+                                duration=self.duration_ms, loop=0)
+
+
+# --- Rendering ---
+
+def _init_headless():
+    """Initializes pygame on the dummy video driver and loads the drawing assets."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from . import render
+    pygame.init()
+    pygame.display.set_mode((render.SCREEN_WIDTH, render.SCREEN_HEIGHT))
+    render.init_fonts()
+    render.load_all_assets()
+    return pygame, render
+
+
+def render_frames(snapshots, writer, pool_size=4, buttons=True):
+    """Draws snapshots into pooled Surfaces and feeds them to writer on a thread.
+
+    Returns the number of frames written.
+    """
+    pygame, render = _init_headless()
+    control_buttons = render.make_control_buttons() if buttons else ()
+    free = queue.Queue()
+    for _ in range(pool_size):
+        free.put(pygame.Surface((render.SCREEN_WIDTH, render.SCREEN_HEIGHT)))
+    drawn = queue.Queue(maxsize=pool_size)
+    errors = []
+
+    def encode():
+        while True:
+            item = drawn.get()
+            if item is None:
+                return
+            index, surface = item
+            try:
+                if not errors:
+                    writer.write(index, surface)
+            except Exception as e:  # Reported once the producer has finished
+                errors.append(e)
+            free.put(surface)
+
+    encoder = threading.Thread(target=encode, name="frame-encoder", daemon=True)
+    encoder.start()
+    try:
+        for index, snapshot in enumerate(snapshots):
+            surface = free.get()  # Blocks while every Surface is waiting to be encoded
+            render.draw_game_elements(surface, snapshot, control_buttons)
+            drawn.put((index, surface))
+    finally:
+        drawn.put(None)
+        encoder.join()
+    if errors:
+        raise errors[0]
+    writer.close()
+    pygame.quit()
+    return len(snapshots)
+
+
+def _parse_episodes(text):
+    """'1-5,9' -> [1, 2, 3, 4, 5, 9]"""
+    episodes = []
+    for part in text.split(','):
+        first, _, last = part.partition('-')
+        episodes.extend(range(int(first), int(last or first) + 1))
+    return episodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--checkpoint", help="Play this .npz/.json Q-table greedily")
+    source.add_argument("--recording", help="JSON-lines Snapshot recording")
+    source.add_argument("--train-episodes", help="Replay these episodes of a training run")
+    parser.add_argument("--episodes", default="1-10",
+                        help="Episodes to render with --checkpoint/--recording, e.g. 1-5,9")
+    parser.add_argument("--out", required=True,
+                        help="Output .gif file, or a directory for PNG frames")
+    parser.add_argument("--frame-skip", type=int, default=1)
+    parser.add_argument("--hold-frames", type=int, default=5,
+                        help="Copies of each hand's final frame")
+    parser.add_argument("--fps", type=int, default=10)
+    parser.add_argument("--scale", type=float, default=0.5, help="GIF downscale factor")
+    parser.add_argument("--pool-size", type=int, default=4, help="Reused frame Surfaces")
+    parser.add_argument("--save-recording", help="Also write the Snapshots as JSON lines")
+    args = parser.parse_args()
+
+    if args.train_episodes:
+        snapshots = training_snapshots(_parse_episodes(args.train_episodes))
+    elif args.checkpoint:
+        snapshots = checkpoint_snapshots(args.checkpoint, _parse_episodes(args.episodes))
+    else:
+        snapshots = load_recording(args.recording, _parse_episodes(args.episodes))
+    if args.save_recording:
+        log = SnapshotLog()
+        log.snapshots = snapshots
+        log.save(args.save_recording)
+
+    frames = select_frames(snapshots, args.frame_skip, args.hold_frames)
+    if args.out.lower().endswith('.gif'):
+        writer = GifWriter(args.out, args.fps, args.scale)
+    else:
+        writer = ImageSequenceWriter(args.out)
+    count = render_frames(frames, writer, args.pool_size)
+    print(f"Rendered {count} frames from {len(snapshots)} snapshots to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
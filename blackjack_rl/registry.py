@@ -0,0 +1,198 @@
+"""Local SQLite registry of training runs.
+
+Each run is one row of hyperparameters, final statistics and the path of
+its .npz Q checkpoint. Its per-interval win rates go in a separate table.
+Hyperparameters and final metrics are indexed, so "best 10 runs" or "every
+run with EPSILON_DECAY = 0.99995" is an index lookup. There is no need to
+scan directories and parse JSON.
+
+    python -m blackjack_rl.registry import training_results.json --checkpoint training_results.npz
+    python -m blackjack_rl.registry best --metric greedy_ev --epsilon-decay 0.99995
+"""
+import argparse
+import json
+import sqlite3
+import time
+
+import numpy as np
+
+DEFAULT_DB = 'runs.sqlite'
+
+HYPERPARAMETERS = ("learning_rate", "discount_factor", "episodes", "epsilon_start",
+                   "epsilon_decay", "epsilon_min", "interval_size")
+STATISTICS = ("total_wins", "total_losses", "total_pushes", "final_win_rate_percent")
+# Sort direction per metric: higher win rate and EV are better, earlier convergence is better
+METRICS = {"final_win_rate_percent": "DESC", "greedy_ev": "DESC", "converged_episode": "ASC"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    name TEXT,
+    checkpoint TEXT,
+    learning_rate REAL,
+    discount_factor REAL,
+    episodes INTEGER,
+    epsilon_start REAL,
+    epsilon_decay REAL,
+    epsilon_min REAL,
+    interval_size INTEGER,
+    total_wins INTEGER,
+    total_losses INTEGER,
+    total_pushes INTEGER,
+    final_win_rate_percent REAL,
+    greedy_ev REAL,
+    converged_episode INTEGER
+);
+CREATE TABLE IF NOT EXISTS interval_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    interval INTEGER NOT NULL,
+    win_rate_percent REAL NOT NULL,
+    PRIMARY KEY (run_id, interval)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS runs_by_hyperparameters
+    ON runs (epsilon_decay, learning_rate, discount_factor, epsilon_min);
+CREATE INDEX IF NOT EXISTS runs_by_learning_rate ON runs (learning_rate);
+CREATE INDEX IF NOT EXISTS runs_by_win_rate ON runs (final_win_rate_percent);
+CREATE INDEX IF NOT EXISTS runs_by_greedy_ev ON runs (greedy_ev);
+CREATE INDEX IF NOT EXISTS runs_by_converged_episode ON runs (converged_episode);
+"""
+
+
+class RunRegistry:
+    """SQLite-backed run registry; rows come back as dicts."""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def register(self, results, checkpoint=None, name=None, greedy_ev=None):
+        """Adds a run from a dict in the training_results.json layout; returns its id."""
+        hyperparameters = results.get("hyperparameters", {})
+        statistics = results.get("statistics", {})
+        row = {key: hyperparameters.get(key) for key in HYPERPARAMETERS}
+        row.update({key: statistics.get(key) for key in STATISTICS})
+        row.update(created_at=time.strftime("%Y-%m-%dT%H:%M:%S"), name=name,
+                   checkpoint=checkpoint, greedy_ev=greedy_ev,
+                   converged_episode=results.get("convergence", {}).get("converged_episode"))
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{key}" for key in row)
+        with self.conn:
+            run_id = self.conn.execute(
+                f"INSERT INTO runs ({columns}) VALUES ({placeholders})", row).lastrowid
+            self.conn.executemany(
+                "INSERT INTO interval_metrics VALUES (?, ?, ?)",
+                [(run_id, i, rate) for i, rate in enumerate(results.get("win_rate_history", []))])
+        return run_id
+
+    def import_json(self, path, checkpoint=None, name=None, greedy_ev=None):
+        with open(path, 'r') as f:
+            results = json.load(f)
+        return self.register(results, checkpoint, name or path, greedy_ev)
+
+    def _where(self, filters):
+        clauses, params = [], []
+        for key, value in filters.items():
+            if key not in HYPERPARAMETERS:
+                raise ValueError(f"Unknown hyperparameter {key!r}")
+            clauses.append(f"{key} = ?")
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def find(self, **filters):
+        """All runs whose hyperparameters equal the given values, newest first."""
+        where, params = self._where(filters)
+        rows = self.conn.execute(f"SELECT * FROM runs{where} ORDER BY id DESC", params)
+        return [dict(row) for row in rows]
+
+    def best(self, metric="final_win_rate_percent", limit=10, **filters):
+        """Top runs by metric, optionally filtered by hyperparameters.
+
+        Best first: highest win rate or greedy EV, earliest converged_episode.
+        Runs without a value for the metric are left out.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {tuple(METRICS)}")
+        where, params = self._where(filters)
+        where += (" AND " if where else " WHERE ") + f"{metric} IS NOT NULL"
+        rows = self.conn.execute(
+            f"SELECT * FROM runs{where} ORDER BY {metric} {METRICS[metric]} LIMIT ?",
+            params + [limit])
+        return [dict(row) for row in rows]
+
+    def get(self, run_id):
+        row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return None if row is None else dict(row)
+
+    def interval_metrics(self, run_id):
+        """Win rate per interval of one run, as a float array."""
+        rows = self.conn.execute(
+            "SELECT win_rate_percent FROM interval_metrics WHERE run_id = ? ORDER BY interval",
+            (run_id,))
+        return np.array([rate for rate, in rows], dtype=np.float64)
+
+    def delete(self, run_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+
+def _print_runs(runs):
+    print(f"{'id':>5} {'decay':>9} {'lr':>6} {'gamma':>6} {'win %':>7} {'greedy EV':>10}  checkpoint")
+    for run in runs:
+        ev = "" if run["greedy_ev"] is None else f"{run['greedy_ev']:+.4f}"
+        win = ("" if run["final_win_rate_percent"] is None
+               else f"{run['final_win_rate_percent']:.2f}")
+        # Every column but id is nullable; str() keeps None printable under a width
+        decay, lr, gamma = ("" if run[key] is None else str(run[key])
+                            for key in ("epsilon_decay", "learning_rate", "discount_factor"))
+        print(f"{run['id']:>5} {decay:>9} {lr:>6} {gamma:>6} {win:>7} {ev:>10}  "
+              f"{run['checkpoint'] or ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=DEFAULT_DB)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("import", help="Register a training_results.json")
+    add.add_argument("results")
+    add.add_argument("--checkpoint")
+    add.add_argument("--name")
+
+    for command in ("list", "best"):
+        query = commands.add_parser(command)
+        for key in HYPERPARAMETERS:
+            query.add_argument("--" + key.replace("_", "-"), type=float)
+        if command == "best":
+            query.add_argument("--metric", choices=tuple(METRICS), default="final_win_rate_percent")
+            query.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    with RunRegistry(args.db) as registry:
+        if args.command == "import":
+            run_id = registry.import_json(args.results, args.checkpoint, args.name)
+            print(f"Registered run {run_id}")
+            return
+        filters = {key: getattr(args, key) for key in HYPERPARAMETERS
+                   if getattr(args, key) is not None}
+        if args.command == "best":
+            _print_runs(registry.best(args.metric, args.limit, **filters))
+        else:
+            _print_runs(registry.find(**filters))
+
+
+if __name__ == "__main__":
+    main()
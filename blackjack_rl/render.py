@@ -0,0 +1,355 @@
+"""Pygame drawing of the table: assets, fonts, buttons and the frame layout.
+
+Used by the live window (main.py) and the offscreen recorder. Call
+pygame.init(), pygame.display.set_mode(), init_fonts() and load_all_assets()
+before drawing.
+"""
+import os
+
+import pygame
+
+# Screen Dimensions
+SCREEN_WIDTH = 1280
+SCREEN_HEIGHT = 720
+
+# Asset Paths
+ASSET_PATH = 'assets'
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GREEN_TABLE = (53, 101, 77)
+
+# Helper function for loading assets
+assets = {}
+CARD_WIDTH = 100
+CARD_HEIGHT = 145
+BUTTON_WIDTH = 150
+BUTTON_HEIGHT = 60
+ICON_SIZE = 40
+
+
+def init_fonts():
+    """Creates the fonts; call after pygame.init()."""
+    global font_large, font_medium, font_small, font_money, font_info
+    font_large = pygame.font.Font(None, 80)
+    font_medium = pygame.font.Font(None, 40)
+    font_small = pygame.font.Font(None, 30)
+    font_money = pygame.font.Font(None, 36)
+    font_info = pygame.font.Font(None, 24)
+
+
+def load_image(filename, alpha=True, scale=None):
+    """Helper function to load and optionally scale images."""
+    path = os.path.join(ASSET_PATH, filename)
+    try:
+        img = pygame.image.load(path)
+        if alpha:
+            img = img.convert_alpha()
+        else:
+            img = img.convert()
+        if scale:
+            img = pygame.transform.smoothscale(img, scale)
+        return img
+    except pygame.error as e:
+        print(f"Error loading image {filename}: {e}. Creating placeholder.")
+        placeholder = pygame.Surface(scale or (50, 50))
+        placeholder.fill((255, 0, 255))  # Magenta for missing image
+        # Draw text for placeholder
+        ph_font = pygame.font.Font(None, 20)
+        ph_text = ph_font.render(filename.split('.')[0], True, BLACK)
+        ph_text_rect = ph_text.get_rect(center=placeholder.get_rect().center)
+        placeholder.blit(ph_text, ph_text_rect)
+        return placeholder
+
+
+def load_all_assets():
+    print("Loading assets...")
+    assets['felt_background'] = load_image(
+        'felt_background.png', alpha=False, scale=(SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    RAIL_TARGET_WIDTH = SCREEN_WIDTH
+    RAIL_TARGET_HEIGHT = int(SCREEN_HEIGHT * 0.25)  # Fixed ratio
+    assets['wooden_rail'] = load_image(
+        'wooden_rail.png', scale=(RAIL_TARGET_WIDTH, RAIL_TARGET_HEIGHT))
+
+    assets['card_back'] = load_image(
+        'card_back.png', scale=(CARD_WIDTH, CARD_HEIGHT))
+
+    # Load all 52 card faces
+    suits = ['H', 'D', 'C', 'S']  # Hearts, Diamonds, Clubs, Spades
+    ranks = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+    for suit in suits:
+        for rank in ranks:
+            card_code = f'card_{rank}{suit}'
+            assets[card_code] = load_image(
+                f'{card_code}.png', scale=(CARD_WIDTH, CARD_HEIGHT))
+
+    # UI Elements
+    assets['title_blackjack'] = load_image(
+        'title_blackjack.png', scale=(300, 70))
+    assets['money_display_box'] = load_image(
+        'money_display_box.png', scale=(250, 60))
+    assets['icon_dollar_sign'] = load_image(
+        'icon_dollar_sign.png', scale=(30, 30))
+
+    # Buttons
+    assets['button_base_normal'] = load_image(
+        'button_base_normal.png', scale=(BUTTON_WIDTH, BUTTON_HEIGHT))
+    assets['button_base_hover'] = load_image(
+        'button_base_hover.png', scale=(BUTTON_WIDTH, BUTTON_HEIGHT))
+
+    # Top Right Icons
+    assets['icon_settings'] = load_image(
+        'icon_settings.png', scale=(ICON_SIZE, ICON_SIZE))
+    assets['icon_help'] = load_image(
+        'icon_help.png', scale=(ICON_SIZE, ICON_SIZE))
+    print("Assets loaded.")
+
+
+# --- UI Button Class ---
+
+
+class Button:
+    def __init__(self, x, y, text, action, size=(BUTTON_WIDTH, BUTTON_HEIGHT)):
+        self.action = action
+        self.normal_image = assets['button_base_normal']
+        self.hover_image = assets.get(
+            'button_base_hover', assets['button_base_normal'])
+
+        if self.normal_image.get_size() != size:
+            self.normal_image = pygame.transform.smoothscale(
+                self.normal_image, size)
+            self.hover_image = pygame.transform.smoothscale(
+                self.hover_image, size)
+
+        self.rect = self.normal_image.get_rect(topleft=(x, y))
+        self.text_surf = font_medium.render(text, True, WHITE)
+        self.text_rect = self.text_surf.get_rect(center=self.rect.center)
+
+        self.current_image = self.normal_image
+
+    def draw(self, surface):
+        if self.rect.collidepoint(pygame.mouse.get_pos()):
+            self.current_image = self.hover_image
+        else:
+            self.current_image = self.normal_image
+
+        surface.blit(self.current_image, self.rect)
+        surface.blit(self.text_surf, self.text_rect)
+
+    def is_clicked(self, pos):
+        return self.rect.collidepoint(pos)
+
+
+def make_control_buttons():
+    """Simulation control buttons; needs init_fonts() and load_all_assets()."""
+    return [
+        Button(SCREEN_WIDTH - BUTTON_WIDTH - 20, SCREEN_HEIGHT -
+               200, "Start Sim", "start_sim", size=(180, 60)),
+        Button(SCREEN_WIDTH - BUTTON_WIDTH - 20, SCREEN_HEIGHT -
+               130, "Pause Sim", "pause_sim", size=(180, 60)),
+        Button(SCREEN_WIDTH - BUTTON_WIDTH - 20, SCREEN_HEIGHT -
+               60, "Reset Q", "reset_q", size=(180, 60)),
+    ]
+
+# --- Main Drawing Function ---
+
+
+def draw_game_elements(screen, snapshot, buttons=()):
+    """Draws one frame of the table from a trainer Snapshot onto screen."""
+    # 1. Background Felt
+    screen.blit(assets['felt_background'], (0, 0))
+
+    # 2. Wooden Rail
+    rail_rect = assets['wooden_rail'].get_rect(
+        midbottom=(SCREEN_WIDTH // 2, SCREEN_HEIGHT))
+    screen.blit(assets['wooden_rail'], rail_rect)
+
+    # 3. Title
+    screen.blit(assets['title_blackjack'], assets['title_blackjack'].get_rect(
+        center=(SCREEN_WIDTH // 2, 50)))
+
+    # 4. Dealer Cards
+    dealer_card_start_x = SCREEN_WIDTH // 2 - \
+        (len(snapshot.dealer_cards) * CARD_WIDTH // 4)
+    dealer_card_y = 100
+    for i, card_code in enumerate(snapshot.dealer_cards):
+        # Fallback to card_back if code not found (e.g., 'back')
+        card_image = assets.get(card_code, assets['card_back'])
+        screen.blit(card_image, (dealer_card_start_x +
+                    (i * (CARD_WIDTH // 3)), dealer_card_y))
+
+    # Dealer Score
+    # Show true score when hand is over
+    if snapshot.dealer_revealed:
+        dealer_score_text = font_medium.render(
+            f"Dealer: {snapshot.dealer_value}", True, WHITE)
+    else:  # Otherwise, show score based on upcard (or 0 if no cards yet)
+        dealer_score_text = font_medium.render(
+            f"Dealer: {snapshot.dealer_value} + ?", True, WHITE)
+    screen.blit(dealer_score_text, (SCREEN_WIDTH // 2 -
+                dealer_score_text.get_width() // 2, dealer_card_y + CARD_HEIGHT + 10))
+
+    # 5. Player Cards
+    player_card_start_x = SCREEN_WIDTH // 2 - \
+        (len(snapshot.player_cards) * CARD_WIDTH // 4)
+    player_card_y = SCREEN_HEIGHT - CARD_HEIGHT - 250
+    for i, card_code in enumerate(snapshot.player_cards):
+        # Fallback to card_back if code not found
+        card_image = assets.get(card_code, assets['card_back'])
+        screen.blit(card_image, (player_card_start_x +
+                    (i * (CARD_WIDTH // 3)), player_card_y))
+
+    # Player Score
+    player_score_text = font_medium.render(
+        f"Agent Hand: {snapshot.player_value}", True, WHITE)
+    screen.blit(player_score_text, (SCREEN_WIDTH // 2 -
+                player_score_text.get_width() // 2, player_card_y - 50))
+
+    # 6. Money Displays (Total and Stake)
+    money_box_width = assets['money_display_box'].get_width()
+    money_box_height = assets['money_display_box'].get_height()
+
+    right_side_x = SCREEN_WIDTH - money_box_width - 30
+    total_money_box_y = SCREEN_HEIGHT - 100 - money_box_height - 10
+    stake_money_box_y = SCREEN_HEIGHT - 100
+
+    # Draw Total Money Box
+    total_money_rect = assets['money_display_box'].get_rect(
+        topleft=(right_side_x, total_money_box_y))
+    screen.blit(assets['money_display_box'], total_money_rect)
+    screen.blit(assets['icon_dollar_sign'], (total_money_rect.x + 10,
+                total_money_rect.centery - assets['icon_dollar_sign'].get_height() // 2))
+    total_money_label_surf = font_small.render("TOTAL", True, WHITE)
+    total_money_text_surf = font_money.render(
+        f"{snapshot.total_money:.2f}", True, WHITE)
+    screen.blit(total_money_label_surf,
+                (total_money_rect.x + 50, total_money_rect.y + 5))
+    screen.blit(total_money_text_surf, (total_money_rect.x + 50,
+                total_money_rect.centery - total_money_text_surf.get_height() // 2 + 10))
+
+    # Draw Stake Money Box
+    stake_money_rect = assets['money_display_box'].get_rect(
+        topleft=(right_side_x, stake_money_box_y))
+    screen.blit(assets['money_display_box'], stake_money_rect)
+    screen.blit(assets['icon_dollar_sign'], (stake_money_rect.x + 10,
+                stake_money_rect.centery - assets['icon_dollar_sign'].get_height() // 2))
+    stake_money_label_surf = font_small.render("STAKE", True, WHITE)
+    stake_money_text_surf = font_money.render(
+        f"{snapshot.stake:.2f}", True, WHITE)
+    screen.blit(stake_money_label_surf,
+                (stake_money_rect.x + 50, stake_money_rect.y + 5))
+    screen.blit(stake_money_text_surf, (stake_money_rect.x + 50,
+                stake_money_rect.centery - stake_money_text_surf.get_height() // 2 + 10))
+
+    # 7. Simulation Control Buttons
+    for button in buttons:
+        button.draw(screen)
+
+    # 8. Game Result Message
+    if snapshot.result_message:
+        result_surf = font_large.render(snapshot.result_message, True, WHITE)
+        result_rect = result_surf.get_rect(
+            center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100))
+        screen.blit(result_surf, result_rect)
+
+    # 9. Agent Info Display (Top Left)
+    info_text_y = 20
+    info_x = 20
+
+    episode_text = font_info.render(
+        f"Episode: {snapshot.episode}/{snapshot.episodes}", True, WHITE)
+    screen.blit(episode_text, (info_x, info_text_y))
+    info_text_y += 30
+
+    epsilon_text = font_info.render(
+        f"Epsilon: {snapshot.epsilon:.4f}", True, WHITE)
+    screen.blit(epsilon_text, (info_x, info_text_y))
+    info_text_y += 30
+
+    action_text = font_info.render(
+        f"Agent Action: {snapshot.agent_action}", True, WHITE)
+    screen.blit(action_text, (info_x, info_text_y))
+    info_text_y += 30
+
+    # Calculate and display winning rate
+    total_hands = snapshot.total_wins + snapshot.total_losses + snapshot.total_pushes
+    if total_hands > 0:
+        winning_rate = (snapshot.total_wins / total_hands) * 100
+    else:
+        winning_rate = 0.0  # No hands played yet
+
+    stats_text = font_info.render(
+        f"Wins: {snapshot.total_wins} | Losses: {snapshot.total_losses} | "
+        f"Pushes: {snapshot.total_pushes}", True, WHITE)
+    screen.blit(stats_text, (info_x, info_text_y))
+    info_text_y += 30
+
+    winning_rate_text = font_info.render(
+        f"Win Rate: {winning_rate:.2f}%", True, WHITE)
+    screen.blit(winning_rate_text, (info_x, info_text_y))
+
+
+# --- Dashboard Tiles ---
+
+tile_assets = {}
+
+
+def load_tile_assets(tile_size):
+    """Scales the felt and cards down for draw_table_tile; call after load_all_assets()."""
+    global font_tile
+    card_height = max(tile_size[1] // 4, 24)
+    card_size = (card_height * CARD_WIDTH // CARD_HEIGHT, card_height)
+    tile_assets['felt_background'] = pygame.transform.smoothscale(
+        assets['felt_background'], tile_size)
+    for code, image in assets.items():
+        if code.startswith('card_'):  # Faces and card_back
+            tile_assets[code] = pygame.transform.smoothscale(image, card_size)
+    font_tile = pygame.font.Font(None, max(tile_size[1] // 14, 14))
+
+
+def draw_table_tile(screen, rect, snapshot, label=""):
+    """Draws a compact table (cards, counters, result) from a Snapshot into rect."""
+    screen.blit(tile_assets['felt_background'], rect.topleft)
+    card_width, card_height = tile_assets['card_back'].get_size()
+    line_height = font_tile.get_linesize()
+
+    # Counters, top left
+    total_hands = snapshot.total_wins + snapshot.total_losses + snapshot.total_pushes
+    winning_rate = snapshot.total_wins / total_hands * 100 if total_hands else 0.0
+    lines = [
+        label,
+        f"Episode {snapshot.episode:,}/{snapshot.episodes:,}",
+        f"Epsilon {snapshot.epsilon:.4f}",
+        f"W/L/P {snapshot.total_wins}/{snapshot.total_losses}/{snapshot.total_pushes}",
+        f"Win Rate {winning_rate:.2f}%",
+        f"$ {snapshot.total_money:.2f}",
+    ]
+    y = rect.y + 6
+    for line in lines:
+        screen.blit(font_tile.render(line, True, WHITE), (rect.x + 8, y))
+        y += line_height
+
+    # Dealer (top) and agent (bottom) cards on the right half, overlapping like the full table
+    cards_x = rect.x + rect.width // 2
+    rows = [
+        (snapshot.dealer_cards, rect.y + 6,
+         f"Dealer {snapshot.dealer_value}" + ("" if snapshot.dealer_revealed else " + ?")),
+        (snapshot.player_cards, rect.bottom - card_height - line_height - 6,
+         f"Agent {snapshot.player_value}"),
+    ]
+    for cards, card_y, caption in rows:
+        for i, card_code in enumerate(cards):
+            screen.blit(tile_assets.get(card_code, tile_assets['card_back']),
+                        (cards_x + i * (card_width // 3), card_y))
+        screen.blit(font_tile.render(caption, True, WHITE), (cards_x, card_y + card_height + 2))
+
+    # Action, bottom left; result, centered
+    screen.blit(font_tile.render(snapshot.agent_action, True, WHITE),
+                (rect.x + 8, rect.bottom - line_height - 6))
+    if snapshot.result_message:
+        result_surf = font_medium.render(snapshot.result_message, True, WHITE)
+        screen.blit(result_surf, result_surf.get_rect(center=(rect.x + rect.width // 4,
+                                                              rect.centery + line_height * 2)))
+    pygame.draw.rect(screen, BLACK, rect, 2)
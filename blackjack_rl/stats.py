@@ -0,0 +1,103 @@
+"""Per-(state, action) visit counts and streaming return statistics.
+
+StateActionStats keeps four dense (N_STATES, N_ACTIONS) arrays next to the
+Q-table: visit counts, Welford running mean and M2 of the observed returns,
+and the episode of the last update. They are updated through a wrapper
+around the Q-update, so the hot loop does O(1) work per update, and exported
+into the .npz checkpoint.
+
+The return of a (state, action) is the discounted final reward of its
+episode, gamma^k * R, where k is the number of later decisions.
+"""
+import numpy as np
+
+from .agent import DISCOUNT_FACTOR, LEARNING_RATE, N_ACTIONS, N_STATES, q_update, state_index
+
+# Checkpoint array names
+STAT_ARRAYS = ("visit_counts", "return_mean", "return_m2", "last_update_episode")
+
+
+class StateActionStats:
+    """Visit counts, return mean/M2 and last-update episode per (state index, action)."""
+
+    def __init__(self, discount_factor=DISCOUNT_FACTOR):
+        self.discount_factor = discount_factor
+        self.visit_counts = np.zeros((N_STATES, N_ACTIONS), dtype=np.int64)
+        self.return_mean = np.zeros((N_STATES, N_ACTIONS))
+        self.return_m2 = np.zeros((N_STATES, N_ACTIONS))
+        self.last_update_episode = np.full((N_STATES, N_ACTIONS), -1, dtype=np.int64)
+        self.episode = 0  # Set by the training loop before each episode
+        self._trajectory = []
+
+    def wrap(self, update=q_update):
+        """Returns an update function that applies update and records the visit."""
+        def recorded_update(q_table, state, action, reward, new_state, learning_rate,
+                            discount_factor):
+            update(q_table, state, action, reward, new_state, learning_rate, discount_factor)
+            index = state_index(state)
+            self.last_update_episode[index, action] = self.episode
+            self._trajectory.append((index, action))
+            if new_state is None:  # Terminal: every step's return is now known
+                self.record_returns(reward)
+        return recorded_update
+
+    def record_returns(self, final_reward):
+        """Welford update for each step of the finished episode."""
+        ret = final_reward
+        for index, action in reversed(self._trajectory):
+            count = self.visit_counts[index, action] + 1
+            self.visit_counts[index, action] = count
+            delta = ret - self.return_mean[index, action]
+            self.return_mean[index, action] += delta / count
+            self.return_m2[index, action] += delta * (ret - self.return_mean[index, action])
+            ret *= self.discount_factor
+        self._trajectory.clear()
+
+    def variance(self):
+        """Sample variance of returns; NaN where there are fewer than two visits."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.visit_counts > 1,
+                            self.return_m2 / (self.visit_counts - 1), np.nan)
+
+    def standard_error(self):
+        """Standard error of each return mean."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self.variance() / self.visit_counts)
+
+    def least_visited(self, n=10):
+        """(state index, action) pairs with the fewest visits, for targeted evaluation."""
+        flat = np.argsort(self.visit_counts, axis=None, kind='stable')[:n]
+        return [tuple(int(i) for i in np.unravel_index(f, self.visit_counts.shape))
+                for f in flat]
+
+    def count_based_update(self, minimum_rate=LEARNING_RATE / 5, update=q_update):
+        """q_update with learning rate max(1 / (visits + 1), minimum_rate) per (state, action)."""
+        def update_with_count_rate(q_table, state, action, reward, new_state, learning_rate,
+                                   discount_factor):
+            visits = self.visit_counts[state_index(state), action]
+            rate = max(1.0 / (visits + 1), minimum_rate)
+            update(q_table, state, action, reward, new_state, rate, discount_factor)
+        return update_with_count_rate
+
+    def summary(self):
+        """JSON-friendly totals for training_results.json."""
+        visited = self.visit_counts[self.visit_counts > 0]
+        return {
+            "visited_state_actions": int(visited.size),
+            "total_visits": int(visited.sum()),
+            "min_visits": int(visited.min()) if visited.size else 0,
+            "median_visits": float(np.median(visited)) if visited.size else 0.0,
+            "max_visits": int(visited.max()) if visited.size else 0,
+        }
+
+    def arrays(self):
+        """Arrays for save_checkpoint(..., **stats.arrays())."""
+        return {name: getattr(self, name) for name in STAT_ARRAYS}
+
+    @classmethod
+    def from_checkpoint(cls, path, discount_factor=DISCOUNT_FACTOR):
+        stats = cls(discount_factor)
+        with np.load(path) as checkpoint:
+            for name in STAT_ARRAYS:
+                setattr(stats, name, checkpoint[name])
+        return stats
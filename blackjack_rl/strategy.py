@@ -0,0 +1,45 @@
+"""Policy tables: greedy policies from Q-values and the Basic Strategy reference.
+
+A policy table is an int8 array shaped STATE_SHAPE (player_sum x
+dealer_upcard x usable_ace) holding the action for every state.
+"""
+import numpy as np
+
+from .agent import DEALER_UPCARDS, PLAYER_SUMS, STATE_SHAPE, DenseQTable, q_table_to_array
+
+STAND = 0
+HIT = 1
+
+
+def greedy_policy(q_table):
+    """Greedy action per state for a dense values array, DenseQTable or dict Q-table.
+
+    Unvisited (all-zero) states resolve to Stand, like np.argmax in the game loop.
+    """
+    if isinstance(q_table, DenseQTable):
+        values = q_table.values
+    elif isinstance(q_table, np.ndarray):
+        values = q_table
+    else:
+        values = q_table_to_array(q_table)
+    return np.argmax(values, axis=-1).astype(np.int8).reshape(values.shape[:-2] + STATE_SHAPE)
+
+
+def basic_strategy_policy():
+    """Hit/Stand Basic Strategy for this game (dealer stands on all 17s, no doubling)."""
+    policy = np.full(STATE_SHAPE, HIT, dtype=np.int8)
+    for i, player_sum in enumerate(PLAYER_SUMS):
+        for j, dealer_upcard in enumerate(DEALER_UPCARDS):
+            # Hard totals
+            if player_sum >= 17:
+                policy[i, j, 0] = STAND
+            elif player_sum >= 13 and dealer_upcard <= 6:
+                policy[i, j, 0] = STAND
+            elif player_sum == 12 and 4 <= dealer_upcard <= 6:
+                policy[i, j, 0] = STAND
+            # Soft totals
+            if player_sum >= 19:
+                policy[i, j, 1] = STAND
+            elif player_sum == 18 and dealer_upcard <= 8:
+                policy[i, j, 1] = STAND
+    return policy
@@ -0,0 +1,170 @@
+"""Training at a multi-seat table: several hands per dealer resolution.
+
+A TableGame (game.py) seats up to MAX_SEATS hands against one dealer hand
+dealt from one shoe, and the dealer plays once per round. Each seat is
+either the learning agent (AGENT: epsilon-greedy on the shared Q-table) or a
+fixed policy table such as strategy.basic_strategy_policy(). One round
+therefore gives a transition batch for every agent seat from a single dealer
+hand. Each seat also sees the card removal caused by the seats before it.
+
+An agent seat's last Stand can only be rewarded after the dealer has played.
+So play_round() buffers each agent seat's transitions and applies them seat
+by seat once the round is settled. Every seat's trajectory still reaches the
+update callable contiguously and in order, so wrappers such as
+StateActionStats.wrap and ConvergenceTracker.wrap work unchanged.
+
+    python -m blackjack_rl.table --rounds 20000 --seats 7 --agent-seats 0,3,6
+"""
+import argparse
+import random
+import time
+
+from . import agent
+from .agent import DenseQTable, choose_action, q_update, state_index
+from .checkpoint import save_checkpoint
+from .game import MAX_SEATS, Shoe, TableGame, get_state
+from .strategy import HIT, STAND, basic_strategy_policy
+
+AGENT = "agent"
+
+
+def play_round(table, seats, q_table, epsilon, rng, learning_rate=agent.LEARNING_RATE,
+               discount_factor=agent.DISCOUNT_FACTOR, update=q_update):
+    """Plays one round at table; agent seats learn from every step.
+
+    seats[i] is AGENT or a policy table (int8, STATE_SHAPE) for seat i.
+    update is called as in agent.play_episode.
+    Returns (results, rewards, number_of_updates), with one result and reward per seat.
+    """
+    table.start_round()
+    dealer_hand = table.dealer_hand
+    transitions = []  # Per agent seat: (seat, [(state, action, new_state), ...])
+    for seat in table.unsettled_seats():
+        hand = table.hands[seat]
+        policy = seats[seat]
+        learning = policy is AGENT
+        if learning:
+            steps = []
+            transitions.append((seat, steps))
+        state = get_state(hand, dealer_hand)
+        while True:
+            if learning:
+                action, _ = choose_action(q_table[state], epsilon, rng)
+            else:
+                action = policy.flat[state_index(state)]
+            if action == STAND:
+                if learning:
+                    steps.append((state, STAND, None))
+                break
+            table.hit(seat)
+            new_state = None if table.results[seat] else get_state(hand, dealer_hand)
+            if learning:
+                steps.append((state, HIT, new_state))
+            if new_state is None:  # Bust
+                break
+            state = new_state
+    table.dealer_turn()
+
+    updates = 0
+    for seat, steps in transitions:
+        terminal_reward = table.reward(seat)
+        for state, action, new_state in steps:
+            reward = terminal_reward if new_state is None else 0.0
+            update(q_table, state, action, reward, new_state, learning_rate, discount_factor)
+        updates += len(steps)
+    rewards = [table.reward(seat) for seat in range(table.num_seats)]
+    return list(table.results), rewards, updates
+
+
+def train_table(rounds=agent.EPISODES, seats=(AGENT,) * MAX_SEATS, q_table=None, num_decks=6,
+                penetration=0.75, game_seed=agent.GAME_RNG_SEED,
+                epsilon_seed=agent.EPSILON_RNG_SEED, learning_rate=agent.LEARNING_RATE,
+                discount_factor=agent.DISCOUNT_FACTOR):
+    """Trains the agent seats for rounds rounds from one persistent Shoe.
+
+    Epsilon decays once per round (agent.epsilon_at(round)). The shoe is
+    reshuffled between rounds once the cut card is reached.
+    Returns (q_table, stats).
+    """
+    if q_table is None:
+        q_table = DenseQTable()
+    rng = random.Random(epsilon_seed)
+    shoe = Shoe(num_decks, penetration, seed=game_seed)
+    table = TableGame(len(seats), deck=shoe)
+    agent_seats = [seat for seat, policy in enumerate(seats) if policy is AGENT]
+    seat_rewards = [0.0] * len(seats)
+    wins = losses = pushes = updates = 0
+
+    start_time = time.perf_counter()
+    for round_number in range(1, rounds + 1):
+        if shoe.needs_shuffle():
+            shoe.reshuffle()
+        results, rewards, steps = play_round(
+            table, seats, q_table, agent.epsilon_at(round_number), rng, learning_rate,
+            discount_factor)
+        updates += steps
+        for seat in range(len(seats)):
+            seat_rewards[seat] += rewards[seat]
+        for seat in agent_seats:
+            if results[seat] == "Win":
+                wins += 1
+            elif results[seat] == "Loss":
+                losses += 1
+            else:
+                pushes += 1
+    elapsed = time.perf_counter() - start_time
+
+    agent_hands = rounds * len(agent_seats)
+    stats = {
+        "rounds": rounds,
+        "agent_hands": agent_hands,
+        "updates": updates,
+        "dealer_turns": table.dealer_turns,
+        "updates_per_dealer_turn": updates / table.dealer_turns if table.dealer_turns else 0.0,
+        "elapsed_seconds": elapsed,
+        "updates_per_second": updates / elapsed if elapsed > 0 else 0.0,
+        "shuffles": shoe.shuffles,
+        "total_wins": wins,
+        "total_losses": losses,
+        "total_pushes": pushes,
+        "agent_mean_reward": (sum(seat_rewards[seat] for seat in agent_seats) / agent_hands
+                              if agent_hands else 0.0),
+        "seat_mean_rewards": [total / rounds for total in seat_rewards] if rounds else [],
+    }
+    return q_table, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=agent.EPISODES)
+    parser.add_argument("--seats", type=int, default=MAX_SEATS)
+    parser.add_argument("--agent-seats", default="all",
+                        help="Comma-separated agent seat numbers (0-based); the others "
+                             "play Basic Strategy")
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--penetration", type=float, default=0.75)
+    parser.add_argument("--checkpoint", default="table_q.npz")
+    args = parser.parse_args()
+
+    if args.agent_seats == "all":
+        agent_seats = set(range(args.seats))
+    else:
+        agent_seats = {int(seat) for seat in args.agent_seats.split(",")}
+    basic = basic_strategy_policy()
+    seats = [AGENT if seat in agent_seats else basic for seat in range(args.seats)]
+
+    q_table, stats = train_table(args.rounds, seats, num_decks=args.decks,
+                                 penetration=args.penetration)
+    print(f"{stats['rounds']:,} rounds, {stats['agent_hands']:,} agent hands, "
+          f"{stats['dealer_turns']:,} dealer turns, {stats['shuffles']:,} shuffles")
+    print(f"{stats['updates']:,} updates ({stats['updates_per_dealer_turn']:.2f} per dealer "
+          f"turn), {stats['updates_per_second']:,.0f} updates/s")
+    print("Mean reward by seat: " + ", ".join(
+        f"{seat}{'*' if seat in agent_seats else ''} {reward:+.4f}"
+        for seat, reward in enumerate(stats['seat_mean_rewards'])) + "  (* = agent)")
+    save_checkpoint(args.checkpoint, q_table)
+    print(f"Saved Q-table to {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
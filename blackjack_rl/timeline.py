@@ -0,0 +1,129 @@
+"""Delta-encoded timeline of Q-table snapshots.
+
+TimelineWriter takes a snapshot of the Q-table every `every` episodes. It
+stores only the state-action entries that changed since the previous
+snapshot (flat index + new value), plus a full keyframe every
+`keyframe_every` snapshots. Everything goes into one .npz file.
+
+Timeline reads it back. Snapshot k is rebuilt from the nearest keyframe at
+or before k plus at most keyframe_every - 1 deltas, so any snapshot can be
+read directly without replaying the whole run:
+
+    timeline = Timeline('policy_timeline.npz')
+    timeline.episodes[-1], timeline.grid(-1).policy()
+    timeline.grids()   # QGrid with a leading snapshot axis, for animations
+
+Values are stored as float32, which is plenty for plotting policies and
+value maps.
+"""
+import numpy as np
+
+from .agent import N_ACTIONS, N_STATES
+from .analytics import QGrid, q_values_to_grid
+from .checkpoint import q_table_arrays
+
+
+class TimelineWriter:
+    """Collects delta-encoded Q snapshots in memory; save() writes the file."""
+
+    def __init__(self, every=500, keyframe_every=20):
+        self.every = every
+        self.keyframe_every = keyframe_every
+        self.episodes = []
+        self.offsets = [0]
+        self.indices = []
+        self.values = []
+        self.keyframes = []
+        self._last = np.zeros(N_STATES * N_ACTIONS, dtype=np.float32)
+
+    def maybe_record(self, episode, q_table):
+        """Records a snapshot if episode is a multiple of every."""
+        if episode % self.every == 0:
+            self.record(episode, q_table_arrays(q_table)[0])
+
+    def record(self, episode, values):
+        """Appends a snapshot of dense (N_STATES, N_ACTIONS) values."""
+        flat = np.asarray(values, dtype=np.float32).reshape(-1)
+        if len(self.episodes) % self.keyframe_every == 0:
+            self.keyframes.append(flat.copy())
+            changed = np.empty(0, dtype=np.int32)
+        else:
+            changed = np.flatnonzero(flat != self._last).astype(np.int32)
+        self.episodes.append(episode)
+        self.indices.append(changed)
+        self.values.append(flat[changed])
+        self.offsets.append(self.offsets[-1] + len(changed))
+        self._last = flat.copy()
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def save(self, path):
+        empty = np.empty(0, dtype=np.float32)
+        np.savez_compressed(
+            path,
+            episodes=np.array(self.episodes, dtype=np.int64),
+            offsets=np.array(self.offsets, dtype=np.int64),
+            indices=np.concatenate(self.indices) if self.indices else empty.astype(np.int32),
+            values=np.concatenate(self.values) if self.values else empty,
+            keyframes=(np.stack(self.keyframes) if self.keyframes
+                       else np.empty((0, N_STATES * N_ACTIONS), dtype=np.float32)),
+            keyframe_every=self.keyframe_every,
+        )
+
+
+class Timeline:
+    """Random-access reader for a file written by TimelineWriter.save()."""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.episodes = data['episodes']
+            self.offsets = data['offsets']
+            self.indices = data['indices']
+            self.values = data['values']
+            self.keyframes = data['keyframes']
+            self.keyframe_every = int(data['keyframe_every'])
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def __getitem__(self, k):
+        """Dense (N_STATES, N_ACTIONS) float32 values of snapshot k."""
+        k = range(len(self))[k]
+        key = k // self.keyframe_every
+        flat = self.keyframes[key].copy()
+        for i in range(key * self.keyframe_every + 1, k + 1):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            flat[self.indices[start:end]] = self.values[start:end]
+        return flat.reshape(N_STATES, N_ACTIONS)
+
+    def __iter__(self):
+        """Yields every snapshot in order, applying each delta once."""
+        flat = None
+        for k in range(len(self)):
+            if k % self.keyframe_every == 0:
+                flat = self.keyframes[k // self.keyframe_every].copy()
+            else:
+                start, end = self.offsets[k], self.offsets[k + 1]
+                flat[self.indices[start:end]] = self.values[start:end]
+            yield flat.reshape(N_STATES, N_ACTIONS).copy()
+
+    def at_episode(self, episode):
+        """Latest snapshot taken at or before episode."""
+        k = int(np.searchsorted(self.episodes, episode, side='right')) - 1
+        if k < 0:
+            raise IndexError(f"No snapshot at or before episode {episode}")
+        return self[k]
+
+    def grid(self, k):
+        """Snapshot k as a QGrid (states with all-zero Q-values count as unvisited)."""
+        values = self[k].astype(np.float64)
+        return QGrid(q_values_to_grid(values, np.any(values != 0.0, axis=1)))
+
+    def grids(self):
+        """All snapshots as one QGrid with a leading snapshot axis."""
+        grids = []
+        for values in self:
+            values = values.astype(np.float64)
+            grids.append(q_values_to_grid(values, np.any(values != 0.0, axis=1)))
+        return QGrid(np.stack(grids), runs=self.episodes)
@@ -0,0 +1,149 @@
+"""Common-random-numbers tournament for comparing frozen policies.
+
+Every policy plays the same pre-generated card streams in one vectorized pass
+(see vectorized.play_hands), with no exploration. Because the hands are
+shared, the difference between two policies' rewards is measured hand by hand
+(a paired comparison). Its variance is var(a) + var(b) - 2 cov(a, b), which
+for similar policies is far below the var(a) + var(b) of two independent
+simulations.
+
+Checkpoints over the full action set (actions.py) can be entered too; the
+Stand/Hit policies then play in the full layout, choosing Stand or Hit
+everywhere.
+
+    python -m blackjack_rl.tournament training_results.npz runs/*.npz --hands 500000
+"""
+import argparse
+import os
+
+import numpy as np
+
+from .actions import FULL_STATE_SHAPE, lift_policy, policy_from_values
+from .agent import STATE_SHAPE
+from .checkpoint import load_q_values
+from .strategy import basic_strategy_policy
+from .vectorized import deal_streams, play_hands
+
+Z_95 = 1.96
+
+
+class TournamentResult:
+    """Per-policy EVs plus pairwise paired statistics.
+
+    diff[i, j] is EV(i) - EV(j); paired_se[i, j] is its standard error from
+    the shared hands, independent_se[i, j] what it would be with independent
+    card sequences of the same length.
+    """
+
+    def __init__(self, names, hands, ev, cov):
+        self.names = list(names)
+        self.hands = hands
+        self.ev = ev
+        self.cov = cov
+        var = np.diag(cov)
+        self.se = np.sqrt(var / hands)
+        self.diff = ev[:, None] - ev[None, :]
+        self.diff_var = np.maximum(var[:, None] + var[None, :] - 2 * cov, 0.0)
+        self.paired_se = np.sqrt(self.diff_var / hands)
+        self.independent_se = np.sqrt((var[:, None] + var[None, :]) / hands)
+
+    def z_scores(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.paired_se > 0, self.diff / self.paired_se, 0.0)
+
+    def hands_to_resolve(self, i, j, delta=0.001, z=Z_95):
+        """Hands needed to resolve an EV difference of delta between i and j.
+
+        Returns (paired, independent) hand counts at the given z.
+        """
+        var_i, var_j = self.cov[i, i], self.cov[j, j]
+        paired = (z / delta) ** 2 * self.diff_var[i, j]
+        independent = (z / delta) ** 2 * (var_i + var_j)
+        return int(np.ceil(paired)), int(np.ceil(independent))
+
+    def ranking(self):
+        """Policy indices sorted from best to worst EV."""
+        return list(np.argsort(-self.ev))
+
+    def summary(self, reference=0):
+        lines = [f"{self.hands:,} hands per policy (common random numbers)",
+                 f"{'policy':<32}{'EV':>10}{'+/-':>9}{'vs ref':>10}{'paired se':>11}"
+                 f"{'indep se':>10}{'z':>8}"]
+        z = self.z_scores()
+        for i in self.ranking():
+            lines.append(
+                f"{self.names[i][:31]:<32}{self.ev[i]:>+10.4f}{Z_95 * self.se[i]:>9.4f}"
+                f"{self.diff[i, reference]:>+10.4f}{self.paired_se[i, reference]:>11.5f}"
+                f"{self.independent_se[i, reference]:>10.5f}{z[i, reference]:>8.2f}")
+        return "\n".join(lines)
+
+
+def run_tournament(policies, names=None, hands=200_000, seed=0, chunk_hands=50_000,
+                   num_decks=1):
+    """Evaluates every policy on the same hands.
+
+    policies is a (P, player_sum, dealer_upcard, usable_ace) action array,
+    or (P,) + actions.FULL_STATE_SHAPE.
+    Hands are generated and played in chunks so memory stays bounded; only
+    the running sums needed for means and covariances are kept.
+    """
+    policies = np.asarray(policies)
+    num_policies = policies.shape[0]
+    if names is None:
+        names = [f"policy_{i}" for i in range(num_policies)]
+    rng = np.random.default_rng(seed)
+
+    reward_sums = np.zeros(num_policies)
+    cross_sums = np.zeros((num_policies, num_policies))
+    for start in range(0, hands, chunk_hands):
+        streams = deal_streams(min(chunk_hands, hands - start), rng, num_decks)
+        rewards = play_hands(policies, streams)
+        reward_sums += rewards.sum(axis=1)
+        cross_sums += rewards @ rewards.T
+
+    ev = reward_sums / hands
+    cov = (cross_sums / hands - np.outer(ev, ev)) * hands / max(hands - 1, 1)
+    return TournamentResult(names, hands, ev, cov)
+
+
+def load_policies(paths):
+    """Greedy policies for a list of checkpoints (.npz or training_results.json).
+
+    If any checkpoint is over the full action set, all policies are returned
+    in the full layout.
+    """
+    policies = [policy_from_values(load_q_values(path)[0]) for path in paths]
+    if any(policy.shape == FULL_STATE_SHAPE for policy in policies):
+        policies = [lift_policy(policy) if policy.shape == STATE_SHAPE else policy
+                    for policy in policies]
+    return np.stack(policies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("checkpoints", nargs="*", help=".npz checkpoints or training_results.json files")
+    parser.add_argument("--hands", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--delta", type=float, default=0.001,
+                        help="EV difference to report the hands needed to resolve")
+    args = parser.parse_args()
+
+    # Basic Strategy is always entered as the reference (index 0)
+    names = ["basic_strategy"] + [os.path.basename(path) for path in args.checkpoints]
+    policies = [basic_strategy_policy()[None]]
+    if args.checkpoints:
+        loaded = load_policies(args.checkpoints)
+        if loaded.shape[1:] == FULL_STATE_SHAPE:
+            policies = [lift_policy(policies[0])]
+        policies.append(loaded)
+    result = run_tournament(np.concatenate(policies), names, args.hands, args.seed)
+    print(result.summary(reference=0))
+
+    for i in range(1, len(names)):
+        paired, independent = result.hands_to_resolve(i, 0, args.delta)
+        print(f"{names[i]}: resolving a {args.delta:.2%} EV gap vs basic_strategy needs "
+              f"{paired:,} paired hands vs {independent:,} independent hands")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""Background Q-learning trainer that publishes snapshots for the visualizer.
+
+The Trainer runs episodes on its own thread and publishes a Snapshot of the
+table (hands, counters, epsilon) after every agent decision and at the end of
+every hand. The pygame thread only ever reads the latest Snapshot, so drawing
+never blocks training and training never waits on drawing.
+"""
+import random
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+import numpy as np
+
+from . import agent
+from .agent import ACTIONS, N_ACTIONS
+from .checkpoint import save_checkpoint
+from .convergence import ConvergenceTracker
+from .evaluator import BackgroundEvaluator
+from .game import BlackjackGame
+from .stats import StateActionStats
+from .strategy import basic_strategy_policy
+from .timeline import TimelineWriter
+
+INTERVAL_SIZE = 1000  # Track win rate every 1000 episodes
+
+# Flat bet settled every hand at get_reward() payouts, for the money display
+STARTING_BANKROLL = 1000.00
+STAKE = 10.00
+
+# Early stopping (see convergence.py). Once the greedy policy has changed in at
+# most CONVERGENCE_MAX_CHANGED_STATES states for CONVERGENCE_PATIENCE windows of
+# INTERVAL_SIZE episodes, or agrees with Basic Strategy in at least
+# REFERENCE_AGREEMENT_THRESHOLD of visited states, the Q-table is saved to
+# CONVERGED_CHECKPOINT and, with EARLY_STOPPING, training stops.
+# With the fixed LEARNING_RATE (0.05) every update moves Q by a constant fraction
+# of its error, so the largest per-window Q change stays near 0.09 for the whole
+# run and only flips are counted; ties between STAND and HIT keep 5-13 of the 360
+# states flipping after 20k episodes. At 12 (~3% of the table) a default run
+# converges at episode 24000 (22000-36000 across seeds); at 3 it never does.
+# EARLY_STOPPING is off so the default run still plays all EPISODES.
+EARLY_STOPPING = False
+CONVERGENCE_PATIENCE = 5
+CONVERGENCE_MAX_CHANGED_STATES = 12
+REFERENCE_AGREEMENT_THRESHOLD = None  # e.g. 0.95
+CONVERGED_CHECKPOINT = 'converged_q.npz'
+
+# Per-(state, action) learning rate max(1 / (visits + 1), MIN_LEARNING_RATE)
+# instead of the fixed LEARNING_RATE (see stats.py)
+COUNT_BASED_LEARNING_RATE = False
+MIN_LEARNING_RATE = 0.01
+
+# Q-table snapshot every TIMELINE_EVERY episodes, delta-encoded (see timeline.py)
+TIMELINE_EVERY = 500
+TIMELINE_PATH = 'policy_timeline.npz'
+
+# Greedy win rate on a fixed set of GREEDY_EVAL_HANDS hands every GREEDY_EVAL_EVERY
+# episodes, measured in a background process (see evaluator.py)
+BACKGROUND_EVALUATION = True
+GREEDY_EVAL_EVERY = 1000
+GREEDY_EVAL_HANDS = 50_000
+
+# Everything the visualizer needs to draw one frame
+Snapshot = namedtuple("Snapshot", [
+    "dealer_cards",  # Display codes, hole card hidden until the hand is over
+    "player_cards",
+    "dealer_value",  # Dealer total if revealed, otherwise the upcard value
+    "dealer_revealed",
+    "player_value",
+    "result_message",
+    "agent_action",
+    "episode",
+    "episodes",
+    "epsilon",
+    "total_wins",
+    "total_losses",
+    "total_pushes",
+    "total_money",
+    "stake",
+])
+
+
+class Trainer:
+    """Owns the Q-table and training counters; runs episodes on a worker thread.
+
+    Control methods (start, pause, reset, stop) are safe to call from the UI
+    thread. Snapshots are published to channel, if one is given.
+    converged_checkpoint=None skips saving the Q-table on convergence.
+    """
+
+    def __init__(self, channel=None, episodes=agent.EPISODES, step_delay=0.0,
+                 game_seed=agent.GAME_RNG_SEED, epsilon_seed=agent.EPSILON_RNG_SEED,
+                 learning_rate=agent.LEARNING_RATE, discount_factor=agent.DISCOUNT_FACTOR,
+                 epsilon_decay=agent.EPSILON_DECAY, converged_checkpoint=CONVERGED_CHECKPOINT):
+        self.channel = channel
+        self.episodes = episodes
+        self.step_delay = step_delay  # Seconds to hold each published step (visual pacing)
+        self.game_seed = game_seed
+        self.epsilon_seed = epsilon_seed
+        self.learning_rate = learning_rate
+        self.discount_factor = discount_factor
+        self.epsilon_decay = epsilon_decay
+        self.converged_checkpoint = converged_checkpoint
+
+        # Using defaultdict for Q-table allows new state-action pairs to be initialized to 0
+        # without pre-defining the entire table explicitly.
+        self.q_table = defaultdict(lambda: np.zeros(N_ACTIONS))
+
+        self._active = threading.Event()  # Set while training should run
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()  # Held for a whole episode; reset() waits on it
+        self._thread = None
+        self.evaluator = (BackgroundEvaluator(GREEDY_EVAL_EVERY, GREEDY_EVAL_HANDS)
+                          if BACKGROUND_EVALUATION else None)
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.q_table.clear()
+        # For epsilon-greedy action choice
+        self.rng = random.Random(self.epsilon_seed)
+        self.epsilon = agent.EPSILON_START
+        self.episode = 0
+        self.steps = 0  # Agent decisions, i.e. Q-updates
+        self.total_wins = 0
+        self.total_losses = 0
+        self.total_pushes = 0
+        self.interval_wins = 0
+        self.interval_losses = 0
+        self.interval_pushes = 0
+        self.interval_games = 0
+        self.win_rates = []  # Store win rates for plotting
+        self.total_money = STARTING_BANKROLL
+        self.convergence = ConvergenceTracker(
+            window=INTERVAL_SIZE, patience=CONVERGENCE_PATIENCE,
+            max_changed_states=CONVERGENCE_MAX_CHANGED_STATES,
+            reference=basic_strategy_policy(),
+            agreement_threshold=REFERENCE_AGREEMENT_THRESHOLD)
+        self.stats = StateActionStats(self.discount_factor)
+        base_update = (self.stats.count_based_update(MIN_LEARNING_RATE)
+                       if COUNT_BASED_LEARNING_RATE else agent.q_update)
+        self._update = self.convergence.wrap(self.stats.wrap(base_update))
+        self.timeline = TimelineWriter(TIMELINE_EVERY)
+        if self.evaluator is not None:
+            self.evaluator.discard_pending()
+        self.game = BlackjackGame(seed=self.game_seed)
+        self.result_message = ""
+        self.agent_action = ""
+
+    # --- Control (UI thread) ---
+
+    def start_thread(self):
+        if self.evaluator is not None:
+            self.evaluator.start()  # Before the trainer thread exists, so the fork is clean
+        self._thread = threading.Thread(target=self.run, name="trainer", daemon=True)
+        self._thread.start()
+
+    def start(self):
+        self._active.set()
+
+    def pause(self):
+        self._active.clear()
+
+    def is_active(self):
+        return self._active.is_set()
+
+    def reset(self):
+        """Pauses training and clears the Q-table and all counters."""
+        self.pause()
+        with self._lock:
+            self._reset_counters()
+            self.result_message = "Q-Table Reset!"
+            self.publish()
+
+    def stop(self):
+        self._stopped.set()
+        self._active.set()  # Wake the thread so it can exit
+        if self._thread is not None:
+            self._thread.join()
+        if self.evaluator is not None:
+            self.evaluator.close()
+
+    # --- Training (worker thread) ---
+
+    def run(self):
+        while not self._stopped.is_set():
+            if not self._active.wait(timeout=0.5):
+                continue
+            if self._stopped.is_set():
+                break
+            with self._lock:
+                if self.episode >= self.episodes or self.stopped_early():
+                    self.result_message = ("Converged!" if self.stopped_early()
+                                           else "Training Complete!")
+                    self.publish()
+                    self.pause()  # Stop simulation when episodes complete
+                    continue
+                self.run_episode()
+
+    def run_episode(self):
+        """Plays and learns from one hand, publishing each decision."""
+        self.episode += 1
+        self.result_message = ""  # Clear previous result
+
+        # Use a new seed for each episode to ensure different card sequences per episode,
+        # but the overall sequence of episodes is reproducible due to game_seed.
+        self.game = BlackjackGame(seed=self.game_seed + self.episode)
+        self.stats.episode = self.episode
+        result, reward, updates = agent.play_episode(
+            self.game, self.q_table, self.epsilon, self.rng, self.learning_rate,
+            self.discount_factor, update=self._update, on_step=self._on_step)
+        self.total_money += STAKE * reward
+        self.steps += updates
+
+        # Hands decided on the deal (Blackjack) involve no agent decision
+        dealt_out = updates == 0
+        is_player_blackjack = (dealt_out and self.game.player_hand.is_blackjack()
+                               and result == "Win")
+        self.result_message = result + (" (Blackjack!)" if is_player_blackjack else "")
+        if result == "Win":
+            self.total_wins += 1
+        elif result == "Loss":
+            self.total_losses += 1
+        elif result == "Push":
+            self.total_pushes += 1
+
+        if dealt_out:
+            self._end_episode(hold=1)
+            return
+
+        if result == "Win":
+            self.interval_wins += 1  # Track wins for current interval
+        elif result == "Loss":
+            self.interval_losses += 1
+        elif result == "Push":
+            self.interval_pushes += 1
+        self.interval_games += 1
+        # Check if we've completed an interval
+        if self.interval_games >= INTERVAL_SIZE:
+            current_win_rate = (self.interval_wins / self.interval_games) * 100
+            self.win_rates.append(current_win_rate)
+            print(f"Episodes {self.episode - INTERVAL_SIZE + 1}-{self.episode}: "
+                  f"Win Rate = {current_win_rate:.2f}%")
+            self.interval_wins = 0
+            self.interval_losses = 0
+            self.interval_pushes = 0
+            self.interval_games = 0
+
+        self._end_episode(hold=2)  # Longer pause at game end
+
+    def _end_episode(self, hold):
+        already_converged = self.convergence.converged_episode is not None
+        if self.convergence.end_episode(self.episode) and not already_converged:
+            print(f"Converged at episode {self.episode} ({self.convergence.reason})")
+            if self.converged_checkpoint is not None:
+                save_checkpoint(self.converged_checkpoint, self.q_table, **self.stats.arrays())
+        self.timeline.maybe_record(self.episode, self.q_table)
+        if self.evaluator is not None:
+            for evaluation in self.evaluator.maybe_submit(self.episode, self.q_table):
+                print(f"Greedy evaluation after episode {evaluation['episode']}: "
+                      f"Win Rate = {evaluation['win_rate_percent']:.2f}%, "
+                      f"mean reward {evaluation['mean_reward']:+.4f}")
+        self.publish()
+        # Epsilon decay happens at end of episode (hand)
+        self.epsilon = max(agent.EPSILON_MIN, self.epsilon * self.epsilon_decay)
+        if self.step_delay:
+            time.sleep(self.step_delay * hold)
+
+    def _on_step(self, game, action, explored):
+        self.agent_action = ("Explore: " if explored else "Exploit: ") + ACTIONS[action]
+        self.publish()
+        if self.step_delay:
+            time.sleep(self.step_delay)  # Pause for visual effect
+
+    # --- Snapshots and Results ---
+
+    def snapshot(self):
+        game = self.game
+        dealer_revealed = game.game_over
+        if dealer_revealed:
+            dealer_value = game.dealer_hand.value
+        else:
+            dealer_value = game.dealer_hand.cards[0].value if game.dealer_hand.cards else 0
+        return Snapshot(
+            dealer_cards=game.dealer_hand.get_display_codes(hide_first_card=not dealer_revealed),
+            player_cards=game.player_hand.get_display_codes(),
+            dealer_value=dealer_value,
+            dealer_revealed=dealer_revealed,
+            player_value=game.player_hand.value,
+            result_message=self.result_message,
+            agent_action=self.agent_action,
+            episode=self.episode,
+            episodes=self.episodes,
+            epsilon=self.epsilon,
+            total_wins=self.total_wins,
+            total_losses=self.total_losses,
+            total_pushes=self.total_pushes,
+            total_money=self.total_money,
+            stake=STAKE,
+        )
+
+    def publish(self):
+        if self.channel is not None:
+            self.channel.publish(self.snapshot())
+
+    def stopped_early(self):
+        return EARLY_STOPPING and self.convergence.converged_episode is not None
+
+    def winning_rate(self):
+        total_hands = self.total_wins + self.total_losses + self.total_pushes
+        return (self.total_wins / total_hands) * 100 if total_hands else 0.0
+
+    def results(self):
+        """Training results in the training_results.json layout."""
+        return {
+            "hyperparameters": {
+                "learning_rate": self.learning_rate,
+                "count_based_learning_rate": COUNT_BASED_LEARNING_RATE,
+                "discount_factor": self.discount_factor,
+                "episodes": self.episodes,
+                "epsilon_start": agent.EPSILON_START,
+                "epsilon_decay": self.epsilon_decay,
+                "epsilon_min": agent.EPSILON_MIN,
+                "interval_size": INTERVAL_SIZE
+            },
+            "statistics": {
+                "total_wins": self.total_wins,
+                "total_losses": self.total_losses,
+                "total_pushes": self.total_pushes,
+                "final_win_rate_percent": self.winning_rate()
+            },
+            "win_rate_history": self.win_rates,
+            "convergence": self.convergence.results(),
+            "greedy_evaluation": None if self.evaluator is None else {
+                "every": self.evaluator.every,
+                "hands": self.evaluator.hands,
+                "skipped": self.evaluator.skipped,
+                "history": self.evaluator.history,
+            },
+            "visit_statistics": self.stats.summary(),
+            # Convert Q-table keys (tuples) to strings for JSON compatibility
+            "q_table": {str(k): v.tolist() for k, v in self.q_table.items()}
+        }
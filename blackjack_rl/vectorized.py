@@ -0,0 +1,271 @@
+"""NumPy blackjack engine: plays many hands for many fixed policies at once.
+
+Hands follow BlackjackGame exactly: a freshly shuffled deck per hand, deal
+order player/dealer/player/dealer, immediate Blackjack checks, the player
+acting on get_state(), the dealer standing on all 17s, and get_reward()
+payouts (3:2 for a player Blackjack).
+
+Cards are pre-generated as a (hands, cards) stream of values (1 = Ace,
+10 = ten or face card). Every policy plays against the same streams, so
+results for different policies are paired (common random numbers).
+
+play_full_hands() does the same for policies over the full action set
+(actions.py). Each (policy, hand) pair keeps its split hands in a fixed
+stack of MAX_HANDS slots, as BlackjackGame does, so splitting only moves
+indices and never reshapes anything.
+"""
+import numpy as np
+
+from .actions import (AFTER_HIT, DOUBLE, FIRST, FIRST_PAIR, FULL_STATE_SHAPE, HIT, SPLIT,
+                      SPLIT_HAND, SPLIT_PAIR, STAND, SURRENDER)
+from .agent import DEALER_UPCARDS, PLAYER_SUMS
+from .game import MAX_HANDS
+
+# Card values in one 52-card deck (1 = Ace, 10 = 10/J/Q/K)
+DECK_VALUES = np.repeat(np.arange(1, 11, dtype=np.int8), [4] * 9 + [16])
+# Longest non-bust hand: 21 aces (hard 21) with num_decks >= 6, and
+# A,A,A,A,2,2,2,2,3,3,3 with one deck. play_hands stops as soon as no hand is
+# still hitting, so the bound for any number of decks costs nothing.
+MAX_PLAYER_CARDS = 21
+
+
+def deal_streams(hands, rng, num_decks=1, cards_per_hand=None):
+    """Shuffled card streams, one row per hand, from a numpy Generator.
+
+    Only the first cards_per_hand cards of each shuffled deck are kept
+    (a hand rarely uses more than ~12); None keeps the whole deck.
+    """
+    deck = np.tile(DECK_VALUES, num_decks)
+    streams = rng.permuted(np.broadcast_to(deck, (hands, deck.size)), axis=1)
+    if cards_per_hand is not None:
+        streams = streams[:, :cards_per_hand]
+    return np.ascontiguousarray(streams)
+
+
+def hand_values(totals, aces):
+    """Best blackjack value for hard totals (aces counted as 1) -> (value, soft)."""
+    soft = aces & (totals + 10 <= 21)
+    return np.where(soft, totals + 10, totals), soft
+
+
+def play_hands(policies, streams):
+    """Plays every hand in streams with every policy.
+
+    policies is an int array shaped (P, player_sum, dealer_upcard, usable_ace)
+    (or a single policy without the leading axis); streams is (H, cards).
+    Full-action policies (actions.FULL_STATE_SHAPE) go to play_full_hands().
+    Returns a float (P, H) array of rewards.
+    """
+    policies = np.asarray(policies)
+    if policies.shape[-len(FULL_STATE_SHAPE):] == FULL_STATE_SHAPE:
+        return play_full_hands(policies, streams)
+    if policies.ndim == 3:
+        policies = policies[None]
+    num_policies = policies.shape[0]
+    num_hands, num_cards = streams.shape
+    streams = streams.astype(np.int16)
+
+    # Deal order matches BlackjackGame.start_hand(): P, D (upcard), P, D (hole)
+    player_total = streams[:, 0] + streams[:, 2]
+    player_aces = (streams[:, 0] == 1) | (streams[:, 2] == 1)
+    dealer_upcard = streams[:, 1]
+    dealer_total = dealer_upcard + streams[:, 3]
+    dealer_aces = (dealer_upcard == 1) | (streams[:, 3] == 1)
+
+    player_natural = player_aces & (player_total == 11)
+    dealer_natural = dealer_aces & (dealer_total == 11)
+    decided = player_natural | dealer_natural
+    upcard_idx = np.where(dealer_upcard == 1, 11, dealer_upcard) - DEALER_UPCARDS.start
+
+    # Per (policy, hand) state from here on
+    shape = (num_policies, num_hands)
+    hand_idx = np.broadcast_to(np.arange(num_hands), shape)
+    policy_idx = np.broadcast_to(np.arange(num_policies)[:, None], shape)
+    totals = np.broadcast_to(player_total, shape).copy()
+    aces = np.broadcast_to(player_aces, shape).copy()
+    next_card = np.full(shape, 4)
+    acting = np.broadcast_to(~decided, shape).copy()
+    upcards = np.broadcast_to(upcard_idx, shape)
+
+    # Player decisions: one vectorized step per card drawn
+    for _ in range(min(MAX_PLAYER_CARDS, num_cards)):
+        if not acting.any():
+            break
+        values, soft = hand_values(totals, aces)
+        sums = np.maximum(values, PLAYER_SUMS.start) - PLAYER_SUMS.start
+        action = policies[policy_idx, np.minimum(sums, len(PLAYER_SUMS) - 1), upcards,
+                          soft.astype(np.intp)]
+        hit = acting & (action == 1)
+        card = streams[hand_idx, np.minimum(next_card, num_cards - 1)]
+        totals += np.where(hit, card, 0)
+        aces |= hit & (card == 1)
+        next_card += hit
+        acting = hit & (totals <= 21)
+
+    player_value, _ = hand_values(totals, aces)
+    player_bust = player_value > 21
+
+    # Dealer draws after the player's cards for every hand still live
+    d_totals = np.broadcast_to(dealer_total, shape).copy()
+    d_aces = np.broadcast_to(dealer_aces, shape).copy()
+    drawing = np.broadcast_to(~decided, shape) & ~player_bust
+    while True:
+        d_values, _ = hand_values(d_totals, d_aces)
+        drawing &= d_values < 17
+        if not drawing.any():
+            break
+        card = streams[hand_idx, np.minimum(next_card, num_cards - 1)]
+        d_totals += np.where(drawing, card, 0)
+        d_aces |= drawing & (card == 1)
+        next_card += drawing
+    dealer_value, _ = hand_values(d_totals, d_aces)
+
+    rewards = np.sign(player_value - dealer_value).astype(np.float64)
+    rewards[dealer_value > 21] = 1.0
+    rewards[player_bust] = -1.0
+    naturals = np.where(player_natural & dealer_natural, 0.0,
+                        np.where(player_natural, 1.5, -1.0))
+    return np.where(decided, naturals, rewards)
+
+
+def play_full_hands(policies, streams):
+    """play_hands() for full-action policies shaped (P,) + actions.FULL_STATE_SHAPE.
+
+    Policies must only choose legal actions (e.g. actions.full_greedy_policy()).
+    Cards are drawn in BlackjackGame's order: a split hand gets its second
+    card when play reaches it, and the dealer draws after the last hand.
+    Each (policy, hand) pair is a lane; every step only touches the lanes
+    still acting, so finished lanes cost nothing.
+    Returns a float (P, H) array of net rewards over all hands.
+    """
+    policies = np.asarray(policies)
+    if policies.ndim == 4:
+        policies = policies[None]
+    num_policies = policies.shape[0]
+    num_hands, num_cards = streams.shape
+    streams = streams.astype(np.int16)
+    num_kinds = policies.shape[-1]
+
+    player_total = streams[:, 0] + streams[:, 2]
+    player_aces = (streams[:, 0] == 1) | (streams[:, 2] == 1)
+    dealer_upcard = streams[:, 1]
+    dealer_total = dealer_upcard + streams[:, 3]
+    dealer_aces = (dealer_upcard == 1) | (streams[:, 3] == 1)
+
+    player_natural = player_aces & (player_total == 11)
+    dealer_natural = dealer_aces & (dealer_total == 11)
+    decided = player_natural | dealer_natural
+    upcard_idx = np.where(dealer_upcard == 1, 11, dealer_upcard) - DEALER_UPCARDS.start
+
+    # Lane l plays hand l % H with policy l // H
+    lanes = num_policies * num_hands
+    lane_hand = np.tile(np.arange(num_hands), num_policies)
+    flat_policies = policies.reshape(-1)
+    # Offset of (policy, upcard, player_sum 4, hard, AFTER_HIT) in flat_policies
+    state_base = (np.repeat(np.arange(num_policies), num_hands) * policies[0].size +
+                  upcard_idx[lane_hand] * (2 * num_kinds))
+    sum_stride = policies.shape[2] * 2 * num_kinds
+
+    def draw(lane):
+        card = streams[lane_hand[lane], np.minimum(next_card[lane], num_cards - 1)]
+        next_card[lane] += 1
+        return card
+
+    # The hand being played, per lane
+    next_card = np.full(lanes, 4)
+    first = streams[lane_hand, 0]  # First card (the pair card once split)
+    second = streams[lane_hand, 2]
+    totals = player_total[lane_hand]
+    aces = player_aces[lane_hand]
+    num_cards_in_hand = np.full(lanes, 2, dtype=np.int8)
+    # Hand stack: current slot, slots in use, and each finished hand's value and stake
+    current = np.zeros(lanes, dtype=np.intp)
+    num_split_hands = np.ones(lanes, dtype=np.intp)
+    stack_values = np.zeros((lanes, MAX_HANDS), dtype=np.int16)
+    stack_bets = np.zeros((lanes, MAX_HANDS))
+    surrendered = np.zeros(lanes, dtype=bool)
+
+    active = np.flatnonzero(~decided[lane_hand])
+    while active.size:
+        total, ace, base = totals[active], aces[active], first[active]
+        soft = ace & (total <= 11)
+        two_cards = num_cards_in_hand[active] == 2
+        pair = (two_cards & (base == second[active]) &
+                (num_split_hands[active] < MAX_HANDS))
+        kind = np.where(num_split_hands[active] == 1, np.where(pair, FIRST_PAIR, FIRST),
+                        np.where(pair, SPLIT_PAIR, SPLIT_HAND))
+        kind[~two_cards] = AFTER_HIT
+        value = total + 10 * soft
+        action = flat_policies[state_base[active] + (value - PLAYER_SUMS.start) * sum_stride +
+                               soft * num_kinds + kind]
+
+        # Hit and Double draw one card (a Double then stands); a Split deals
+        # the hand a new second card and leaves the pair card in the next slot
+        hitting = (action == HIT) | (action == DOUBLE)
+        splitting = action == SPLIT
+        card = draw(active[hitting | splitting])
+        moved = np.zeros(active.size, dtype=np.int16)
+        moved[hitting | splitting] = card
+        total = np.where(splitting, base, total) + moved
+        ace = np.where(splitting, base == 1, ace) | (moved == 1)
+        totals[active], aces[active] = total, ace
+        num_cards_in_hand[active] += hitting
+        second[active[splitting]] = moved[splitting]
+        num_split_hands[active[splitting]] += 1
+        surrendered[active[action == SURRENDER]] = True
+
+        finished = ((action == STAND) | (action == DOUBLE) | (hitting & (total > 21)) |
+                    (splitting & (base == 1)))  # Split Aces get one card each
+        still_acting = [active[~finished & (action != SURRENDER)]]
+        done = active[finished]
+        bets = np.where(action[finished] == DOUBLE, 2.0, 1.0)
+
+        # Finished hands go on the stack; the next split hand gets its second card
+        while done.size:
+            total = totals[done]
+            stack_values[done, current[done]] = np.where(aces[done] & (total <= 11),
+                                                         total + 10, total)
+            stack_bets[done, current[done]] = bets
+            current[done] += 1
+            starting = done[current[done] < num_split_hands[done]]
+            card = draw(starting)
+            base = first[starting]
+            totals[starting] = base + card
+            aces[starting] = (base == 1) | (card == 1)
+            second[starting] = card
+            num_cards_in_hand[starting] = 2
+            done = starting[base == 1]
+            bets = 1.0
+            still_acting.append(starting[base != 1])
+        active = np.concatenate(still_acting)
+
+    # Dealer draws after the player's cards if any hand is still live
+    live = np.any((stack_bets > 0) & (stack_values <= 21), axis=1)
+    d_totals = dealer_total[lane_hand]
+    d_aces = dealer_aces[lane_hand]
+    drawing = np.flatnonzero(live)
+    while drawing.size:
+        total = d_totals[drawing]
+        drawing = drawing[np.where(d_aces[drawing] & (total <= 11), total + 10, total) < 17]
+        card = draw(drawing)
+        d_totals[drawing] += card
+        d_aces[drawing] |= card == 1
+    dealer_value, _ = hand_values(d_totals, d_aces)
+
+    def payout(lane, slot):
+        value = stack_values[lane, slot]
+        dealer = dealer_value[lane]
+        outcome = np.where(value > 21, -1, np.where(dealer > 21, 1, np.sign(value - dealer)))
+        return outcome * stack_bets[lane, slot]
+
+    # Slot 0 for every lane, the other slots only where the hand was split
+    rewards = payout(slice(None), 0)
+    split_lanes = np.flatnonzero(num_split_hands > 1)
+    for slot in range(1, MAX_HANDS):
+        split_lanes = split_lanes[num_split_hands[split_lanes] > slot]
+        rewards[split_lanes] += payout(split_lanes, slot)
+    rewards[surrendered] = -0.5
+    naturals = np.where(player_natural & dealer_natural, 0.0,
+                        np.where(player_natural, 1.5, -1.0))
+    return np.where(decided[lane_hand], naturals[lane_hand], rewards).reshape(num_policies,
+                                                                              num_hands)
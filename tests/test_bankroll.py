@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from blackjack_rl.bankroll import SCHEMES, simulate_sessions
+
+# Full-action outcomes: a lost doubled split of four hands costs 8 stakes
+REWARDS = np.array([-8.0, -2.0, -1.0, -0.5, 0.0, 1.0, 1.5, 2.0])
+PROBABILITIES = np.array([0.01, 0.05, 0.40, 0.03, 0.08, 0.36, 0.04, 0.03])
+
+
+@pytest.mark.parametrize("scheme", sorted(SCHEMES))
+def test_sessions_never_lose_more_than_the_bankroll(scheme):
+    report = simulate_sessions(REWARDS, PROBABILITIES / PROBABILITIES.sum(),
+                               SCHEMES[scheme](5.0), sessions=20_000,
+                               hands_per_session=300, bankroll=50.0)
+    assert report.pnl.min() >= -50.0
+    assert report.risk_of_ruin > 0  # The bound is reached, not just never approached
+
+
+def test_stand_hit_outcomes_keep_full_stakes():
+    # Worst outcome -1: stakes are only capped by the money left, as before
+    rewards = np.array([-1.0, 1.0])
+    report = simulate_sessions(rewards, np.array([1.0, 0.0]), SCHEMES["flat"](1.0),
+                               sessions=10, hands_per_session=5, bankroll=10.0)
+    np.testing.assert_array_equal(report.pnl, -5.0)
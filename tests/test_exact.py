@@ -0,0 +1,92 @@
+from itertools import permutations
+
+import pytest
+
+from blackjack_rl.exact import RANKS, ExactSolver
+
+# Unseen cards (including the dealer's hole card), small enough to enumerate every order
+UNSEEN = (1, 2, 3, 5, 6, 10, 10)
+DECK = tuple(UNSEEN.count(rank) for rank in RANKS)
+
+
+def _value(total, has_ace):
+    return total + 10 if has_ace and total + 10 <= 21 else total
+
+
+def _dealer_final(upcard, cards):
+    total, has_ace = upcard, upcard == 1
+    cards = iter(cards)
+    while _value(total, has_ace) < 17:
+        card = next(cards)
+        total += card
+        has_ace = has_ace or card == 1
+    return _value(total, has_ace)
+
+
+def _settle(player_value, dealer_value):
+    if player_value > 21:
+        return -1.0
+    if dealer_value > 21 or player_value > dealer_value:
+        return 1.0
+    return -1.0 if player_value < dealer_value else 0.0
+
+
+def _dealer_blackjack(upcard, hole):
+    return {upcard, hole} == {1, 10}
+
+
+def brute_force(upcard, play):
+    """Mean of play(order) over every order of UNSEEN without a dealer Blackjack.
+
+    order[0] is the hole card; the rest are dealt in order.
+    """
+    evs = [play(order) for order in permutations(UNSEEN)
+           if not _dealer_blackjack(upcard, order[0])]
+    return sum(evs) / len(evs)
+
+
+@pytest.mark.parametrize("upcard", [1, 6, 10])
+@pytest.mark.parametrize("player_value", [16, 18, 20])
+def test_stand_ev_matches_enumeration(upcard, player_value):
+    expected = brute_force(upcard, lambda order: _settle(
+        player_value, _dealer_final(upcard, (order[0],) + order[1:])))
+    assert ExactSolver().stand_ev(player_value, upcard, DECK) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("upcard", [1, 6, 10])
+@pytest.mark.parametrize("total, has_ace", [(11, False), (7, True), (16, False)])
+def test_double_ev_matches_enumeration(upcard, total, has_ace):
+    def play(order):
+        hole, card, rest = order[0], order[1], order[2:]
+        player_value = _value(total + card, has_ace or card == 1)
+        if player_value > 21:
+            return -2.0
+        return 2 * _settle(player_value, _dealer_final(upcard, (hole,) + rest))
+
+    expected = brute_force(upcard, play)
+    assert ExactSolver().double_ev(total, has_ace, upcard, DECK) == pytest.approx(expected)
+
+
+def test_dealer_distribution_is_a_distribution():
+    solver = ExactSolver()
+    for upcard in RANKS:
+        outcome = solver.dealer_distribution(upcard, DECK)
+        assert sum(outcome) == pytest.approx(1.0)
+        assert min(outcome) >= 0.0
+
+
+def test_hit_ev_when_every_card_busts():
+    tens = (0,) * 9 + (8,)
+    stand, hit = ExactSolver().action_evs(20, False, 10, tens)
+    assert stand == pytest.approx(0.0)  # Dealer's hole card is a ten too
+    assert hit == pytest.approx(-1.0)
+
+
+def test_bounded_caches_give_the_same_evs():
+    deck = (4, 3, 4, 4, 4, 4, 4, 4, 3, 15)  # One deck less 10, 2 (player) and 9 (upcard)
+    unbounded = ExactSolver().action_evs(12, False, 9, deck)
+    small = ExactSolver(dealer_cache_size=64, player_cache_size=64)
+    assert small.action_evs(12, False, 9, deck) == pytest.approx(unbounded)
+    stats = small.cache_stats()
+    assert stats["dealer"]["size"] <= 64 and stats["player"]["size"] <= 64
+    assert stats["dealer"]["evictions"] > 0
@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pytest
+
+from blackjack_rl import agent, hogwild
+
+EPISODES = 3000
+
+
+def test_single_worker_matches_single_process_loop():
+    # One worker plays every episode in order, with the same seeds as agent.train()
+    single_q, single_stats = agent.train(EPISODES)
+    hogwild_q, hogwild_stats = hogwild.train_hogwild(1, EPISODES)
+    np.testing.assert_array_equal(hogwild_q.values, single_q.values)
+    assert hogwild_stats["updates"] == single_stats["updates"]
+    assert hogwild_stats["total_wins"] == single_stats["total_wins"]
+
+
+@pytest.mark.parametrize("lock_stripes", [0, 4])
+def test_workers_share_one_table(lock_stripes):
+    q_table, stats = hogwild.train_hogwild(2, EPISODES, lock_stripes)
+    assert stats["workers"] == 2 and stats["episodes"] == EPISODES
+    assert stats["updates"] > 0
+    assert np.any(q_table.values != 0.0)
+
+
+def _dying_worker(shm_name, worker_id, *args):
+    if worker_id == 1:
+        os._exit(3)
+    _original_worker(shm_name, worker_id, *args)
+
+
+_original_worker = hogwild._worker
+
+
+@pytest.mark.skipif(hogwild.mp.get_start_method() != "fork",
+                    reason="patched worker only reaches forked children")
+def test_dead_worker_raises_with_exit_code(monkeypatch):
+    monkeypatch.setattr(hogwild, "_worker", _dying_worker)
+    with pytest.raises(RuntimeError, match="worker 1 died with exit code 3"):
+        hogwild.train_hogwild(2, EPISODES)
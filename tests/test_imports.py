@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import blackjack_rl
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_after(code, cwd=None):
+    """{'numpy': bool, 'pygame': bool} in a fresh interpreter after running code."""
+    script = code + ("\nimport json, sys\n"
+                     "print(json.dumps({m: m in sys.modules for m in ('numpy', 'pygame')}))")
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, "-c", script], cwd=cwd or ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_package_import_loads_nothing_heavy():
+    assert loaded_after("import blackjack_rl") == {"numpy": False, "pygame": False}
+
+
+def test_game_core_needs_neither_numpy_nor_pygame():
+    loaded = loaded_after("from blackjack_rl import BlackjackGame, get_state, get_reward\n"
+                          "game = BlackjackGame(seed=1)\ngame.start_hand()")
+    assert loaded == {"numpy": False, "pygame": False}
+
+
+def test_trainer_loads_numpy_but_not_pygame():
+    assert loaded_after("from blackjack_rl import Trainer") == {"numpy": True, "pygame": False}
+
+
+def test_only_render_imports_pygame():
+    code = ("import pkgutil, importlib, blackjack_rl\n"
+            "for module in pkgutil.iter_modules(blackjack_rl.__path__):\n"
+            "    if module.name != 'render':\n"
+            "        importlib.import_module('blackjack_rl.' + module.name)")
+    assert loaded_after(code)["pygame"] is False
+
+
+def test_importing_main_has_no_side_effects(tmp_path):
+    loaded = loaded_after("import main", cwd=tmp_path)
+    assert loaded["pygame"] is False
+    assert list(tmp_path.iterdir()) == []  # No checkpoints, results or registry written
+
+
+def test_lazy_exports():
+    assert set(blackjack_rl.__all__) <= set(dir(blackjack_rl))
+    from blackjack_rl.game import BlackjackGame
+    assert blackjack_rl.BlackjackGame is BlackjackGame
+    with pytest.raises(AttributeError):
+        blackjack_rl.no_such_name
@@ -0,0 +1,100 @@
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from blackjack_rl.telemetry import Telemetry
+from blackjack_rl.trainer import Trainer
+
+EPISODES = 2000
+
+
+def make_trainer():
+    trainer = Trainer(episodes=EPISODES, converged_checkpoint=None)
+    trainer.evaluator = None
+    return trainer
+
+
+def parse_metrics(text):
+    """{'name{labels}': value} from Prometheus text format."""
+    metrics = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            metrics[name] = float(value)
+    return metrics
+
+
+def test_metrics_match_trainer_counters():
+    trainer = make_trainer()
+    telemetry = Telemetry(trainer)  # Rates are measured from here
+    for _ in range(EPISODES):
+        trainer.run_episode()
+    metrics = parse_metrics(telemetry.prometheus_text())
+    assert metrics["blackjack_episodes_total"] == EPISODES
+    assert metrics["blackjack_steps_total"] == trainer.steps
+    assert metrics['blackjack_hands_total{result="win"}'] == trainer.total_wins
+    assert metrics['blackjack_hands_total{result="loss"}'] == trainer.total_losses
+    assert metrics['blackjack_hands_total{result="push"}'] == trainer.total_pushes
+    assert metrics["blackjack_q_table_states"] == len(trainer.q_table)
+    assert metrics["blackjack_episodes_per_second"] > 0
+    assert metrics["process_resident_memory_bytes"] > 0
+
+
+def test_rates_never_go_negative_after_reset():
+    trainer = make_trainer()
+    telemetry = Telemetry(trainer)
+    for _ in range(100):
+        trainer.run_episode()
+    telemetry.sample()
+    trainer.reset()
+    sample = telemetry.sample()
+    assert sample["episodes"] == 0
+    assert sample["episodes_per_second"] == 0.0 and sample["steps_per_second"] == 0.0
+
+
+def test_scraping_does_not_change_training():
+    # Readers only read the counters, so a scraped run learns exactly what an unscraped one does
+    plain = make_trainer()
+    for _ in range(EPISODES):
+        plain.run_episode()
+
+    scraped = make_trainer()
+    telemetry = Telemetry(scraped)
+    server = telemetry.serve(port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    done = threading.Event()
+    scrapes = []
+
+    def scrape():
+        while not done.is_set():
+            with urllib.request.urlopen(url) as response:
+                scrapes.append(response.read().decode())
+
+    scraper = threading.Thread(target=scrape)
+    scraper.start()
+    try:
+        for _ in range(EPISODES):
+            scraped.run_episode()
+    finally:
+        done.set()
+        scraper.join()
+        telemetry.shutdown()
+
+    assert scrapes and all("blackjack_episodes_total" in text for text in scrapes)
+    assert set(scraped.q_table) == set(plain.q_table)
+    for state, values in plain.q_table.items():
+        np.testing.assert_array_equal(scraped.q_table[state], values)
+
+
+def test_serves_only_metrics_path():
+    telemetry = Telemetry(make_trainer())
+    server = telemetry.serve(port=0)
+    try:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/other")
+        assert error.value.code == 404
+    finally:
+        telemetry.shutdown()
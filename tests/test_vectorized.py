@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from blackjack_rl.actions import (N_FULL_ACTIONS, N_FULL_STATES, full_greedy_policy, full_state,
+                                  lift_policy)
+from blackjack_rl.agent import PLAYER_SUMS, STATE_SHAPE
+from blackjack_rl.game import MAX_HANDS, BlackjackGame, Card, get_state
+from blackjack_rl.strategy import basic_strategy_policy
+from blackjack_rl.tournament import run_tournament
+from blackjack_rl.vectorized import deal_streams, play_hands
+
+
+class StreamDeck:
+    """Deals one row of a vectorized card stream, in order, to a BlackjackGame."""
+
+    def __init__(self, values):
+        ranks = ['A' if value == 1 else str(value) for value in values.tolist()]
+        self.cards = [Card(rank, 'S') for rank in reversed(ranks)]
+
+    def deal_card(self):
+        return self.cards.pop()  # IndexError, not a reshuffle, if the stream runs out
+
+
+def game_reward(stream, policy):
+    """Reward of BlackjackGame on one stream, playing a (STATE_SHAPE) Stand/Hit policy."""
+    game = BlackjackGame(deck=StreamDeck(stream))
+    game.start_hand()
+    while not game.game_over:
+        player_sum, upcard, usable_ace = get_state(game.player_hand, game.dealer_hand)
+        if policy[player_sum - PLAYER_SUMS.start, upcard - 2, usable_ace]:
+            game.player_hit()
+        else:
+            game.player_stand()
+    return game.reward()
+
+
+def random_policy(rng):
+    return rng.integers(0, 2, size=STATE_SHAPE, dtype=np.int8)
+
+
+@pytest.mark.parametrize("num_decks", [1, 6])
+def test_play_hands_matches_game_hand_for_hand(num_decks):
+    rng = np.random.default_rng(num_decks)
+    streams = deal_streams(2000, rng, num_decks)
+    policies = np.stack([basic_strategy_policy(), random_policy(rng), random_policy(rng)])
+    rewards = play_hands(policies, streams)
+    for p, policy in enumerate(policies):
+        expected = [game_reward(stream, policy) for stream in streams]
+        np.testing.assert_array_equal(rewards[p], expected)
+
+
+def test_hands_longer_than_one_deck_allows():
+    # Six decks hold enough Aces to reach hard 21 with 21 cards; stand only there
+    policy = np.ones(STATE_SHAPE, dtype=np.int8)
+    policy[21 - PLAYER_SUMS.start, :, 0] = 0
+    stream = np.ones((1, 30), dtype=np.int8)
+    stream[0, 1], stream[0, 3] = 10, 7  # Dealer stands on 17
+    assert game_reward(stream[0], policy) == 1.0
+    np.testing.assert_array_equal(play_hands(policy, stream), [[1.0]])
+
+
+def test_tournament_uses_common_random_numbers():
+    basic = basic_strategy_policy()
+    always_stand = np.zeros(STATE_SHAPE, dtype=np.int8)
+    result = run_tournament(np.stack([basic, basic, always_stand]), hands=20_000,
+                            chunk_hands=7_000)
+    # Identical policies see identical hands: no EV difference and no paired noise
+    assert result.ev[0] == result.ev[1]
+    assert result.paired_se[0, 1] == 0.0
+    # Paired comparisons are tighter than independent ones for correlated policies
+    assert result.paired_se[0, 2] < result.independent_se[0, 2]
+
+
+def test_tournament_ev_is_the_mean_reward_on_its_streams():
+    policies = np.stack([basic_strategy_policy(), np.zeros(STATE_SHAPE, dtype=np.int8)])
+    result = run_tournament(policies, hands=5000, seed=3, chunk_hands=5000)
+    streams = deal_streams(5000, np.random.default_rng(3))
+    np.testing.assert_allclose(result.ev, play_hands(policies, streams).mean(axis=1))
+
+
+# --- Full action set ---
+
+# In actions.FULL_ACTIONS order
+PLAY_FULL = (BlackjackGame.player_stand, BlackjackGame.player_hit, BlackjackGame.player_double,
+             BlackjackGame.player_split, BlackjackGame.player_surrender)
+
+
+def play_full_game(stream, policy):
+    """BlackjackGame played to the end on one stream with a FULL_STATE_SHAPE policy."""
+    game = BlackjackGame(deck=StreamDeck(stream))
+    game.start_hand()
+    while not game.game_over:
+        player_sum, upcard, usable_ace, kind = full_state(game)
+        action = policy[player_sum - PLAYER_SUMS.start, upcard - 2, usable_ace, kind]
+        PLAY_FULL[action](game)
+    return game
+
+
+def random_full_policy(rng):
+    return full_greedy_policy(rng.normal(size=(N_FULL_STATES, N_FULL_ACTIONS)))
+
+
+def pair_heavy_streams(hands, rng):
+    # Mostly Aces, 8s and tens, so splits, resplits up to MAX_HANDS and split Aces are common
+    return rng.choice(np.array([1, 8, 8, 10, 10, 2, 5, 6], dtype=np.int8), size=(hands, 60))
+
+
+@pytest.mark.parametrize("pairs", [False, True], ids=["deck", "pairs"])
+def test_play_full_hands_matches_game_hand_for_hand(pairs):
+    rng = np.random.default_rng(44)
+    streams = pair_heavy_streams(2000, rng) if pairs else deal_streams(2000, rng)
+    policies = np.stack([lift_policy(basic_strategy_policy()),
+                         random_full_policy(rng), random_full_policy(rng)])
+    rewards = play_hands(policies, streams)  # Dispatches to play_full_hands
+    num_hands = []
+    for p, policy in enumerate(policies):
+        games = [play_full_game(stream, policy) for stream in streams]
+        np.testing.assert_array_equal(rewards[p], [game.reward() for game in games])
+        num_hands += [game.num_hands for game in games]
+    if pairs:
+        assert MAX_HANDS in num_hands  # Resplits up to the full hand stack were played
+
+
+def test_lifted_policy_plays_like_the_stand_hit_policy():
+    streams = deal_streams(5000, np.random.default_rng(5))
+    basic = basic_strategy_policy()
+    np.testing.assert_array_equal(play_hands(lift_policy(basic), streams),
+                                  play_hands(basic, streams))